@@ -0,0 +1,90 @@
+# backend/api/benchmarks/asgi.py
+"""
+Pilote HTTP minimal qui appelle directement une application ASGI (core.asgi.application),
+sans serveur ni socket : la pile exercée est celle de la production, middlewares compris.
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from time import perf_counter
+
+
+@dataclass
+class ASGIResponse:
+    status: int
+    headers: dict
+    chunks: list = field(default_factory=list)
+    started_at: float = 0.0
+    first_chunk_at: float = None
+    finished_at: float = None
+
+    @property
+    def body(self):
+        return b''.join(self.chunks)
+
+    def json(self):
+        return json.loads(self.body)
+
+    def events(self):
+        """Événements Server-Sent Events de la réponse : liste de (nom, données décodées)."""
+        parsed = []
+        for block in self.body.decode().split('\n\n'):
+            name, data = None, None
+            for line in block.splitlines():
+                if line.startswith('event: '):
+                    name = line[len('event: '):]
+                elif line.startswith('data: '):
+                    data = json.loads(line[len('data: '):])
+            if name:
+                parsed.append((name, data))
+        return parsed
+
+
+async def asgi_request(application, method, path, headers=None, json_body=None):
+    """Exécute une requête HTTP complète contre `application` et horodate la réponse (perf_counter)."""
+    body = json.dumps(json_body).encode() if json_body is not None else b''
+    raw_headers = [(b'host', b'testserver')]
+    if json_body is not None:
+        raw_headers += [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    raw_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': raw_headers,
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    request_sent = False
+    response_done = asyncio.Event()
+    response = ASGIResponse(status=None, headers={}, started_at=perf_counter())
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        # Le client reste connecté jusqu'à la fin de la réponse
+        await response_done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response.status = message['status']
+            response.headers = {name.decode().lower(): value.decode() for name, value in message['headers']}
+        elif message['type'] == 'http.response.body':
+            chunk = message.get('body', b'')
+            if chunk:
+                if response.first_chunk_at is None:
+                    response.first_chunk_at = perf_counter()
+                response.chunks.append(chunk)
+            if not message.get('more_body', False):
+                response.finished_at = perf_counter()
+                response_done.set()
+
+    try:
+        await application(scope, receive, send)
+    finally:
+        response_done.set()
+    if response.finished_at is None:
+        response.finished_at = perf_counter()
+    return response
@@ -0,0 +1,99 @@
+# backend/api/benchmarks/corpus.py
+"""
+Génération d'un corpus synthétique mais réaliste de cas cliniques approuvés
+(avec symptômes, antécédents, traitements, examens et diagnostics) pour les benchmarks.
+Le générateur est initialisé avec une graine : le même N donne toujours le même corpus.
+"""
+import random
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from cases.logic.snapshot import refresh_snapshots
+from cases.models import (
+    Category, ClinicalCase, Symptom, MedicalHistory, CurrentTreatment,
+    ComplementaryExam, PhysicalFinding, Diagnosis,
+)
+from users.models import UserProfile
+
+CATEGORIES = ['Cardiologie', 'Pneumologie', 'Neurologie', 'Gastro-entérologie', 'Endocrinologie',
+              'Infectiologie', 'Néphrologie', 'Pédiatrie', 'Gynécologie', 'Rhumatologie']
+SYMPTOMS = ['Douleur thoracique', 'Dyspnée', 'Toux sèche', 'Fièvre', 'Céphalées', 'Vertiges',
+            'Douleur abdominale', 'Nausées', 'Palpitations', 'Asthénie', 'Polyurie', 'Arthralgies']
+LOCATIONS = ['', 'Rétrosternale', 'Épigastrique', 'Frontale', 'Hypochondre droit', 'Genoux']
+ONSETS = ['il y a 2 heures', 'depuis ce matin', 'il y a 3 jours', 'depuis 1 semaine', 'depuis 2 mois']
+HISTORY = [('medical', 'HTA'), ('medical', 'Diabète de type 2'), ('chirurgical', 'Appendicectomie en 2010'),
+           ('familial', "Père décédé d'un infarctus"), ('allergie', 'Pénicilline'), ('obstetrical', 'G2P2')]
+TREATMENTS = [('Metformine', '850 mg x2/j'), ('Amlodipine', '5 mg/j'), ('Paracétamol', '1 g si douleur'),
+              ('Salbutamol', '2 bouffées si besoin')]
+EXAMS = [('NFS', 'Hb 11 g/dL, GB 14 000/mm3'), ('ECG', 'Sus-décalage ST en V1-V4'),
+         ('Radiographie du thorax', 'Opacité basale droite'), ('Glycémie', '2,8 g/L'), ('CRP', '120 mg/L')]
+FINDINGS = [('Auscultation cardiaque', 'Bruits du cœur réguliers, pas de souffle'),
+            ('Auscultation pulmonaire', 'Crépitants en base droite'),
+            ('Palpation abdominale', 'Abdomen souple et dépressible'), ('Constantes', 'TA 160/100, FC 110')]
+DIAGNOSES = ['Syndrome coronarien aigu', 'Pneumopathie franche lobaire aiguë', 'Migraine', 'Cholécystite aiguë',
+             'Décompensation diabétique', 'Paludisme grave', 'Embolie pulmonaire', 'Gastrite']
+
+LEARNER_PASSWORD = 'benchmark-pass-123'
+
+
+def seed_corpus(n_cases, n_learners=5, seed=42, batch_size=500):
+    """Crée `n_cases` cas approuvés et `n_learners` apprenants. Renvoie (ids des cas, noms des apprenants)."""
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        categories = [Category.objects.get_or_create(name=name)[0] for name in CATEGORIES]
+
+        cases = ClinicalCase.objects.bulk_create([
+            ClinicalCase(
+                source_fultang_id=f'bench_{seed}_{i:06d}',
+                status=ClinicalCase.Status.APPROUVE,
+                case_title=f"{rng.choice(SYMPTOMS)} chez un patient de {rng.randint(18, 90)} ans",
+                case_summary=' '.join(rng.choice(SYMPTOMS) for _ in range(12)),
+                learning_objectives="Conduire l'interrogatoire, proposer un diagnostic différentiel.",
+                motif_consultation=rng.choice(SYMPTOMS),
+                age=rng.randint(1, 95),
+                sexe=rng.choice(['Homme', 'Femme']),
+                etat_civil=rng.choice(['Marié(e)', 'Célibataire', 'Veuf(ve)']),
+                profession=rng.choice(['Enseignant', 'Commerçant', 'Agriculteur', 'Étudiant']),
+                nombre_enfant=rng.randint(0, 6),
+                groupe_sanguin=rng.choice(['A+', 'B+', 'O+', 'AB-']),
+                mode_de_vie={'tabac': rng.choice(['non', '1 paquet/jour']), 'alcool': rng.choice(['non', 'occasionnel'])},
+            )
+            for i in range(n_cases)
+        ], batch_size=batch_size)
+
+        symptoms, history, treatments, exams, findings, diagnoses, links = [], [], [], [], [], [], []
+        through = ClinicalCase.categories.through
+        for case in cases:
+            for _ in range(rng.randint(2, 5)):
+                symptoms.append(Symptom(case=case, nom=rng.choice(SYMPTOMS), localisation=rng.choice(LOCATIONS),
+                                        date_debut=rng.choice(ONSETS), degre=rng.randint(1, 10)))
+            for kind, description in rng.sample(HISTORY, rng.randint(1, 3)):
+                history.append(MedicalHistory(case=case, type=kind, description=description))
+            for name, dosage in rng.sample(TREATMENTS, rng.randint(0, 2)):
+                treatments.append(CurrentTreatment(case=case, nom=name, posologie=dosage))
+            for name, result in rng.sample(EXAMS, rng.randint(1, 3)):
+                exams.append(ComplementaryExam(case=case, nom=name, resultat=result))
+            for name, result in rng.sample(FINDINGS, rng.randint(1, 3)):
+                findings.append(PhysicalFinding(case=case, nom_examen=name, resultat_observation=result))
+            for index, description in enumerate(rng.sample(DIAGNOSES, rng.randint(2, 4))):
+                diagnoses.append(Diagnosis(case=case, description=description, is_final=index == 0))
+            for category in rng.sample(categories, rng.randint(1, 2)):
+                links.append(through(clinicalcase_id=case.id, category_id=category.id))
+
+        for model, rows in ((Symptom, symptoms), (MedicalHistory, history), (CurrentTreatment, treatments),
+                            (ComplementaryExam, exams), (PhysicalFinding, findings), (Diagnosis, diagnoses),
+                            (through, links)):
+            model.objects.bulk_create(rows, batch_size=batch_size)
+
+        # bulk_create ne déclenche pas les signaux : documents dénormalisés reconstruits en lot
+        refresh_snapshots([case.id for case in cases])
+
+    learners = []
+    for i in range(n_learners):
+        user = User.objects.create_user(f'bench_learner_{i}', f'bench_learner_{i}@example.com', LEARNER_PASSWORD)
+        learners.append(user.username)
+    UserProfile.objects.filter(user__username__in=learners).update(role=UserProfile.Role.APPRENANT)
+
+    return [case.id for case in cases], learners
@@ -0,0 +1,43 @@
+# backend/api/benchmarks/environment.py
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+
+@contextmanager
+def isolated_databases(verbosity=0, on_disk=False):
+    """
+    Crée des bases de test jetables (comme `manage.py test`) le temps du bloc,
+    pour que les benchmarks ne touchent jamais à la base de développement.
+
+    `on_disk` place les bases SQLite dans un fichier temporaire plutôt qu'en mémoire : la base
+    en mémoire partagée verrouille des tables entières dès que plusieurs threads écrivent
+    (cas des vues asynchrones servies par ASGI), ce qu'une base fichier en WAL supporte.
+    """
+    tmpdir = tempfile.mkdtemp(prefix='benchmark_') if on_disk else None
+    if on_disk:
+        for alias in connections:
+            settings_dict = connections[alias].settings_dict
+            if settings_dict['ENGINE'] == 'django.db.backends.sqlite3' and not settings_dict['TEST'].get('MIRROR'):
+                settings_dict['TEST']['NAME'] = os.path.join(tmpdir, f'{alias}.sqlite3')
+                # Fichiers jetables : WAL, que les settings réservent aux bases non versionnées
+                init_command = settings_dict['OPTIONS'].get('init_command', '')
+                if 'journal_mode' not in init_command:
+                    settings_dict['OPTIONS'] = {**settings_dict['OPTIONS'],
+                                                'init_command': 'PRAGMA journal_mode=WAL;' + init_command}
+    setup_test_environment()
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+        teardown_test_environment()
+        if tmpdir:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
@@ -0,0 +1,254 @@
+# backend/api/management/commands/benchmark_api.py
+import asyncio
+import json
+import os
+import random
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+
+from api.benchmarks.corpus import LEARNER_PASSWORD, seed_corpus
+from api.benchmarks.environment import isolated_databases
+from core.stats import latency_summary
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), '..', '..', 'benchmarks', 'thresholds.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de l'API sur un corpus de cas généré dans une base de test jetable : "
+        "latences p50/p95 et nombre de requêtes SQL par endpoint, puis phase de charge concurrente. "
+        "Échoue si les seuils sont dépassés ou si le nombre de requêtes SQL augmente par rapport à une référence."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cases', type=int, default=200, help='Nombre de cas approuvés générés. Par défaut : 200.')
+        parser.add_argument('--iterations', type=int, default=30,
+                            help='Nombre de mesures par scénario. Par défaut : 30.')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Nombre de clients simultanés pendant la phase de charge. Par défaut : 8.')
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help='Durée de la phase de charge en secondes (0 pour la désactiver). Par défaut : 5.')
+        parser.add_argument('--interface', choices=['wsgi', 'asgi'], default='wsgi',
+                            help="Interface utilisée pour la phase de charge. Par défaut : wsgi.")
+        parser.add_argument('--seed', type=int, default=42, help='Graine du corpus et des tirages. Par défaut : 42.')
+        parser.add_argument('--thresholds', type=str, default=DEFAULT_THRESHOLDS,
+                            help='Fichier JSON des seuils (max_<mesure> / min_<mesure> par scénario).')
+        parser.add_argument('--baseline', type=str,
+                            help='Résultats JSON précédents : échec si un scénario fait plus de requêtes SQL.')
+        parser.add_argument('--output-path', type=str, default='./benchmark_results',
+                            help='Répertoire où sauvegarder les résultats JSON.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        started_at = datetime.now()
+
+        with isolated_databases():
+            self.stdout.write(f"Génération d'un corpus de {options['cases']} cas approuvés...")
+            self.case_ids, self.learners = seed_corpus(options['cases'], seed=options['seed'])
+
+            scenarios = {}
+            iterations = options['iterations']
+            scenarios['token_obtain'] = self._measure(iterations, self._token_obtain)
+            self.access_token = self._obtain_token(Client(), self.learners[0])
+            scenarios['case_list'] = self._measure(iterations, self._case_list)
+            scenarios['case_detail'] = self._measure(iterations, self._case_detail)
+            scenarios['register'] = self._measure(iterations, self._register)
+            if options['duration'] > 0:
+                scenarios['load'] = self._load_phase(options['interface'], options['concurrency'], options['duration'])
+
+        results = {
+            'started_at': started_at.isoformat(),
+            'commit': self._current_commit(),
+            'vendor': connection.vendor,
+            'parameters': {key: options[key] for key in ('cases', 'iterations', 'concurrency', 'duration',
+                                                           'interface', 'seed')},
+            'scenarios': scenarios,
+        }
+        for name, summary in scenarios.items():
+            self.stdout.write(f"  {name:<14} {json.dumps(summary)}")
+
+        os.makedirs(options['output_path'], exist_ok=True)
+        full_path = os.path.join(options['output_path'], f"benchmark_{started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(full_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+        self.stdout.write(f"Résultats sauvegardés dans : {full_path}")
+
+        failures = self._check_thresholds(scenarios, options['thresholds'])
+        if options['baseline']:
+            failures += self._check_baseline(scenarios, options['baseline'])
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} régression(s) de performance détectée(s).")
+        self.stdout.write(self.style.SUCCESS("Benchmark terminé : aucun seuil dépassé."))
+
+    # --- Scénarios unitaires -------------------------------------------------------------
+
+    def _measure(self, iterations, make_request):
+        """Exécute `make_request` (après un appel de chauffe) en mesurant latence et requêtes SQL."""
+        client = Client()
+        make_request(client, -1)
+        latencies, query_counts, errors = [], [], 0
+        for i in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                start = perf_counter()
+                response = make_request(client, i)
+                latencies.append(perf_counter() - start)
+            query_counts.append(len(queries))
+            errors += response.status_code >= 400
+        summary = latency_summary(latencies)
+        summary.update({
+            'queries': max(query_counts),
+            'queries_median': sorted(query_counts)[len(query_counts) // 2],
+            'errors': errors,
+        })
+        return summary
+
+    def _auth(self):
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.access_token}'}
+
+    def _obtain_token(self, client, username):
+        response = client.post('/api/users/token/', {'username': username, 'password': LEARNER_PASSWORD},
+                               content_type='application/json')
+        return response.json()['access']
+
+    def _token_obtain(self, client, i):
+        return client.post('/api/users/token/',
+                           {'username': self.rng.choice(self.learners), 'password': LEARNER_PASSWORD},
+                           content_type='application/json')
+
+    def _case_list(self, client, i):
+        return client.get('/api/cases/', **self._auth())
+
+    def _case_detail(self, client, i):
+        return client.get(f'/api/cases/{self.rng.choice(self.case_ids)}/', **self._auth())
+
+    def _register(self, client, i):
+        username = f'bench_register_{i + 1}'
+        return client.post('/api/users/register/', {
+            'username': username, 'password': 'Register-pass-123', 'email': f'{username}@example.com',
+        }, content_type='application/json')
+
+    # --- Phase de charge -----------------------------------------------------------------
+
+    def _load_paths(self, count):
+        return [
+            '/api/cases/' if self.rng.random() < 0.2 else f'/api/cases/{self.rng.choice(self.case_ids)}/'
+            for _ in range(count)
+        ]
+
+    def _load_phase(self, interface, concurrency, duration):
+        self.stdout.write(f"Phase de charge ({interface}) : {concurrency} clients pendant {duration:.0f} s...")
+        paths = self._load_paths(1000)
+        if interface == 'asgi':
+            latencies, errors, elapsed = asyncio.run(self._asgi_load(paths, concurrency, duration))
+        else:
+            latencies, errors, elapsed = self._wsgi_load(paths, concurrency, duration)
+        summary = latency_summary(latencies)
+        summary.update({
+            'concurrency': concurrency,
+            'errors': errors,
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+        })
+        return summary
+
+    def _wsgi_load(self, paths, concurrency, duration):
+        latencies, errors = [], [0]
+        lock = threading.Lock()
+        deadline = perf_counter() + duration
+
+        def worker(offset):
+            client, local = Client(), []
+            i = offset
+            try:
+                while perf_counter() < deadline:
+                    start = perf_counter()
+                    response = client.get(paths[i % len(paths)], **self._auth())
+                    local.append(perf_counter() - start)
+                    if response.status_code >= 400:
+                        with lock:
+                            errors[0] += 1
+                    i += concurrency
+            finally:
+                # Chaque thread ouvre ses propres connexions
+                connections.close_all()
+            with lock:
+                latencies.extend(local)
+
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, range(concurrency)))
+        return latencies, errors[0], perf_counter() - start
+
+    async def _asgi_load(self, paths, concurrency, duration):
+        latencies, errors = [], 0
+        deadline = perf_counter() + duration
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+
+        async def worker(offset):
+            nonlocal errors
+            client = AsyncClient(headers=headers)
+            i = offset
+            while perf_counter() < deadline:
+                start = perf_counter()
+                response = await client.get(paths[i % len(paths)])
+                latencies.append(perf_counter() - start)
+                errors += response.status_code >= 400
+                i += concurrency
+
+        start = perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        return latencies, errors, perf_counter() - start
+
+    # --- Seuils et comparaison -----------------------------------------------------------
+
+    def _check_thresholds(self, scenarios, thresholds_path):
+        if not thresholds_path or not os.path.exists(thresholds_path):
+            return []
+        with open(thresholds_path, encoding='utf-8') as f:
+            thresholds = json.load(f)
+
+        failures = []
+        for scenario, limits in thresholds.items():
+            summary = scenarios.get(scenario)
+            if summary is None:
+                continue
+            for key, limit in limits.items():
+                bound, _, metric = key.partition('_')
+                value = summary.get(metric)
+                if value is None:
+                    continue
+                if (bound == 'max' and value > limit) or (bound == 'min' and value < limit):
+                    failures.append(f"{scenario} : {metric} = {value} (seuil {key} = {limit})")
+        return failures
+
+    def _check_baseline(self, scenarios, baseline_path):
+        try:
+            with open(baseline_path, encoding='utf-8') as f:
+                baseline = json.load(f)['scenarios']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Référence illisible ({baseline_path}) : {e}")
+
+        failures = []
+        for scenario, summary in scenarios.items():
+            previous = baseline.get(scenario, {}).get('queries')
+            if previous is not None and summary.get('queries', 0) > previous:
+                failures.append(
+                    f"{scenario} : {summary['queries']} requêtes SQL par appel contre {previous} dans la référence"
+                )
+        return failures
+
+    def _current_commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -1,3 +1,87 @@
-from django.test import TestCase
+import os
+import re
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import SimpleTestCase, TestCase
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from cases.models import ClinicalCase
+from core import settings as project_settings
+from core.db_routers import PrimaryReplicaRouter, ReplicaReadsMixin, use_replica
+
+
+class PerformanceMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('apprenant', 'apprenant@example.cm', 'pw')
+        ClinicalCase.objects.create(
+            source_fultang_id='f1', case_title='Cas', case_summary='s', learning_objectives='o',
+            motif_consultation='m', age=40, sexe='Homme', status=ClinicalCase.Status.APPROUVE,
+        )
+
+    def assert_timed(self, response):
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertGreater(int(re.search(r'desc="(\d+) queries"', timing).group(1)), 0)
+        for name in ('serialize', 'render', 'total'):
+            self.assertIn(f'{name};dur=', timing)
+
+    def test_sync_request_times_queries_and_serializers(self):
+        self.client.force_login(self.user)
+        self.assert_timed(self.client.get('/api/cases/'))
+
+    async def test_async_request_times_queries_and_serializers(self):
+        await self.async_client.aforce_login(self.user)
+        self.assert_timed(await self.async_client.get('/api/cases/'))
+
+
+class ReadRoutingView(ReplicaReadsMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        return Response({'alias': PrimaryReplicaRouter().db_for_read(ClinicalCase)})
+
+    def post(self, request):
+        return self.get(request)
+
+
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        replica = mock.patch.dict(settings.DATABASES, {'replica': dict(settings.DATABASES['default'])})
+        replica.start()
+        self.addCleanup(replica.stop)
+
+    def test_reads_go_to_the_replica_only_inside_use_replica(self):
+        self.assertIsNone(self.router.db_for_read(ClinicalCase))
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(ClinicalCase), 'replica')
+            self.assertEqual(self.router.db_for_write(ClinicalCase), 'default')
+        self.assertIsNone(self.router.db_for_read(ClinicalCase))
+
+    def test_reads_stay_on_the_primary_inside_a_transaction_or_without_replica(self):
+        with use_replica(), mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertIsNone(self.router.db_for_read(ClinicalCase))
+        del settings.DATABASES['replica']
+        with use_replica():
+            self.assertIsNone(self.router.db_for_read(ClinicalCase))
+
+    def test_mixin_routes_safe_methods_only(self):
+        factory, view = APIRequestFactory(), ReadRoutingView.as_view()
+        self.assertEqual(view(factory.get('/')).data, {'alias': 'replica'})
+        self.assertEqual(view(factory.post('/')).data, {'alias': None})
+
+    def test_postgres_name_falls_back_to_db_name(self):
+        with mock.patch.object(project_settings, 'DB_ENGINE', 'postgresql'), \
+                mock.patch.dict(os.environ, {'DB_NAME': 'tutor_prod'}):
+            self.assertEqual(project_settings._database_config('DB_')['NAME'], 'tutor_prod')
+            self.assertEqual(project_settings._database_config('DB_REPLICA_')['NAME'], 'tutor_prod')
+            with mock.patch.dict(os.environ, {'DB_REPLICA_NAME': 'tutor_replica'}):
+                self.assertEqual(project_settings._database_config('DB_REPLICA_')['NAME'], 'tutor_replica')
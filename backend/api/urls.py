@@ -3,5 +3,8 @@ from django.urls import path, include
 
 urlpatterns = [
     path('users/', include('users.urls')),
+    path('jobs/', include('jobs.urls')),
+    path('simulation/', include('simulation.urls')),
+    path('evaluation/', include('evaluation.urls')),
     path('', include('cases.urls')),
 ]
\ No newline at end of file
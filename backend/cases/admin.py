@@ -2,8 +2,15 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import CharField, OuterRef, Subquery
+
+from core.pagination import EstimatedCountPaginator
+from .aggregates import GroupConcat
+from .logic import taxonomy
+from .logic.snapshot import defer_snapshot_refresh
 from .models import (
-    ClinicalCase, Symptom, MedicalHistory, CurrentTreatment,
+    Category, ClinicalCase, ExamTerm, Symptom, SymptomTerm, MedicalHistory, CurrentTreatment,
     ComplementaryExam, PhysicalFinding, Diagnosis
 )
 
@@ -33,20 +40,89 @@ class PhysicalFindingInline(admin.TabularInline):
     extra = 1
 
 
+class CategoryTreeFilter(admin.SimpleListFilter):
+    """Filtre par catégorie, sous-catégories comprises (une jointure sur la table de fermeture)."""
+    title = 'catégorie'
+    parameter_name = 'category'
+
+    def lookups(self, request, model_admin):
+        return [(category.pk, f"{'— ' * depth}{category.name}") for category, depth in taxonomy.tree()]
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return taxonomy.filter_cases(queryset, int(self.value()))
+        return queryset
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'parent')
+    list_select_related = ('parent',)
+    search_fields = ('name',)
+    autocomplete_fields = ('parent',)
+
+
+@admin.register(SymptomTerm)
+class SymptomTermAdmin(admin.ModelAdmin):
+    list_display = ('label', 'name', 'case_count')
+    search_fields = ('name', 'label')
+    ordering = ('-case_count',)
+    readonly_fields = ('name', 'case_count')
+
+    def has_add_permission(self, request):
+        # Les termes naissent des lignes qui les emploient (cf. cases.logic.vocabulary)
+        return False
+
+
+@admin.register(ExamTerm)
+class ExamTermAdmin(SymptomTermAdmin):
+    list_display = ('label', 'kind', 'name', 'case_count')
+    list_filter = ('kind',)
+    readonly_fields = ('kind', 'name', 'case_count')
+
+
 @admin.register(ClinicalCase)
 class ClinicalCaseAdmin(admin.ModelAdmin):
     # Ce qu'on voit dans la liste des cas
     list_display = ('id', 'case_title', 'status','display_categories', 'validated_by', 'updated_at', )
     # Permet de filtrer par statut et catégorie
-    list_filter = ('status', 'categories')
+    list_filter = ('status', CategoryTreeFilter, ('duplicate_of', admin.EmptyFieldListFilter))
     filter_horizontal = ('categories',)
+    raw_id_fields = ('duplicate_of',)
     # Permet de faire une recherche
     search_fields = ('case_title', 'case_summary')
     # Permet d'éditer les symptômes et antécédents directement depuis la page du cas
     inlines = [SymptomInline, MedicalHistoryInline]
+    # Évite une requête par ligne pour afficher l'expert validateur
+    list_select_related = ('validated_by',)
+    # Évite les COUNT(*) complets sur une grosse table
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # Noms des catégories agrégés dans la requête principale (sous-requête corrélée)
+        # plutôt qu'un obj.categories.all() par ligne.
+        category_names = (
+            ClinicalCase.categories.through.objects
+            .filter(clinicalcase_id=OuterRef('pk'))
+            .order_by()
+            .values('clinicalcase_id')
+            .annotate(names=GroupConcat('category__name'))
+            .values('names')
+        )
+        return queryset.defer('snapshot').annotate(
+            category_names=Subquery(category_names, output_field=CharField())
+        )
+
+    def changeform_view(self, request, *args, **kwargs):
+        # Le cas, ses inlines et ses catégories sont enregistrés séparément :
+        # on ne reconstruit le document qu'une fois, dans la même transaction.
+        with transaction.atomic(), defer_snapshot_refresh():
+            return super().changeform_view(request, *args, **kwargs)
 
     def display_categories(self, obj):
-        return ", ".join([category.name for category in obj.categories.all()])
+        return obj.category_names or ""
 
     display_categories.short_description = 'Catégories'
 
@@ -0,0 +1,22 @@
+# backend/cases/aggregates.py
+from django.db.models import Aggregate, CharField, Value
+
+
+class GroupConcat(Aggregate):
+    """
+    Concatène les valeurs d'un groupe en une seule chaîne.
+    GROUP_CONCAT sur SQLite, STRING_AGG sur PostgreSQL.
+    """
+    function = 'GROUP_CONCAT'
+    output_field = CharField()
+
+    def __init__(self, expression, separator=', ', **extra):
+        super().__init__(expression, Value(separator), **extra)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            function='STRING_AGG',
+            template='%(function)s(%(expressions)s)',
+            **extra_context
+        )
@@ -0,0 +1,15 @@
+# backend/cases/jobs.py
+from io import StringIO
+
+from django.core.management import call_command
+
+from jobs.registry import register_job
+
+
+@register_job('cases.import_cases')
+def import_cases(mock=False, dedupe='flag'):
+    """Import Fultang + structuration LLM, exécuté par un worker au lieu d'une requête HTTP."""
+    output = StringIO()
+    call_command('import_cases', mock=mock, dedupe=dedupe, stdout=output, stderr=output)
+    # On ne conserve que la fin du journal d'import
+    return {'log': output.getvalue()[-5000:]}
@@ -0,0 +1,223 @@
+# backend/cases/logic/dataset_stats.py
+"""
+Statistiques du jeu de cas pour les curateurs : statuts et taux d'approbation, catégories,
+âge / sexe, symptômes et sévérité (`degre`).
+
+- Statuts et catégories : agrégés par la base (GROUP BY), toujours à jour.
+- Âge, sexe, symptômes (regroupés par terme canonique, cf. cases.logic.vocabulary), sévérité :
+  colonnes lues par values_list, gardées sous forme de tableaux
+  NumPy dans le cache « dataset_stats » (FileBasedCache, partagé entre l'API et la commande).
+  Un rafraîchissement ne relit que les cas dont `updated_at` dépasse le dernier vu (toute
+  modification d'un cas ou d'une ligne enfant le met à jour, cf. cases.logic.snapshot) ; les
+  cas supprimés sont détectés par le nombre de cas. Les histogrammes sont recalculés en NumPy.
+"""
+import numpy as np
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Count, Max
+
+from cases.logic.vocabulary import normalize_term
+from cases.models import Category, ClinicalCase, Symptom
+
+CACHE_KEY = 'dataset_stats:columns:v2'
+AGE_BIN = 10
+AGE_BINS = 10  # 0-9, ..., 80-89, 90+
+TOP_SYMPTOMS = 30
+SEXES = ['Homme', 'Femme']
+STATUSES = list(ClinicalCase.Status.values)
+
+
+def _cache():
+    return caches['dataset_stats']
+
+
+def _cache_key():
+    # Une entrée par base : le même répertoire de cache peut servir plusieurs bases (tests, benchmarks)
+    return f"{CACHE_KEY}:{connection.vendor}:{connection.settings_dict['NAME']}"
+
+
+def _sex_code(sexe):
+    label = normalize_term(sexe)
+    if label.startswith(('h', 'm')):  # homme, masculin
+        return 0
+    if label.startswith('f'):
+        return 1
+    return 2
+
+
+class DatasetColumns:
+    """Colonnes d'un cas par ligne, et des symptômes par ligne (case_id, symptôme, degré)."""
+
+    def __init__(self):
+        self.watermark = None
+        self.case_ids = np.zeros(0, dtype=np.int64)
+        self.status = np.zeros(0, dtype=np.int8)
+        self.age = np.zeros(0, dtype=np.int16)
+        self.sex = np.zeros(0, dtype=np.int8)
+        self.symptom_cases = np.zeros(0, dtype=np.int64)
+        self.symptom_codes = np.zeros(0, dtype=np.int32)
+        self.symptom_degrees = np.zeros(0, dtype=np.int16)
+        self.vocabulary = []  # nom canonique (SymptomTerm.name) de chaque code
+        self.labels = []  # libellé affiché de chaque code
+        self._codes = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_codes']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._codes = {name: code for code, name in enumerate(self.vocabulary)}
+
+    def _code(self, name, label):
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.vocabulary)
+            self.vocabulary.append(name)
+            self.labels.append(label)
+        return code
+
+    def drop(self, case_ids):
+        case_ids = np.asarray(list(case_ids), dtype=np.int64)
+        keep = ~np.isin(self.case_ids, case_ids)
+        self.case_ids, self.status, self.age, self.sex = (
+            self.case_ids[keep], self.status[keep], self.age[keep], self.sex[keep],
+        )
+        keep = ~np.isin(self.symptom_cases, case_ids)
+        self.symptom_cases, self.symptom_codes, self.symptom_degrees = (
+            self.symptom_cases[keep], self.symptom_codes[keep], self.symptom_degrees[keep],
+        )
+
+    def load(self, cases):
+        """Ajoute (ou remplace) les cas du queryset `cases`. Renvoie le nombre de cas lus."""
+        rows = list(cases.values_list('id', 'status', 'age', 'sexe', 'updated_at'))
+        if not rows:
+            return 0
+        ids = [row[0] for row in rows]
+        self.drop(ids)
+        self.case_ids = np.concatenate([self.case_ids, np.array(ids, dtype=np.int64)])
+        self.status = np.concatenate([self.status, np.array([STATUSES.index(r[1]) for r in rows], dtype=np.int8)])
+        self.age = np.concatenate([self.age, np.array([r[2] or 0 for r in rows], dtype=np.int16)])
+        self.sex = np.concatenate([self.sex, np.array([_sex_code(r[3]) for r in rows], dtype=np.int8)])
+        latest = max(row[4] for row in rows)
+        self.watermark = latest if self.watermark is None else max(self.watermark, latest)
+
+        # Terme canonique de la ligne ; une ligne pas encore rattachée (bulk_create) est normalisée ici
+        symptoms = list(Symptom.objects.filter(case_id__in=ids)
+                        .values_list('case_id', 'nom', 'term__name', 'term__label', 'degre'))
+        self.symptom_cases = np.concatenate([self.symptom_cases, np.array([s[0] for s in symptoms], dtype=np.int64)])
+        self.symptom_codes = np.concatenate([
+            self.symptom_codes,
+            np.array([self._code(name or normalize_term(nom), label or nom) for _, nom, name, label, _ in symptoms],
+                     dtype=np.int32),
+        ])
+        self.symptom_degrees = np.concatenate([
+            self.symptom_degrees, np.array([s[4] for s in symptoms], dtype=np.int16),
+        ])
+        return len(rows)
+
+
+def refresh_columns(full=False):
+    """Colonnes à jour, en ne relisant que les cas modifiés depuis le dernier passage. Renvoie (colonnes, cas relus)."""
+    cache = _cache()
+    columns = None if full else cache.get(_cache_key())
+    state = ClinicalCase.objects.aggregate(latest=Max('updated_at'), count=Count('id'))
+    if columns is not None and columns.watermark == state['latest'] and len(columns.case_ids) == state['count']:
+        return columns, 0
+
+    if columns is None:
+        columns = DatasetColumns()
+        loaded = columns.load(ClinicalCase.objects.all())
+    else:
+        loaded = 0
+        if columns.watermark is not None:
+            # Même horodatage inclus : une écriture concurrente peut partager la valeur déjà vue
+            loaded = columns.load(ClinicalCase.objects.filter(updated_at__gte=columns.watermark))
+        else:
+            loaded = columns.load(ClinicalCase.objects.all())
+        if len(columns.case_ids) != state['count']:
+            existing = np.fromiter(ClinicalCase.objects.values_list('id', flat=True), dtype=np.int64)
+            columns.drop(np.setdiff1d(columns.case_ids, existing))
+    cache.set(_cache_key(), columns, None)
+    return columns, loaded
+
+
+def _summary(values):
+    if not len(values):
+        return {'count': 0}
+    values = values.astype(np.float64)
+    p50, p90 = np.percentile(values, [50, 90])
+    return {
+        'count': int(len(values)),
+        'mean': round(float(values.mean()), 2),
+        'median': round(float(p50), 2),
+        'p90': round(float(p90), 2),
+        'min': int(values.min()),
+        'max': int(values.max()),
+    }
+
+
+def compute_stats(status=None, full_refresh=False, top_symptoms=TOP_SYMPTOMS):
+    """Statistiques du jeu de cas (tous statuts, ou seulement `status` pour les parties par cas)."""
+    columns, refreshed = refresh_columns(full=full_refresh)
+
+    # --- Agrégations côté base -----------------------------------------------------------
+    by_status = dict(ClinicalCase.objects.order_by().values_list('status').annotate(n=Count('id')))
+    decided = by_status.get(ClinicalCase.Status.APPROUVE, 0) + by_status.get(ClinicalCase.Status.REJETE, 0)
+    total = sum(by_status.values())
+    cases = ClinicalCase.objects.all() if status is None else ClinicalCase.objects.filter(status=status)
+    category_counts = dict(
+        ClinicalCase.categories.through.objects.filter(clinicalcase__in=cases).order_by()
+        .values_list('category_id').annotate(n=Count('clinicalcase_id'))
+    )
+    categories = sorted(
+        ({'id': category_id, 'name': name, 'cases': category_counts.get(category_id, 0)}
+         for category_id, name in Category.objects.values_list('id', 'name')),
+        key=lambda row: (-row['cases'], row['name']),
+    )
+
+    # --- Colonnes NumPy ------------------------------------------------------------------
+    selected = np.ones(len(columns.case_ids), dtype=bool)
+    if status is not None:
+        selected = columns.status == STATUSES.index(status)
+    age, sex = columns.age[selected], columns.sex[selected]
+    age_bins = np.minimum(age // AGE_BIN, AGE_BINS - 1)
+    histogram = np.zeros((3, AGE_BINS), dtype=np.int64)
+    np.add.at(histogram, (sex, age_bins), 1)
+    labels = [f"{i * AGE_BIN}-{i * AGE_BIN + AGE_BIN - 1}" for i in range(AGE_BINS - 1)] + [f"{(AGE_BINS - 1) * AGE_BIN}+"]
+
+    in_scope = np.isin(columns.symptom_cases, columns.case_ids[selected])
+    codes, degrees = columns.symptom_codes[in_scope], columns.symptom_degrees[in_scope]
+    # Fréquence en nombre de cas : un symptôme saisi deux fois (« Céphalées », « cephalees ») compte une fois
+    pairs = np.unique(columns.symptom_cases[in_scope] * len(columns.vocabulary) + codes)
+    frequency = np.bincount(pairs % max(len(columns.vocabulary), 1), minlength=len(columns.vocabulary))
+    mentions = np.bincount(codes, minlength=len(columns.vocabulary))
+    degree_sums = np.bincount(codes, weights=degrees, minlength=len(columns.vocabulary))
+    top = np.argsort(-frequency, kind='stable')[:top_symptoms]
+    n_cases = int(selected.sum())
+
+    return {
+        'status_filter': status,
+        'cases': total,
+        'by_status': {value: by_status.get(value, 0) for value in STATUSES},
+        'approval_rate': round(by_status.get(ClinicalCase.Status.APPROUVE, 0) / decided, 4) if decided else None,
+        'approved_share': round(by_status.get(ClinicalCase.Status.APPROUVE, 0) / total, 4) if total else None,
+        'categories': categories,
+        'uncategorized': n_cases - cases.filter(categories__isnull=False).distinct().count(),
+        'age': _summary(age),
+        'age_histogram': {
+            'bins': labels,
+            **{label: histogram[code].tolist() for code, label in enumerate(SEXES + ['Autre'])},
+        },
+        'sex': {label: int((sex == code).sum()) for code, label in enumerate(SEXES + ['Autre'])},
+        'symptoms': [
+            {'name': columns.labels[code], 'cases': int(frequency[code]),
+             'mean_degre': round(float(degree_sums[code] / mentions[code]), 2)}
+            for code in top if frequency[code]
+        ],
+        'distinct_symptoms': int((frequency > 0).sum()),
+        'degre': {**_summary(degrees), 'histogram': np.bincount(np.minimum(degrees, 10), minlength=11).tolist()},
+        'refreshed_cases': refreshed,
+        'computed_over': n_cases,
+    }
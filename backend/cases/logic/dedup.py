@@ -0,0 +1,310 @@
+# backend/cases/logic/dedup.py
+"""
+Détection des notes Fultang quasi identiques (re-soumissions, modèles copiés-collés), avant
+leur structuration par le LLM.
+
+Chaque note est normalisée (minuscules, sans accents ni ponctuation), découpée en triplets de
+mots (shingles) et résumée par une signature MinHash de `num_perm` valeurs : la proportion de
+valeurs égales entre deux signatures estime la similarité de Jaccard des deux notes.
+L'index LSH découpe les signatures en `bands` bandes ; deux notes partageant une bande entière
+sont candidates et seules celles-ci sont comparées. Avec 16 bandes de 8 valeurs, une paire de
+similarité 0,8 est retrouvée dans 95 % des cas, une paire à 0,5 dans 6 %.
+
+Stockage : un répertoire de fichiers .npy ouverts en memmap et un petit state.json, comme
+l'index vectoriel du simulateur (simulation.logic.vector_index).
+- signatures.npy uint32 (capacité, num_perm)
+- case_ids.npy   int64  cas importé à partir de chaque note
+- band_keys.npy  uint64 (bands, n) clés de bande triées, band_rows.npy int64 leurs lignes
+Les notes ajoutées depuis la dernière sauvegarde restent en mémoire (signatures et dictionnaire
+par bande) ; `save()` les ajoute aux fichiers et retrie les clés (l'import la rappelle toutes les
+CASES_DEDUP_SAVE_EVERY notes). Une recherche fait `bands`
+recherches dichotomiques : quelques dizaines de microsecondes, même avec un million de notes indexées.
+
+Plusieurs imports (jobs sur des processus distincts) partagent le répertoire : `save()` prend un
+verrou de fichier exclusif (index.lock) et relit l'état sur disque avant d'y ajouter ses notes,
+si bien que les signatures sauvées entre-temps par un autre processus sont conservées.
+
+La note normalisée de chaque cas est enregistrée sur le cas (ClinicalCase.source_notes) : la commande
+rebuild_dedup_index reconstruit l'index à partir de la base (changement de num_perm / bands, fichiers
+perdus, cas importés avant l'enregistrement des notes, dont la note doit alors être fournie).
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import unicodedata
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows : seul le verrou entre threads s'applique
+    fcntl = None
+
+_STATE_FILE = 'state.json'
+_LOCK_FILE = 'index.lock'
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+SHINGLE_SIZE = 3
+
+
+def normalize_notes(text):
+    """Mots de la note, en minuscules et sans accents ni ponctuation."""
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    return _TOKEN_RE.findall(''.join(c for c in text if not unicodedata.combining(c)))
+
+
+def shingles(text):
+    words = normalize_notes(text)
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+class NoteDedupIndex:
+
+    def __init__(self, directory, num_perm=128, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple de bands.")
+        self.directory = str(directory)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # Hachage universel multiplicatif : ((a * x + b) mod 2^64) >> 32, a impair
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._band_weights = rng.integers(1, 2 ** 63, size=self.rows_per_band, dtype=np.uint64) | np.uint64(1)
+        self._lock = threading.RLock()
+        self.count = 0
+        self._state_mtime = None
+        self._signatures = None
+        self._case_ids = None
+        self._band_keys = np.zeros((bands, 0), dtype=np.uint64)
+        self._band_rows = np.zeros((bands, 0), dtype=np.int64)
+        self._added = []  # (case_id, signature) ajoutés depuis la sauvegarde
+        self._pending = [dict() for _ in range(bands)]  # clé de bande -> positions dans _added
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, self._file_lock(exclusive=True):
+            self._load()
+
+    # --- Signatures ----------------------------------------------------------------------
+
+    def signature(self, text):
+        """Signature MinHash de la note, ou None si elle ne contient aucun mot."""
+        grams = shingles(text)
+        if not grams:
+            return None
+        hashes = np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams))
+        with np.errstate(over='ignore'):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signatures):
+        """Clé de chaque bande : (n, num_perm) -> (n, bands)."""
+        blocks = np.asarray(signatures, dtype=np.uint64).reshape(-1, self.bands, self.rows_per_band)
+        with np.errstate(over='ignore'):
+            return (blocks * self._band_weights).sum(axis=2, dtype=np.uint64)
+
+    # --- Persistance ---------------------------------------------------------------------
+
+    def _path(self, name):
+        return os.path.join(self.directory, f'{name}.npy')
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        """Verrou entre processus sur le répertoire de l'index (exclusif pour écrire, partagé pour relire)."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, _LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        state_path = os.path.join(self.directory, _STATE_FILE)
+        if not os.path.exists(state_path):
+            self._allocate(1024)
+            self._write()
+            return
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        if (state['num_perm'], state['bands']) != (self.num_perm, self.bands):
+            raise ValueError(
+                f"Index construit avec num_perm={state['num_perm']}, bands={state['bands']} : "
+                f"reconstruire l'index (manage.py rebuild_dedup_index) ou garder ces paramètres."
+            )
+        self.count = state['count']
+        self._signatures = np.load(self._path('signatures'), mmap_mode='r+')
+        self._case_ids = np.load(self._path('case_ids'), mmap_mode='r+')
+        self._band_keys = np.load(self._path('band_keys'), mmap_mode='r')
+        self._band_rows = np.load(self._path('band_rows'), mmap_mode='r')
+        self._state_mtime = os.path.getmtime(state_path)
+
+    def reload_if_changed(self):
+        """Relit l'index si un autre processus l'a sauvé depuis ; les notes non sauvées sont gardées."""
+        state_path = os.path.join(self.directory, _STATE_FILE)
+        try:
+            mtime = os.path.getmtime(state_path)
+        except OSError:
+            return
+        if mtime != self._state_mtime:
+            with self._lock, self._file_lock(exclusive=False):
+                self._load()
+
+    def _allocate(self, capacity):
+        """(Ré)alloue les fichiers avec la capacité donnée en conservant les `count` premières lignes."""
+        arrays = {}
+        for name, dtype, shape in (('signatures', np.uint32, (capacity, self.num_perm)),
+                                   ('case_ids', np.int64, (capacity,))):
+            tmp_path = self._path(name) + '.tmp'
+            array = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=shape)
+            current = self._signatures if name == 'signatures' else self._case_ids
+            if current is not None and self.count:
+                array[:self.count] = current[:self.count]
+            array.flush()
+            arrays[name] = tmp_path
+        for name, tmp_path in arrays.items():
+            os.replace(tmp_path, self._path(name))
+        self._signatures = np.load(self._path('signatures'), mmap_mode='r+')
+        self._case_ids = np.load(self._path('case_ids'), mmap_mode='r+')
+
+    def save(self):
+        """
+        Ajoute les notes en attente aux fichiers, retrie les clés de bande et écrit l'état sur disque.
+        L'état est relu sous verrou : les notes sauvées entre-temps par un autre processus sont conservées.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            self._load()
+            if self._added:
+                needed = self.count + len(self._added)
+                if needed > self.capacity:
+                    self._allocate(max(needed, self.capacity * 2))
+                self._signatures[self.count:needed] = np.stack([signature for _, signature in self._added])
+                self._case_ids[self.count:needed] = [case_id for case_id, _ in self._added]
+                self.count = needed
+            self._write()
+            self._added = []
+            self._pending = [dict() for _ in range(self.bands)]
+
+    def _write(self):
+        keys = self.band_keys(self._signatures[:self.count]).T  # (bands, count)
+        order = np.argsort(keys, axis=1, kind='stable')
+        for name, array in (('band_keys', np.take_along_axis(keys, order, axis=1)), ('band_rows', order)):
+            np.save(self._path(name) + '.tmp.npy', np.ascontiguousarray(array))
+            os.replace(self._path(name) + '.tmp.npy', self._path(name))
+        self._signatures.flush()
+        self._case_ids.flush()
+        state = {'num_perm': self.num_perm, 'bands': self.bands, 'count': self.count}
+        state_path = os.path.join(self.directory, _STATE_FILE)
+        with open(state_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(state_path + '.tmp', state_path)
+        self._state_mtime = os.path.getmtime(state_path)
+        self._band_keys = np.load(self._path('band_keys'), mmap_mode='r')
+        self._band_rows = np.load(self._path('band_rows'), mmap_mode='r')
+
+    # --- Écriture / recherche ------------------------------------------------------------
+
+    @property
+    def capacity(self):
+        return len(self._case_ids)
+
+    @property
+    def pending(self):
+        """Nombre de notes ajoutées depuis la dernière sauvegarde."""
+        return len(self._added)
+
+    def add(self, case_id, signature):
+        """Indexe la note en mémoire ; elle n'est écrite sur disque qu'au prochain `save()`."""
+        with self._lock:
+            position = len(self._added)
+            self._added.append((case_id, np.asarray(signature, dtype=np.uint32)))
+            for band, key in enumerate(self.band_keys(signature)[0].tolist()):
+                self._pending[band].setdefault(key, []).append(position)
+
+    def query(self, signature, threshold):
+        """Cas déjà indexés dont la similarité estimée atteint `threshold` : [(case_id, similarité)], décroissant."""
+        keys = self.band_keys(signature)[0]
+        rows, positions = set(), set()
+        with self._lock:
+            sorted_count = self._band_keys.shape[1]
+            for band in range(self.bands):
+                if sorted_count:
+                    band_keys = self._band_keys[band]
+                    start = np.searchsorted(band_keys, keys[band], side='left')
+                    stop = np.searchsorted(band_keys, keys[band], side='right')
+                    if stop > start:
+                        rows.update(self._band_rows[band][start:stop].tolist())
+                positions.update(self._pending[band].get(int(keys[band]), ()))
+            if not rows and not positions:
+                return []
+            candidates = []
+            if rows:
+                rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+                candidates.append((self._case_ids[rows].tolist(), (self._signatures[rows] == signature).mean(axis=1)))
+            if positions:
+                added = [self._added[position] for position in positions]
+                signatures = np.stack([added_signature for _, added_signature in added])
+                candidates.append(([case_id for case_id, _ in added], (signatures == signature).mean(axis=1)))
+        best = {}
+        for case_ids, similarities in candidates:
+            for case_id, similarity in zip(case_ids, similarities.tolist()):
+                if similarity >= threshold and similarity > best.get(case_id, 0.0):
+                    best[case_id] = similarity
+        return sorted(best.items(), key=lambda item: -item[1])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_dedup_index():
+    """Index du processus, configuré par CASES_DEDUP_INDEX_DIR / CASES_DEDUP_NUM_PERM / CASES_DEDUP_BANDS."""
+    global _index
+    from django.conf import settings
+
+    with _index_lock:
+        if _index is None:
+            _index = NoteDedupIndex(settings.CASES_DEDUP_INDEX_DIR, num_perm=settings.CASES_DEDUP_NUM_PERM,
+                                    bands=settings.CASES_DEDUP_BANDS)
+        else:
+            _index.reload_if_changed()
+        return _index
+
+
+def rebuild_index(directory, notes, num_perm=128, bands=16, batch_size=5000):
+    """
+    Reconstruit l'index à partir de `notes` ((case_id, note), ...) dans un répertoire voisin, puis le
+    substitue à `directory` : les recherches en cours gardent l'ancien index jusqu'à leur prochain
+    rechargement. Les imports qui sauvent pendant la reconstruction perdent leurs notes, qui
+    reviennent au prochain rebuild. Renvoie le nombre de notes indexées.
+    """
+    global _index
+    directory = str(directory).rstrip(os.sep)
+    building, previous = directory + '.rebuild', directory + '.old'
+    shutil.rmtree(building, ignore_errors=True)
+    index = NoteDedupIndex(building, num_perm=num_perm, bands=bands)
+    indexed = 0
+    for case_id, note in notes:
+        signature = index.signature(note)
+        if signature is None:
+            continue
+        index.add(case_id, signature)
+        indexed += 1
+        if index.pending >= batch_size:
+            index.save()
+    index.save()
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(directory):
+        os.replace(directory, previous)
+    os.replace(building, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    with _index_lock:
+        _index = None
+    return indexed
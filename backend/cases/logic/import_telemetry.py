@@ -0,0 +1,189 @@
+# backend/cases/logic/import_telemetry.py
+"""
+Télémétrie d'un import Fultang (cf. la commande import_cases).
+
+Chaque étape est chronométrée, par cas et pour l'ensemble du run :
+- fetch      : récupération des notes (API Fultang ou fichier mock) ;
+- dedupe     : signature MinHash et recherche des quasi-doublons ;
+- prompt     : construction du prompt ;
+- llm        : un appel au LLM (une mesure par tentative, réponses servies par le cache exclues) ;
+- parse      : décodage du JSON renvoyé ;
+- categories : résolution / création des catégories ;
+- db_write   : écriture du cas et de ses lignes enfants (document dénormalisé compris).
+S'y ajoutent les tokens de prompt et de réponse (usage_metadata de Gemini, estimés à défaut),
+les reprises, les réponses servies par le cache et l'issue de chaque cas. En fin de run,
+`summary_lines()` donne le résumé affiché et `report()` le rapport JSON, comparable d'un run à l'autre.
+"""
+import json
+import os
+import subprocess
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+
+from core.stats import latency_summary
+
+STAGES = ('fetch', 'dedupe', 'prompt', 'llm', 'parse', 'categories', 'db_write')
+
+
+def estimate_tokens(text):
+    # Ordre de grandeur pour du français : ~4 caractères par token
+    return max(1, len(text or '') // 4)
+
+
+class ImportTelemetry:
+
+    def __init__(self, price_input=0.0, price_output=0.0):
+        self.started_at = datetime.now()
+        self._start = perf_counter()
+        self.price_input = price_input    # USD par million de tokens de prompt
+        self.price_output = price_output  # USD par million de tokens de réponse
+        self.durations = defaultdict(list)
+        self.counters = Counter()
+        self.cases = []
+        self._case = None
+
+    # --- Mesures -------------------------------------------------------------------------
+
+    @contextmanager
+    def stage(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self.durations[name].append(elapsed)
+            if self._case is not None:
+                stages = self._case['stages_ms']
+                stages[name] = round(stages.get(name, 0.0) + elapsed * 1000, 2)
+
+    def begin_case(self, fultang_id):
+        self._case = {'fultang_id': fultang_id, 'stages_ms': {}, 'prompt_tokens': 0, 'response_tokens': 0,
+                      'attempts': 0, 'cached': False, '_start': perf_counter()}
+
+    def end_case(self, outcome, case_id=None):
+        """Issue du cas : imported, exists, duplicate_skipped, llm_failed, db_failed, missing_id."""
+        self.counters[f'outcome:{outcome}'] += 1
+        if self._case is None:
+            return
+        case = self._case
+        case['outcome'] = outcome
+        case['case_id'] = case_id
+        case['total_ms'] = round((perf_counter() - case.pop('_start')) * 1000, 2)
+        self.durations['case'].append(case['total_ms'] / 1000)
+        self.cases.append(case)
+        self._case = None
+
+    def record_llm(self, prompt_tokens, response_tokens, estimated=False, cached=False):
+        """Une réponse du LLM (ou du cache) : tokens consommés, ou économisés si elle vient du cache."""
+        prefix = 'cached_' if cached else ''
+        self.counters[f'{prefix}prompt_tokens'] += prompt_tokens
+        self.counters[f'{prefix}response_tokens'] += response_tokens
+        if cached:
+            self.counters['cache_hits'] += 1
+        else:
+            self.counters['llm_calls'] += 1
+        if estimated:
+            self.counters['estimated_token_counts'] += 1
+        if self._case is not None:
+            self._case['prompt_tokens'] += prompt_tokens
+            self._case['response_tokens'] += response_tokens
+            self._case['cached'] = self._case['cached'] or cached
+
+    def record_attempt(self, retry):
+        self.counters['llm_attempts'] += 1
+        if retry:
+            self.counters['retries'] += 1
+        if self._case is not None:
+            self._case['attempts'] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    # --- Rapport -------------------------------------------------------------------------
+
+    def cost_usd(self):
+        return round(
+            self.counters['prompt_tokens'] / 1e6 * self.price_input
+            + self.counters['response_tokens'] / 1e6 * self.price_output, 6
+        )
+
+    def stage_summaries(self):
+        total = sum(sum(self.durations[name]) for name in STAGES) or 1.0
+        summaries = {}
+        for name in STAGES:
+            values = self.durations.get(name, [])
+            summary = latency_summary(values)
+            if values:
+                summary['total_s'] = round(sum(values), 3)
+                summary['share'] = round(sum(values) / total, 4)
+            summaries[name] = summary
+        return summaries
+
+    def outcomes(self):
+        return {key.split(':', 1)[1]: value for key, value in self.counters.items() if key.startswith('outcome:')}
+
+    def llm_summary(self):
+        llm_calls = self.counters['llm_calls']
+        return {
+            'calls': llm_calls,
+            'attempts': self.counters['llm_attempts'],
+            'retries': self.counters['retries'],
+            'cache_hits': self.counters['cache_hits'],
+            'prompt_tokens': self.counters['prompt_tokens'],
+            'response_tokens': self.counters['response_tokens'],
+            'mean_prompt_tokens': round(self.counters['prompt_tokens'] / llm_calls, 1) if llm_calls else None,
+            'mean_response_tokens': round(self.counters['response_tokens'] / llm_calls, 1) if llm_calls else None,
+            'tokens_saved_by_cache': self.counters['cached_prompt_tokens'] + self.counters['cached_response_tokens'],
+            'estimated_token_counts': self.counters['estimated_token_counts'],
+            'cost_usd': self.cost_usd(),
+        }
+
+    def report(self, parameters=None):
+        return {
+            'started_at': self.started_at.isoformat(),
+            'elapsed_s': round(perf_counter() - self._start, 3),
+            'commit': _current_commit(),
+            'parameters': parameters or {},
+            'outcomes': self.outcomes(),
+            'stages': self.stage_summaries(),
+            'cases_timing': latency_summary(self.durations.get('case', [])),
+            'llm': self.llm_summary(),
+            'counters': {key: value for key, value in self.counters.items() if not key.startswith('outcome:')},
+            'cases': self.cases,
+        }
+
+    def summary_lines(self):
+        """Résumé lisible : une ligne par étape (p50 / p95 / max / part du temps), puis le LLM et les issues."""
+        lines = [f"{'étape':<11} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'total s':>8} {'part':>6}"]
+        for name, summary in self.stage_summaries().items():
+            if not summary['samples']:
+                lines.append(f"{name:<11} {0:>5}")
+                continue
+            lines.append(
+                f"{name:<11} {summary['samples']:>5} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+                f"{summary['max_ms']:>9.1f} {summary['total_s']:>8.2f} {summary['share']:>6.1%}"
+            )
+        llm = self.llm_summary()
+        lines.append(
+            f"LLM : {llm['calls']} appel(s), {llm['retries']} reprise(s), {llm['cache_hits']} réponse(s) du cache, "
+            f"{llm['prompt_tokens']} + {llm['response_tokens']} tokens (≈ {llm['cost_usd']:.4f} USD)"
+        )
+        lines.append("Issues : " + ', '.join(f"{key}={value}" for key, value in sorted(self.outcomes().items())))
+        return lines
+
+    def write(self, directory, parameters=None):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(str(directory), f"import_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(parameters), f, ensure_ascii=False, indent=4)
+        return path
+
+
+def _current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,103 @@
+# backend/cases/logic/review_queue.py
+"""
+File de relecture des cas cliniques par les experts.
+
+Chaque expert "réserve" un lot de cas non approuvés pour une durée limitée (lease).
+Les lignes déjà verrouillées par une autre transaction sont sautées
+(SELECT ... FOR UPDATE SKIP LOCKED), ce qui permet à plusieurs experts de piocher
+dans la file en parallèle sans s'attendre ni se voir attribuer le même cas.
+Sur SQLite (pas de FOR UPDATE), c'est l'UPDATE conditionnel qui garantit l'exclusivité.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cases.models import ClinicalCase
+from . import vocabulary
+from .snapshot import refresh_snapshots
+
+
+def _available_for(user, now):
+    """Cas sans réservation, à réservation expirée, ou déjà réservés par cet expert."""
+    return (
+        Q(review_lease_owner__isnull=True)
+        | Q(review_lease_expires_at__isnull=True)
+        | Q(review_lease_expires_at__lte=now)
+        | Q(review_lease_owner_id=user.pk)
+    )
+
+
+def claim_batch(user, batch_size=None, lease_seconds=None):
+    """
+    Réserve jusqu'à `batch_size` cas non approuvés pour `user` et renvoie le queryset réservé.
+    Les réservations existantes de l'expert sont prolongées et comptent dans le lot.
+    """
+    batch_size = batch_size or settings.REVIEW_QUEUE_BATCH_SIZE
+    lease_seconds = lease_seconds or settings.REVIEW_QUEUE_LEASE_SECONDS
+    now = timezone.now()
+    available = _available_for(user, now)
+
+    with transaction.atomic():
+        candidate_ids = list(
+            ClinicalCase.objects.select_for_update(skip_locked=True)
+            .filter(status=ClinicalCase.Status.NON_APPROUVE)
+            .filter(available)
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if candidate_ids:
+            # On re-vérifie la disponibilité dans l'UPDATE : c'est lui qui tranche
+            # si deux experts ont lu les mêmes lignes (bases sans FOR UPDATE).
+            ClinicalCase.objects.filter(id__in=candidate_ids).filter(available).update(
+                review_lease_owner_id=user.pk,
+                review_lease_expires_at=now + timedelta(seconds=lease_seconds),
+            )
+
+    return ClinicalCase.objects.filter(
+        id__in=candidate_ids, review_lease_owner_id=user.pk
+    ).order_by('created_at', 'id')
+
+
+def release(user, case_ids):
+    """Rend à la file les cas réservés par `user`. Renvoie le nombre de cas libérés."""
+    return ClinicalCase.objects.filter(id__in=case_ids, review_lease_owner_id=user.pk).update(
+        review_lease_owner=None,
+        review_lease_expires_at=None,
+    )
+
+
+def apply_decision(user, case_ids, status):
+    """
+    Applique en une seule transaction la décision `status` (approuvé/rejeté) à tous les cas
+    de `case_ids` que l'expert peut traiter. Renvoie (ids mis à jour, ids ignorés).
+    Un cas est ignoré s'il n'est plus en attente ou s'il est réservé par un autre expert.
+    """
+    now = timezone.now()
+    requested = set(case_ids)
+
+    with transaction.atomic():
+        updatable_ids = list(
+            ClinicalCase.objects.select_for_update(skip_locked=True)
+            .filter(id__in=requested, status=ClinicalCase.Status.NON_APPROUVE)
+            .filter(_available_for(user, now))
+            .values_list('id', flat=True)
+        )
+        if updatable_ids:
+            # update() ne déclenche pas auto_now : on renseigne updated_at explicitement.
+            ClinicalCase.objects.filter(id__in=updatable_ids).update(
+                status=status,
+                validated_by_id=user.pk,
+                review_lease_owner=None,
+                review_lease_expires_at=None,
+                updated_at=now,
+            )
+            # Le statut fait partie du document dénormalisé
+            refresh_snapshots(updatable_ids)
+            if status == ClinicalCase.Status.APPROUVE:
+                # update() n'envoie pas de signaux : les facettes comptent les cas approuvés
+                vocabulary.cases_approval_changed(updatable_ids, approved=True)
+
+    return sorted(updatable_ids), sorted(requested - set(updatable_ids))
@@ -0,0 +1,153 @@
+# backend/cases/logic/snapshot.py
+"""
+Document dénormalisé d'un cas clinique.
+
+L'API, l'export et le simulateur ont tous besoin du cas complet (7 tables). Ce document
+est stocké sur la ligne ClinicalCase (`snapshot`) et reconstruit dans la même transaction
+que la modification qui l'invalide (signaux de cases.signals). Un lecteur n'a alors
+besoin que d'une lecture par clé primaire.
+
+Pour les écritures groupées (import), `defer_snapshot_refresh()` regroupe les
+reconstructions et ne reconstruit chaque cas qu'une fois, en fin de bloc.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.utils import timezone
+
+from cases.models import ClinicalCase
+from cases.signals import case_document_changed
+
+_pending_case_ids = ContextVar('pending_snapshot_case_ids', default=None)
+
+CASE_DOCUMENT_PREFETCH = (
+    'categories', 'symptoms', 'history_entries', 'current_treatments', 'exams', 'physical_findings', 'diagnoses',
+)
+
+
+def build_case_document(case):
+    """Construit le document complet d'un cas (utiliser CASE_DOCUMENT_PREFETCH pour les lots)."""
+    return {
+        'id': case.id,
+        'source_fultang_id': case.source_fultang_id,
+        'status': case.status,
+        'validated_by': case.validated_by_id,
+        'created_at': case.created_at.isoformat() if case.created_at else None,
+        'updated_at': case.updated_at.isoformat() if case.updated_at else None,
+        'case_title': case.case_title,
+        'case_summary': case.case_summary,
+        'learning_objectives': case.learning_objectives,
+        'motif_consultation': case.motif_consultation,
+        'age': case.age,
+        'sexe': case.sexe,
+        'etat_civil': case.etat_civil,
+        'profession': case.profession,
+        'nombre_enfant': case.nombre_enfant,
+        'groupe_sanguin': case.groupe_sanguin,
+        'mode_de_vie': case.mode_de_vie,
+        'categories': [{'id': c.id, 'name': c.name} for c in case.categories.all()],
+        'symptoms': [
+            {'nom': s.nom, 'localisation': s.localisation, 'date_debut': s.date_debut, 'frequence': s.frequence,
+             'duree': s.duree, 'evolution': s.evolution, 'activite_declenchante': s.activite_declenchante,
+             'degre': s.degre}
+            for s in case.symptoms.all()
+        ],
+        'history': [
+            {'type': h.type, 'type_display': h.get_type_display(), 'description': h.description}
+            for h in case.history_entries.all()
+        ],
+        'current_treatments': [
+            {'nom': t.nom, 'posologie': t.posologie, 'date_debut': t.date_debut, 'efficacite': t.efficacite}
+            for t in case.current_treatments.all()
+        ],
+        'exams': [{'nom': e.nom, 'resultat': e.resultat} for e in case.exams.all()],
+        'physical_findings': [
+            {'nom_examen': p.nom_examen, 'resultat_observation': p.resultat_observation}
+            for p in case.physical_findings.all()
+        ],
+        'diagnoses': [{'description': d.description, 'is_final': d.is_final} for d in case.diagnoses.all()],
+    }
+
+
+def refresh_snapshots(case_ids, batch_size=200):
+    """Reconstruit le document des cas donnés. Renvoie le nombre de cas reconstruits."""
+    case_ids = sorted(set(case_ids))
+    refreshed = []
+    for start in range(0, len(case_ids), batch_size):
+        batch = case_ids[start:start + batch_size]
+        with transaction.atomic():
+            cases = (
+                ClinicalCase.objects.select_for_update()
+                .filter(pk__in=batch)
+                .defer('snapshot')
+                .prefetch_related(*CASE_DOCUMENT_PREFETCH)
+            )
+            now = timezone.now()
+            for case in cases:
+                # Le contenu du cas a changé (lui ou un enfant) : updated_at le reflète
+                case.updated_at = now
+                document = build_case_document(case)
+                document['version'] = case.snapshot_version + 1
+                ClinicalCase.objects.filter(pk=case.pk).update(
+                    snapshot=document,
+                    snapshot_version=document['version'],
+                    updated_at=now,
+                )
+                refreshed.append(case.pk)
+    if refreshed:
+        case_document_changed.send(sender=ClinicalCase, case_ids=refreshed)
+    return len(refreshed)
+
+
+def schedule_snapshot_refresh(case_ids):
+    """Reconstruit tout de suite, ou en fin de bloc `defer_snapshot_refresh()` si l'on est dans l'un d'eux."""
+    pending = _pending_case_ids.get()
+    if pending is not None:
+        pending.update(case_ids)
+    else:
+        refresh_snapshots(case_ids)
+
+
+@contextmanager
+def defer_snapshot_refresh():
+    """Regroupe les reconstructions déclenchées dans le bloc et les exécute une seule fois à la sortie."""
+    if _pending_case_ids.get() is not None:
+        # Bloc imbriqué : c'est le bloc englobant qui reconstruira
+        yield
+        return
+    pending = set()
+    token = _pending_case_ids.set(pending)
+    try:
+        yield
+    finally:
+        _pending_case_ids.reset(token)
+    if pending:
+        refresh_snapshots(pending)
+
+
+def iter_case_documents(queryset, chunk_size=500):
+    """Documents des cas du queryset, lus depuis la colonne snapshot (construits à la volée s'ils manquent)."""
+    rows = queryset.order_by('pk').values_list('pk', 'snapshot').iterator(chunk_size=chunk_size)
+    for case_id, document in rows:
+        if not document:
+            case = ClinicalCase.objects.prefetch_related(*CASE_DOCUMENT_PREFETCH).get(pk=case_id)
+            document = build_case_document(case)
+        yield document
+
+
+def get_case_document(case_id, **filters):
+    """
+    Document d'un cas en une lecture par clé primaire. S'il n'a jamais été calculé, il est construit
+    en mémoire depuis la même base, sans écriture : l'appel reste sûr sur un réplica (vues GET).
+    """
+    row = ClinicalCase.objects.filter(pk=case_id, **filters).values_list('snapshot', flat=True).first()
+    if row is None:
+        return None
+    if not row:
+        case = ClinicalCase.objects.filter(pk=case_id).prefetch_related(*CASE_DOCUMENT_PREFETCH).first()
+        if case is None:
+            return None
+        row = build_case_document(case)
+        row['version'] = case.snapshot_version
+    return row
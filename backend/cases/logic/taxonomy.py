@@ -0,0 +1,117 @@
+# backend/cases/logic/taxonomy.py
+"""
+Hiérarchie des catégories, matérialisée dans la table de fermeture CategoryClosure.
+
+Chaque catégorie a une ligne (elle-même, profondeur 0) plus une ligne par ancêtre. La table est
+tenue à jour par les signaux de Category (cf. cases.signals) :
+- création : la catégorie hérite des lignes de son parent, profondeur + 1 ;
+- changement de parent : le sous-arbre est détaché de ses anciens ancêtres puis rattaché aux
+  nouveaux (une suppression et une insertion groupées) ;
+- suppression : les sous-catégories remontent à la racine (parent à NULL).
+Les filtres « catégorie et sous-catégories » ou « catégorie et ancêtres » sont alors une seule
+jointure indexée entre la table des catégories des cas et la table de fermeture.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from cases.models import Category, CategoryClosure, ClinicalCase
+
+SCOPES = ('descendants', 'ancestors', 'exact')
+
+
+def creates_cycle(category_id, parent_id):
+    """Vrai si `parent_id` est la catégorie elle-même ou l'une de ses sous-catégories."""
+    return parent_id == category_id or CategoryClosure.objects.filter(
+        ancestor_id=category_id, descendant_id=parent_id,
+    ).exists()
+
+
+def _links_under(parent_id, subtree):
+    """Lignes rattachant le sous-arbre [(descendant, profondeur relative)] aux ancêtres de `parent_id`."""
+    if parent_id is None:
+        return []
+    ancestors = CategoryClosure.objects.filter(descendant_id=parent_id).values_list('ancestor_id', 'depth')
+    return [
+        CategoryClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth + relative + 1)
+        for ancestor_id, depth in ancestors
+        for descendant_id, relative in subtree
+    ]
+
+
+def attach(category):
+    """Nouvelle catégorie : sa ligne propre et celles de ses ancêtres."""
+    CategoryClosure.objects.bulk_create(
+        [CategoryClosure(ancestor_id=category.pk, descendant_id=category.pk, depth=0)]
+        + _links_under(category.parent_id, [(category.pk, 0)]),
+        ignore_conflicts=True,
+    )
+
+
+def move(category_id, parent_id):
+    """Déplace la catégorie et tout son sous-arbre sous `parent_id` (None : à la racine)."""
+    with transaction.atomic():
+        subtree = list(CategoryClosure.objects.filter(ancestor_id=category_id).values_list('descendant_id', 'depth'))
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+        CategoryClosure.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+        CategoryClosure.objects.bulk_create(_links_under(parent_id, subtree))
+
+
+def scope_ids(category_id, scope='descendants'):
+    """Sous-requête des catégories couvertes : la catégorie et ses descendants, ses ancêtres, ou elle seule."""
+    if scope == 'descendants':
+        return CategoryClosure.objects.filter(ancestor_id=category_id).values('descendant_id')
+    if scope == 'ancestors':
+        return CategoryClosure.objects.filter(descendant_id=category_id).values('ancestor_id')
+    return Category.objects.filter(pk=category_id).values('pk')
+
+
+def filter_cases(queryset, category_id, scope='descendants'):
+    """Cas classés dans la portée de `category_id` (semi-jointure : pas de doublons, pas de DISTINCT)."""
+    links = ClinicalCase.categories.through.objects.filter(category_id__in=scope_ids(category_id, scope))
+    return queryset.filter(pk__in=links.values('clinicalcase_id'))
+
+
+def category_paths():
+    """{category_id: 'Cardiologie > Rythmologie'}, en une requête sur la table de fermeture."""
+    names = defaultdict(list)
+    rows = CategoryClosure.objects.order_by('descendant_id', '-depth').values_list('descendant_id', 'ancestor__name')
+    for descendant_id, ancestor_name in rows:
+        names[descendant_id].append(ancestor_name)
+    return {category_id: ' > '.join(path) for category_id, path in names.items()}
+
+
+def tree():
+    """Catégories dans l'ordre de la hiérarchie : [(catégorie, profondeur)], racines et enfants par nom."""
+    categories = list(Category.objects.order_by('name'))
+    children = defaultdict(list)
+    for category in categories:
+        children[category.parent_id].append(category)
+    ordered = []
+
+    def walk(parent_id, depth):
+        for category in children.get(parent_id, []):
+            ordered.append((category, depth))
+            walk(category.pk, depth + 1)
+
+    walk(None, 0)
+    return ordered
+
+
+def render_taxonomy():
+    """Hiérarchie compacte pour un prompt : « Cardiologie (Rythmologie, Coronaropathies (SCA)); Pneumologie »."""
+    children = defaultdict(list)
+    for category_id, name, parent_id in Category.objects.order_by('name').values_list('id', 'name', 'parent_id'):
+        children[parent_id].append((category_id, name))
+
+    def render(parent_id):
+        parts = []
+        for category_id, name in children.get(parent_id, []):
+            nested = render(category_id)
+            parts.append(f"{name} ({nested})" if nested else name)
+        return ', '.join(parts)
+
+    return '; '.join(
+        f"{name} ({render(category_id)})" if children.get(category_id) else name
+        for category_id, name in children.get(None, [])
+    )
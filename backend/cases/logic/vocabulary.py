@@ -0,0 +1,240 @@
+# backend/cases/logic/vocabulary.py
+"""
+Vocabulaire canonique des symptômes et des examens.
+
+`Symptom.nom`, `ComplementaryExam.nom` et `PhysicalFinding.nom_examen` restent saisis
+librement, mais chaque ligne pointe vers un terme canonique (SymptomTerm, ExamTerm) :
+- le libellé est normalisé (minuscules, sans accents ni ponctuation ni mots-outils, pluriels
+  ramenés au singulier, abréviations d'examens développées), puis le terme correspondant est
+  retrouvé ou créé. Les signaux de cases.signals le font à chaque écriture, import compris ;
+- `case_count` (nombre de cas approuvés distincts employant le terme, les seuls visibles des
+  apprenants) est ajusté à chaque écriture : +1 quand un cas approuvé emploie le terme pour la
+  première fois, -1 quand sa dernière ligne disparaît. La vérification passe par l'index
+  (term, case) des lignes. Un cas qui devient ou cesse d'être approuvé ajuste tous ses termes
+  (signaux de cases.signals, décisions groupées de cases.logic.review_queue).
+Les lignes écrites sans signaux (bulk_create, données antérieures) sont rattachées par la
+commande `backfill_vocabulary`, qui recompte aussi les cas par terme.
+
+« Cas présentant le symptôme X » est alors une semi-jointure sur l'index (term, case), et les
+facettes une lecture des termes triés par `case_count`.
+"""
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+
+from cases.models import ClinicalCase, ComplementaryExam, ExamTerm, PhysicalFinding, Symptom, SymptomTerm
+
+STOPWORDS = frozenset('a au aux d de des du en et l la le les par sur un une'.split())
+
+# Abréviations courantes des examens, développées mot à mot
+EXAM_ABBREVIATIONS = {
+    'nfs': 'numeration formule sanguine',
+    'hemogramme': 'numeration formule sanguine',
+    'rx': 'radiographie',
+    'radio': 'radiographie',
+    'ecg': 'electrocardiogramme',
+    'tdm': 'tomodensitometrie',
+    'scanner': 'tomodensitometrie',
+    'ge': 'goutte epaisse',
+    'tdr': 'test diagnostique rapide',
+    'ecbu': 'examen cytobacteriologique urine',
+    'vs': 'vitesse sedimentation',
+    'ta': 'tension arterielle',
+    'pa': 'pression arterielle',
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+class TermSource:
+    """Colonne de libellé d'un modèle de lignes et table de termes à laquelle elle se rattache."""
+
+    def __init__(self, model, field, term_model, kind=None, abbreviations=None):
+        self.model = model
+        self.field = field
+        self.term_model = term_model
+        self.kind = kind
+        self.abbreviations = abbreviations or {}
+
+    def terms(self):
+        queryset = self.term_model.objects.all()
+        return queryset.filter(kind=self.kind) if self.kind else queryset
+
+    def normalize(self, text):
+        return normalize_term(text, self.abbreviations)
+
+
+SOURCES = {
+    Symptom: TermSource(Symptom, 'nom', SymptomTerm),
+    ComplementaryExam: TermSource(ComplementaryExam, 'nom', ExamTerm, ExamTerm.Kind.COMPLEMENTAIRE, EXAM_ABBREVIATIONS),
+    PhysicalFinding: TermSource(PhysicalFinding, 'nom_examen', ExamTerm, ExamTerm.Kind.PHYSIQUE, EXAM_ABBREVIATIONS),
+}
+
+
+def _singular(token):
+    # Pluriel français régulier : « céphalées » -> « cephalee » ; les mots courts et en « ss » sont gardés
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def normalize_term(text, abbreviations=None):
+    """Forme canonique d'un libellé (chaîne vide si rien d'exploitable)."""
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        expansion = (abbreviations or {}).get(token)
+        tokens.extend(expansion.split() if expansion else [token])
+    return ' '.join(_singular(token) for token in tokens if token not in STOPWORDS)[:200]
+
+
+def resolve_term(source, text):
+    """Identifiant du terme canonique du libellé (créé au besoin), ou None s'il est vide."""
+    name = source.normalize(text)
+    if not name:
+        return None
+    defaults = {'label': (text or '').strip()[:200]}
+    if source.kind:
+        term, _ = source.term_model.objects.get_or_create(kind=source.kind, name=name, defaults=defaults)
+    else:
+        term, _ = source.term_model.objects.get_or_create(name=name, defaults=defaults)
+    return term.pk
+
+
+def resolve_terms(source, texts):
+    """{libellé: identifiant de terme} pour un lot de libellés, en deux requêtes."""
+    names = {text: source.normalize(text) for text in set(texts)}
+    labels = {}
+    for text, name in names.items():
+        if name:
+            labels.setdefault(name, (text or '').strip()[:200])
+    extra = {'kind': source.kind} if source.kind else {}
+    source.term_model.objects.bulk_create(
+        [source.term_model(name=name, label=label, **extra) for name, label in labels.items()],
+        ignore_conflicts=True,
+    )
+    ids = {}
+    names_list = list(labels)
+    for start in range(0, len(names_list), 500):
+        ids.update(source.terms().filter(name__in=names_list[start:start + 500]).values_list('name', 'pk'))
+    return {text: ids.get(name) for text, name in names.items()}
+
+
+# --- Comptage des cas par terme -------------------------------------------------------------
+
+def _approved(case_id):
+    return ClinicalCase.objects.filter(pk=case_id, status=ClinicalCase.Status.APPROUVE).exists()
+
+
+def term_added(source, case_id, term_id, row_id):
+    """La ligne `row_id` emploie désormais `term_id` : +1 si c'est la première ligne du cas (approuvé) à le faire."""
+    if term_id is None or not _approved(case_id):
+        return
+    if not source.model.objects.filter(term_id=term_id, case_id=case_id).exclude(pk=row_id).exists():
+        source.term_model.objects.filter(pk=term_id).update(case_count=F('case_count') + 1)
+
+
+def term_removed(source, case_id, term_id):
+    """Une ligne du cas (approuvé) n'emploie plus `term_id` : -1 s'il ne reste aucune ligne du cas qui l'emploie."""
+    if term_id is None or not _approved(case_id):
+        return
+    if not source.model.objects.filter(term_id=term_id, case_id=case_id).exists():
+        source.term_model.objects.filter(pk=term_id, case_count__gt=0).update(case_count=F('case_count') - 1)
+
+
+def cases_approval_changed(case_ids, approved):
+    """
+    Les cas `case_ids` viennent d'être approuvés (`approved`) ou ne le sont plus : chaque terme
+    qu'ils emploient gagne ou perd autant de cas. Une agrégation et une mise à jour par effectif.
+    """
+    for source in SOURCES.values():
+        counts = (
+            source.model.objects.filter(case_id__in=list(case_ids), term__isnull=False).order_by()
+            .values_list('term_id').annotate(n=Count('case_id', distinct=True))
+        )
+        by_count = {}
+        for term_id, n in counts:
+            by_count.setdefault(n, []).append(term_id)
+        for n, term_ids in by_count.items():
+            change = F('case_count') + n if approved else Greatest(F('case_count') - n, Value(0))
+            source.term_model.objects.filter(pk__in=term_ids).update(case_count=change)
+
+
+def recount(source):
+    """Recalcule `case_count` de tous les termes de la source (une agrégation GROUP BY)."""
+    counts = dict(
+        source.model.objects.filter(term__isnull=False, case__status=ClinicalCase.Status.APPROUVE)
+        .order_by().values_list('term_id')
+        .annotate(n=Count('case_id', distinct=True))
+    )
+    with transaction.atomic():
+        source.terms().exclude(pk__in=list(counts)).exclude(case_count=0).update(case_count=0)
+        current = dict(source.terms().filter(pk__in=list(counts)).values_list('pk', 'case_count'))
+        _update_column(source.term_model, 'case_count', [
+            (count, term_id) for term_id, count in counts.items() if current.get(term_id) != count
+        ])
+    return len(counts)
+
+
+def backfill(source, batch_size=5000, everything=False, progress=None):
+    """
+    Rattache à leur terme les lignes qui n'en ont pas (toutes si `everything`, après une
+    évolution du normaliseur), puis recompte les cas par terme. Renvoie le nombre de lignes traitées.
+    """
+    queryset = source.model.objects.all() if everything else source.model.objects.filter(term__isnull=True)
+    total, last_id = 0, 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', source.field, 'term_id')[:batch_size])
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        terms = resolve_terms(source, [text for _, text, _ in rows])
+        _update_column(source.model, 'term_id', [
+            (terms[text], row_id) for row_id, text, term_id in rows if terms[text] != term_id
+        ])
+        total += len(rows)
+        if progress:
+            progress(total)
+    recount(source)
+    return total
+
+
+def _update_column(model, attname, values):
+    # UPDATE paramétré en executemany (cf. evaluation.logic.submissions) : pas de signaux, pas de CASE WHEN
+    if not values:
+        return
+    quote = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} = %s WHERE {} = %s'.format(
+        quote(model._meta.db_table), quote(model._meta.get_field(attname).column), quote(model._meta.pk.column),
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, values)
+
+
+# --- Lecture -------------------------------------------------------------------------------
+
+def filter_cases(queryset, symptom_ids=(), exam_ids=()):
+    """Cas présentant tous les symptômes et examens donnés (identifiants de termes)."""
+    for term_id in symptom_ids:
+        queryset = queryset.filter(pk__in=Symptom.objects.filter(term_id=term_id).values('case_id'))
+    for term_id in exam_ids:
+        # Un ExamTerm n'a de lignes que dans la table de son type : l'autre sous-requête est vide
+        queryset = queryset.filter(
+            Q(pk__in=ComplementaryExam.objects.filter(term_id=term_id).values('case_id'))
+            | Q(pk__in=PhysicalFinding.objects.filter(term_id=term_id).values('case_id'))
+        )
+    return queryset
+
+
+def facets(term_model, kind=None, prefix=None, limit=50):
+    """Termes les plus employés, avec leur nombre de cas approuvés : une lecture de l'index sur case_count."""
+    queryset = term_model.objects.filter(case_count__gt=0)
+    if kind:
+        queryset = queryset.filter(kind=kind)
+    if prefix:
+        queryset = queryset.filter(name__startswith=normalize_term(prefix, EXAM_ABBREVIATIONS if kind else None))
+    return list(queryset.order_by('-case_count', 'name').values('id', 'label', 'case_count')[:limit])
@@ -0,0 +1,37 @@
+# backend/cases/management/commands/backfill_vocabulary.py
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from cases.logic.vocabulary import SOURCES, backfill, recount
+
+
+class Command(BaseCommand):
+    help = (
+        "Rattache les symptômes, examens complémentaires et examens physiques à leur terme canonique "
+        "(SymptomTerm, ExamTerm) et recalcule le nombre de cas par terme. À lancer après la migration "
+        "du vocabulaire, après un bulk_create, ou avec --all après une évolution du normaliseur."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', dest='everything',
+                            help="Re-normalise toutes les lignes, pas seulement celles sans terme.")
+        parser.add_argument('--recount-only', action='store_true',
+                            help="Ne rattache aucune ligne, recalcule seulement les nombres de cas.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        for model, source in SOURCES.items():
+            start = perf_counter()
+            if options['recount_only']:
+                terms = recount(source)
+                self.stdout.write(f"{model.__name__} : {terms} terme(s) recomptés en {perf_counter() - start:.2f} s.")
+                continue
+            rows = backfill(
+                source, batch_size=options['batch_size'], everything=options['everything'],
+                progress=lambda done, name=model.__name__: self.stdout.write(f"  {name} : {done} ligne(s)..."),
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__} : {rows} ligne(s) rattachées, {source.terms().count()} terme(s), "
+                f"en {perf_counter() - start:.2f} s."
+            ))
@@ -0,0 +1,76 @@
+# backend/cases/management/commands/dataset_stats.py
+import json
+
+from django.core.management.base import BaseCommand
+
+from cases.logic.dataset_stats import compute_stats
+from cases.models import ClinicalCase
+from core.db_routers import use_replica
+
+
+class Command(BaseCommand):
+    help = (
+        "Statistiques du jeu de cas : statuts et taux d'approbation, catégories, âge/sexe, "
+        "symptômes et sévérité. Les colonnes lues sont mises en cache et rafraîchies par updated_at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', type=str, choices=['table', 'json'], default='table',
+                            help='Format de sortie. Par défaut : table.')
+        parser.add_argument('--status', type=str, choices=ClinicalCase.Status.values,
+                            help='Limite les statistiques par cas à ce statut. Par défaut : tous.')
+        parser.add_argument('--top', type=int, default=20, help='Nombre de symptômes listés. Par défaut : 20.')
+        parser.add_argument('--full-refresh', action='store_true',
+                            help='Ignore le cache et relit toutes les colonnes.')
+        parser.add_argument('--output', type=str, help='Écrit le résultat dans ce fichier plutôt que sur la sortie.')
+
+    def handle(self, *args, **options):
+        with use_replica():
+            stats = compute_stats(status=options['status'], full_refresh=options['full_refresh'],
+                                  top_symptoms=options['top'])
+        if options['format'] == 'json':
+            output = json.dumps(stats, ensure_ascii=False, indent=4)
+        else:
+            output = self._table(stats)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Statistiques sauvegardées dans : {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def _rows(title, headers, rows):
+        widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+        line = '  '.join('{:<%d}' % width for width in widths)
+        return [f"\n{title}", line.format(*headers), line.format(*('-' * width for width in widths))] + [
+            line.format(*(str(value) for value in row)) for row in rows
+        ]
+
+    def _table(self, stats):
+        approval = stats['approval_rate']
+        lines = [
+            f"Cas : {stats['cases']} ({stats['computed_over']} dans le périmètre"
+            f"{', statut ' + stats['status_filter'] if stats['status_filter'] else ''})",
+            f"Taux d'approbation (approuvés / décidés) : {'n/a' if approval is None else f'{approval:.1%}'}",
+        ]
+        lines += self._rows('Statuts', ['statut', 'cas'], list(stats['by_status'].items()))
+        lines += self._rows('Catégories', ['catégorie', 'cas'],
+                            [(c['name'], c['cases']) for c in stats['categories']]
+                            + [('(sans catégorie)', stats['uncategorized'])])
+        histogram = stats['age_histogram']
+        lines += self._rows('Âge / sexe', ['âge', 'Homme', 'Femme', 'Autre'], [
+            (label, histogram['Homme'][i], histogram['Femme'][i], histogram['Autre'][i])
+            for i, label in enumerate(histogram['bins'])
+        ])
+        age = stats['age']
+        if age['count']:
+            lines.append(f"Âge : moyenne {age['mean']}, médiane {age['median']}, p90 {age['p90']}")
+        lines += self._rows(f"Symptômes ({stats['distinct_symptoms']} distincts)", ['symptôme', 'cas', 'degré moyen'],
+                            [(s['name'], s['cases'], s['mean_degre']) for s in stats['symptoms']])
+        degre = stats['degre']
+        if degre['count']:
+            lines.append(f"\nDegré : moyenne {degre['mean']}, médiane {degre['median']}, p90 {degre['p90']} "
+                         f"(histogramme 0-10 : {degre['histogram']})")
+        lines.append(f"\n{stats['refreshed_cases']} cas relus depuis le dernier calcul.")
+        return '\n'.join(lines)
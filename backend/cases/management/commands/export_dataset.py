@@ -5,7 +5,10 @@ import json
 import os
 from datetime import datetime
 from django.core.management.base import BaseCommand
+from cases.logic import taxonomy
+from cases.logic.snapshot import iter_case_documents
 from cases.models import ClinicalCase
+from core.db_routers import use_replica
 
 
 class Command(BaseCommand):
@@ -31,8 +34,18 @@ class Command(BaseCommand):
             default='approuve',
             help='Statut des cas à exporter. Par défaut : "approuve".'
         )
+        parser.add_argument(
+            '--category',
+            type=int,
+            help="N'exporte que les cas de cette catégorie (id), sous-catégories comprises."
+        )
 
     def handle(self, *args, **options):
+        # L'export ne fait que lire : il est servi par le réplica lorsqu'il est configuré
+        with use_replica():
+            self._handle_export(options)
+
+    def _handle_export(self, options):
         file_format = options['format']
         output_path = options['output_path']
         status = options['status']
@@ -40,17 +53,15 @@ class Command(BaseCommand):
         self.stdout.write(f"Début de l'exportation des cas '{status}' au format {file_format}...")
 
 
-        cases_to_export = ClinicalCase.objects.filter(status=status).prefetch_related(
-            'symptoms',
-            'history_entries',
-            'current_treatments',
-            'exams',
-            'physical_findings',
-            'diagnoses'
-        )
+        # Chaque cas est lu depuis son document dénormalisé : une seule table à parcourir
+        cases_to_export = ClinicalCase.objects.filter(status=status)
+        if options['category'] is not None:
+            cases_to_export = taxonomy.filter_cases(cases_to_export, options['category'])
+        # Chemin complet de chaque catégorie (« Cardiologie > Rythmologie »), calculé une fois
+        self.category_paths = taxonomy.category_paths()
 
         if not cases_to_export.exists():
-            self.stdout.write(self.style.WARNING("Aucun cas clinique avec le statut '{status}' n'a été trouvé."))
+            self.stdout.write(self.style.WARNING(f"Aucun cas clinique avec le statut '{status}' n'a été trouvé."))
             return
 
 
@@ -70,11 +81,14 @@ class Command(BaseCommand):
 
 
 
+    def _category_paths(self, case):
+        return [self.category_paths.get(c['id'], c['name']) for c in case['categories']]
+
     def _export_to_csv(self, queryset, file_path):
         """Exporte les données dans un fichier CSV en aplatissant les relations."""
         print("--- EXECUTION DE LA VERSION CORRIGÉE DU CODE ---")
         headers = [
-            'id', 'case_title', 'case_summary', 'age', 'sexe',
+            'id', 'case_title', 'case_summary', 'age', 'sexe', 'categories',
             'symptoms_list', 'medical_history_json', 'diagnoses_list'
         ]
 
@@ -82,28 +96,27 @@ class Command(BaseCommand):
             writer = csv.writer(f)
             writer.writerow(headers)
 
-            for case in queryset:
+            for case in iter_case_documents(queryset):
 
-                symptoms_all = case.symptoms.all()
-                symptoms_str = " | ".join([s.nom for s in symptoms_all]) if symptoms_all else ""
+                symptoms_str = " | ".join([s['nom'] for s in case['symptoms']])
 
-                diagnoses_all = case.diagnoses.all()
-                diagnoses_str = " | ".join([d.description for d in diagnoses_all]) if diagnoses_all else ""
+                diagnoses_str = " | ".join([d['description'] for d in case['diagnoses']])
 
                 history_list = [
-                    {'type': h.get_type_display(), 'description': h.description}
-                    for h in case.history_entries.all()
+                    {'type': h['type_display'], 'description': h['description']}
+                    for h in case['history']
                 ]
 
                 history_json_str = json.dumps(history_list, ensure_ascii=False) if history_list else ""
 
 
                 row_data = [
-                    case.id,
-                    case.case_title,
-                    case.case_summary,
-                    case.age,
-                    case.sexe,
+                    case['id'],
+                    case['case_title'],
+                    case['case_summary'],
+                    case['age'],
+                    case['sexe'],
+                    " | ".join(self._category_paths(case)),
                     symptoms_str,
                     history_json_str,
                     diagnoses_str
@@ -117,25 +130,25 @@ class Command(BaseCommand):
         - pretty=False (JSONL) : Un objet JSON compact par ligne, pour les machines.
         """
         dataset_list = []
-        for case in queryset:
+        for case in iter_case_documents(queryset):
             case_data = {
-                'id': case.id,
-                'source_fultang_id': case.source_fultang_id,
-                'case_title': case.case_title,
-                'case_summary': case.case_summary,
-                'learning_objectives': case.learning_objectives,
-                'motif_consultation': case.motif_consultation,
-                'age': case.age,
-                'sexe': case.sexe,
-                'mode_de_vie': case.mode_de_vie,
-                'symptoms': [{'nom': s.nom, 'localisation': s.localisation, 'degre': s.degre} for s in
-                             case.symptoms.all()],
-                'history': [{'type': h.get_type_display(), 'description': h.description} for h in
-                            case.history_entries.all()],
-                'exams': [{'nom': e.nom, 'resultat': e.resultat} for e in case.exams.all()],
-                'physical_findings': [{'nom_examen': p.nom_examen, 'resultat_observation': p.resultat_observation} for p
-                                      in case.physical_findings.all()],
-                'diagnoses': [{'description': d.description, 'is_final': d.is_final} for d in case.diagnoses.all()],
+                'id': case['id'],
+                'source_fultang_id': case['source_fultang_id'],
+                'case_title': case['case_title'],
+                'case_summary': case['case_summary'],
+                'learning_objectives': case['learning_objectives'],
+                'motif_consultation': case['motif_consultation'],
+                'age': case['age'],
+                'sexe': case['sexe'],
+                'categories': self._category_paths(case),
+                'mode_de_vie': case['mode_de_vie'],
+                'symptoms': [{'nom': s['nom'], 'localisation': s['localisation'], 'degre': s['degre']} for s in
+                             case['symptoms']],
+                'history': [{'type': h['type_display'], 'description': h['description']} for h in
+                            case['history']],
+                'exams': case['exams'],
+                'physical_findings': case['physical_findings'],
+                'diagnoses': case['diagnoses'],
             }
             dataset_list.append(case_data)
 
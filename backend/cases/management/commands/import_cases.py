@@ -1,17 +1,26 @@
 # backend/cases/management/commands/import_cases.py
 import argparse
+import hashlib
+import time
 
 import requests
 import json
 import os
 import google.generativeai as genai
+from django.core.cache import caches
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.db import transaction
 
+from cases.logic import taxonomy
+from cases.logic.dedup import get_dedup_index, normalize_notes
+from cases.logic.import_telemetry import ImportTelemetry, estimate_tokens
+from cases.logic.snapshot import defer_snapshot_refresh
 from cases.models import ClinicalCase, Symptom, MedicalHistory, Category, CurrentTreatment, ComplementaryExam, \
     PhysicalFinding, Diagnosis
 
+LLM_MODEL = 'gemini-flash-latest'
+
 
 class Command(BaseCommand):
     help = 'Importe de nouveaux cas cliniques depuis Fultang, les structure via Gemini et les sauvegarde.'
@@ -23,9 +32,43 @@ class Command(BaseCommand):
             action='store_true',
             help='Utilise le fichier de données mock au lieu de l\'API Fultang réelle.'
         )
+        parser.add_argument(
+            '--dedupe',
+            choices=['off', 'flag', 'skip'],
+            default='flag',
+            help="Quasi-doublons des notes déjà importées : 'flag' importe le cas en le liant au cas existant "
+                 "(duplicate_of), 'skip' l'ignore sans appeler le LLM, 'off' désactive la détection. Par défaut : flag."
+        )
+        parser.add_argument(
+            '--dedupe-threshold',
+            type=float,
+            default=None,
+            help='Similarité à partir de laquelle une note est un quasi-doublon. Par défaut : CASES_DEDUP_THRESHOLD.'
+        )
+        parser.add_argument(
+            '--no-llm-cache',
+            action='store_false',
+            dest='llm_cache',
+            help="N'utilise pas les réponses du LLM déjà obtenues pour un prompt identique."
+        )
+        parser.add_argument(
+            '--report-dir',
+            type=str,
+            default=None,
+            help='Répertoire du rapport JSON de télémétrie. Par défaut : CASES_IMPORT_REPORT_DIR.'
+        )
+        parser.add_argument(
+            '--no-report',
+            action='store_false',
+            dest='report',
+            help="N'écrit pas le rapport JSON (le résumé reste affiché)."
+        )
 
     def handle(self, *args, **options):
         self.stdout.write("Début de l'importation des cas cliniques (Workflow Optimiste)...")
+        self.telemetry = ImportTelemetry(price_input=settings.CASES_IMPORT_LLM_PRICE_INPUT,
+                                         price_output=settings.CASES_IMPORT_LLM_PRICE_OUTPUT)
+        self.llm_cache = caches['import_llm'] if options.get('llm_cache', True) else None
 
 
         try:
@@ -35,193 +78,289 @@ class Command(BaseCommand):
             return
 
 
-        existing_categories_obj = Category.objects.all()
-        existing_categories_names = [cat.name for cat in existing_categories_obj]
-        self.stdout.write(f"{len(existing_categories_names)} catégories officielles chargées pour le contexte du LLM.")
+        # Hiérarchie compacte : « Cardiologie (Rythmologie, Coronaropathies); Pneumologie »
+        existing_categories_tree = taxonomy.render_taxonomy()
+        self.stdout.write(f"{Category.objects.count()} catégories officielles chargées pour le contexte du LLM.")
 
 
         fultang_cases_raw = []
-        if options['mock']:
-            self.stdout.write(self.style.WARNING("Mode MOCK activé. Chargement des données depuis le fichier local."))
-            try:
-                fixture_path = os.path.join(settings.BASE_DIR, 'cases', 'fixtures', 'mock_fultang_api.json')
-                with open(fixture_path, 'r', encoding='utf-8') as f:
-                    fultang_cases_raw = json.load(f)
-            except FileNotFoundError:
-                self.stderr.write(self.style.ERROR(f"Fichier mock non trouvé à l'emplacement: {fixture_path}"))
-                return
-            except json.JSONDecodeError:
-                self.stderr.write(self.style.ERROR("Le fichier mock contient du JSON invalide."))
-                return
-        else:
-            self.stdout.write("Mode LIVE. Appel de l'API Fultang réelle.")
-            try:
-                headers = {'Authorization': f'Bearer {settings.FULTANG_API_KEY}'}
-                response = requests.get(f"{settings.FULTANG_API_URL}/new-cases", headers=headers)
-                response.raise_for_status()
-                fultang_cases_raw = response.json()
-            except requests.RequestException as e:
-                self.stderr.write(self.style.ERROR(f"Erreur lors de la récupération des données de Fultang: {e}"))
-                return
+        with self.telemetry.stage('fetch'):
+            if options['mock']:
+                self.stdout.write(self.style.WARNING("Mode MOCK activé. Chargement des données depuis le fichier local."))
+                try:
+                    fixture_path = os.path.join(settings.BASE_DIR, 'cases', 'fixtures', 'mock_fultang_api.json')
+                    with open(fixture_path, 'r', encoding='utf-8') as f:
+                        fultang_cases_raw = json.load(f)
+                except FileNotFoundError:
+                    self.stderr.write(self.style.ERROR(f"Fichier mock non trouvé à l'emplacement: {fixture_path}"))
+                    return
+                except json.JSONDecodeError:
+                    self.stderr.write(self.style.ERROR("Le fichier mock contient du JSON invalide."))
+                    return
+            else:
+                self.stdout.write("Mode LIVE. Appel de l'API Fultang réelle.")
+                try:
+                    headers = {'Authorization': f'Bearer {settings.FULTANG_API_KEY}'}
+                    response = requests.get(f"{settings.FULTANG_API_URL}/new-cases", headers=headers)
+                    response.raise_for_status()
+                    fultang_cases_raw = response.json()
+                except requests.RequestException as e:
+                    self.stderr.write(self.style.ERROR(f"Erreur lors de la récupération des données de Fultang: {e}"))
+                    return
 
         self.stdout.write(f"{len(fultang_cases_raw)} nouveaux cas trouvés.")
 
+        dedupe = options.get('dedupe', 'flag')
+        dedup_index = get_dedup_index() if dedupe != 'off' else None
+        threshold = options.get('dedupe_threshold') or settings.CASES_DEDUP_THRESHOLD
+
 
         for case_data_raw in fultang_cases_raw:
             fultang_id = case_data_raw.get('id')
             if not fultang_id:
                 self.stderr.write(self.style.WARNING("Un cas sans ID a été trouvé. Ignoré."))
+                self.telemetry.end_case('missing_id')
                 continue
 
-            if ClinicalCase.objects.filter(source_fultang_id=fultang_id).exists():
-                self.stdout.write(f"Le cas {fultang_id} existe déjà. Ignoré.")
-                continue
+            self.telemetry.begin_case(fultang_id)
+            outcome, case_id = self.import_case(fultang_id, case_data_raw, existing_categories_tree,
+                                                dedup_index, dedupe, threshold)
+            self.telemetry.end_case(outcome, case_id)
+            if dedup_index is not None and dedup_index.pending >= settings.CASES_DEDUP_SAVE_EVERY:
+                # Un import interrompu ne perd que les dernières notes (rebuild_dedup_index les retrouve)
+                dedup_index.save()
+
+
+        if dedup_index is not None:
+            # Les notes importées restent indexées pour les prochains imports
+            dedup_index.save()
+
+        self.stdout.write("Télémétrie de l'import :")
+        for line in self.telemetry.summary_lines():
+            self.stdout.write(f"  {line}")
+        if options.get('report', True):
+            parameters = {'mock': options['mock'], 'dedupe': dedupe, 'threshold': threshold,
+                          'llm_cache': self.llm_cache is not None, 'model': LLM_MODEL}
+            report_path = self.telemetry.write(options.get('report_dir') or settings.CASES_IMPORT_REPORT_DIR, parameters)
+            self.stdout.write(f"Rapport de télémétrie sauvegardé dans : {report_path}")
+
+    def import_case(self, fultang_id, case_data_raw, existing_categories_tree, dedup_index, dedupe, threshold):
+        """Importe un cas Fultang. Renvoie (issue, id du cas créé ou None)."""
+        if ClinicalCase.objects.filter(source_fultang_id=fultang_id).exists():
+            self.stdout.write(f"Le cas {fultang_id} existe déjà. Ignoré.")
+            return 'exists', None
+
+        signature, duplicate = None, None
+        if dedup_index is not None:
+            with self.telemetry.stage('dedupe'):
+                signature = dedup_index.signature(case_data_raw.get('raw_notes', ''))
+                duplicate = self.find_duplicate(dedup_index, signature, threshold)
+            if duplicate and dedupe == 'skip':
+                self.stdout.write(self.style.WARNING(
+                    f"Le cas {fultang_id} est un quasi-doublon du cas #{duplicate[0]} "
+                    f"(similarité {duplicate[1]:.2f}). Ignoré."
+                ))
+                return 'duplicate_skipped', None
+            if duplicate:
+                self.stdout.write(self.style.WARNING(
+                    f"Le cas {fultang_id} est un quasi-doublon du cas #{duplicate[0]} "
+                    f"(similarité {duplicate[1]:.2f}) : il sera signalé."
+                ))
 
-            self.stdout.write(f"Traitement du cas {fultang_id} avec le LLM...")
+        self.stdout.write(f"Traitement du cas {fultang_id} avec le LLM...")
 
-            structured_data = self.get_structured_data_from_llm(case_data_raw, existing_categories_names)
+        structured_data = self.get_structured_data_from_llm(case_data_raw, existing_categories_tree)
 
-            if not structured_data:
-                self.stderr.write(self.style.ERROR(f"Échec de la structuration des données pour le cas {fultang_id}."))
-                continue
+        if not structured_data:
+            self.stderr.write(self.style.ERROR(f"Échec de la structuration des données pour le cas {fultang_id}."))
+            return 'llm_failed', None
 
 
-            llm_categories_names = structured_data.get('categories', [])
-            final_categories_to_assign = []
+        llm_categories_names = structured_data.get('categories', [])
+        final_categories_to_assign = []
 
+        with self.telemetry.stage('categories'):
             for cat_name in llm_categories_names:
-                clean_cat_name = cat_name.strip()
-                if not clean_cat_name:
+                # Une nouvelle sous-spécialité arrive sous la forme « Parent > Nouvelle catégorie »
+                path = [part.strip() for part in cat_name.split('>') if part.strip()]
+                if not path:
                     continue
+                clean_cat_name = path[-1]
+                parent = Category.objects.filter(name__iexact=path[-2]).first() if len(path) > 1 else None
 
                 category_obj, created = Category.objects.get_or_create(
                     name__iexact=clean_cat_name,
-                    defaults={'name': clean_cat_name}
+                    defaults={'name': clean_cat_name, 'parent': parent}
                 )
 
                 if created:
                     self.stdout.write(self.style.SUCCESS(f"Nouvelle catégorie '{clean_cat_name}' créée à la volée."))
+                    self.telemetry.count('categories_created')
 
                 final_categories_to_assign.append(category_obj)
 
-            try:
-                with transaction.atomic():
-
-                    case_instance = ClinicalCase.objects.create(
-                        source_fultang_id=fultang_id,
-                        case_title=structured_data.get('case_title', 'Titre manquant'),
-                        case_summary=structured_data.get('case_summary', ''),
-                        learning_objectives=structured_data.get('learning_objectives', ''),
-                        motif_consultation=structured_data.get('motif_consultation', ''),
-                        age=structured_data.get('age'),
-                        sexe=structured_data.get('sexe'),
-
-                        #TODO Vérifier si il n'ya pas d'autres champs à ajouter
-
-                        raw_llm_suggestions={'suggested_categories': llm_categories_names}
-                    )
-
-
-                    if final_categories_to_assign:
-                        case_instance.categories.set(final_categories_to_assign)
-
-
-                    for symptom_data in structured_data.get('symptoms', []):
-                        Symptom.objects.create(case=case_instance, **symptom_data)
-
-
-                    for history_data in structured_data.get('history_entries', []):
-                        MedicalHistory.objects.create(case=case_instance, **history_data)
+        try:
+            # Le document dénormalisé du cas n'est reconstruit qu'une fois, avant le commit
+            with self.telemetry.stage('db_write'), transaction.atomic(), defer_snapshot_refresh():
+
+                case_instance = ClinicalCase.objects.create(
+                    source_fultang_id=fultang_id,
+                    case_title=structured_data.get('case_title', 'Titre manquant'),
+                    case_summary=structured_data.get('case_summary', ''),
+                    learning_objectives=structured_data.get('learning_objectives', ''),
+                    motif_consultation=structured_data.get('motif_consultation', ''),
+                    age=structured_data.get('age'),
+                    sexe=structured_data.get('sexe'),
+
+                    #TODO Vérifier si il n'ya pas d'autres champs à ajouter
+
+                    raw_llm_suggestions={'suggested_categories': llm_categories_names},
+                    duplicate_of_id=duplicate[0] if duplicate else None,
+                    duplicate_similarity=duplicate[1] if duplicate else None,
+                    source_notes=' '.join(normalize_notes(case_data_raw.get('raw_notes', ''))),
+                )
 
 
-                    for treatment_data in structured_data.get('current_treatments', []):
-                        CurrentTreatment.objects.create(case=case_instance, **treatment_data)
+                if final_categories_to_assign:
+                    case_instance.categories.set(final_categories_to_assign)
 
 
-                    for exam_data in structured_data.get('exams', []):
-                        ComplementaryExam.objects.create(case=case_instance, **exam_data)
+                for symptom_data in structured_data.get('symptoms', []):
+                    Symptom.objects.create(case=case_instance, **symptom_data)
 
 
-                    for finding_data in structured_data.get('physical_findings', []):
-                        PhysicalFinding.objects.create(case=case_instance, **finding_data)
+                for history_data in structured_data.get('history_entries', []):
+                    MedicalHistory.objects.create(case=case_instance, **history_data)
 
 
-                    for diagnosis_data in structured_data.get('diagnoses', []):
-                        Diagnosis.objects.create(case=case_instance, **diagnosis_data)
+                for treatment_data in structured_data.get('current_treatments', []):
+                    CurrentTreatment.objects.create(case=case_instance, **treatment_data)
 
 
-                self.stdout.write(self.style.SUCCESS(
-                    f"Cas {fultang_id} importé (ID: {case_instance.id}). "
-                    f"Catégories assignées: {[c.name for c in final_categories_to_assign]}."
-                ))
+                for exam_data in structured_data.get('exams', []):
+                    ComplementaryExam.objects.create(case=case_instance, **exam_data)
 
-            except Exception as e:
-                self.stderr.write(self.style.ERROR(f"Erreur lors de la sauvegarde du cas {fultang_id} en BDD: {e}"))
 
-                self.stdout.write(self.style.SUCCESS(
-                    f"Cas {fultang_id} importé (ID: {case_instance.id}). "
-                    f"Catégories assignées: {[c.name for c in final_categories_to_assign]}."
-                ))
+                for finding_data in structured_data.get('physical_findings', []):
+                    PhysicalFinding.objects.create(case=case_instance, **finding_data)
 
-            except Exception as e:
-                self.stderr.write(self.style.ERROR(f"Erreur lors de la sauvegarde du cas {fultang_id} en BDD: {e}"))
 
+                for diagnosis_data in structured_data.get('diagnoses', []):
+                    Diagnosis.objects.create(case=case_instance, **diagnosis_data)
 
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Erreur lors de la sauvegarde du cas {fultang_id} en BDD: {e}"))
+            return 'db_failed', None
+
+        if signature is not None:
+            dedup_index.add(case_instance.id, signature)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Cas {fultang_id} importé (ID: {case_instance.id}). "
+            f"Catégories assignées: {[c.name for c in final_categories_to_assign]}."
+        ))
+        return 'imported', case_instance.id
+
+    def find_duplicate(self, dedup_index, signature, threshold):
+        """(id du cas existant le plus proche, similarité) au-delà du seuil, ou None."""
+        if signature is None:
+            return None
+        matches = dedup_index.query(signature, threshold)
+        if not matches:
+            return None
+        # L'index peut survivre à la suppression d'un cas
+        existing = set(ClinicalCase.objects.filter(pk__in=[case_id for case_id, _ in matches]).values_list('pk', flat=True))
+        return next(((case_id, similarity) for case_id, similarity in matches if case_id in existing), None)
 
     def get_structured_data_from_llm(self, raw_data, categories_list_str):
         """
         Envoie les données brutes à Gemini et attend un JSON structuré en retour.
+        Une réponse illisible ou une erreur de l'API est retentée (CASES_IMPORT_LLM_RETRIES fois,
+        attente exponentielle) ; une réponse déjà obtenue pour le même prompt est relue dans le cache.
         """
+        with self.telemetry.stage('prompt'):
+            prompt = f"""
+                Tâche : Analyser les données cliniques brutes suivantes et les structurer au format JSON.
+
+                Contexte Important : Voici les catégories médicales officielles déjà existantes, les sous-catégories entre parenthèses après leur parente :
+                {categories_list_str}
+
+                Instructions :
+                1. Lis attentivement les données cliniques brutes.
+                2. Remplis tous les champs du JSON de sortie en te basant exclusivement sur les données fournies. Si une information n'est pas présente, laisse le champ comme une liste vide `[]` ou une chaîne vide `""`.
+                3. Pour le champ "categories", attribue une ou plusieurs catégories PERTINENTES à ce cas en choisissant EXCLUSIVEMENT dans la liste fournie ci-dessus. Donne le nom seul de la catégorie la plus précise qui convient (une sous-catégorie plutôt que sa parente).
+                4. EXCEPTION : Si, et seulement si, tu estimes avec une grande certitude que le cas appartient à une nouvelle catégorie médicale non présente dans la liste, tu peux l'ajouter dans le champ "categories". S'il s'agit d'une sous-spécialité d'une catégorie existante, écris-la sous la forme "Catégorie parente > Nouvelle catégorie".
+
+                Format de sortie JSON attendu (uniquement le JSON) :
+                {{
+                  "case_title": "string",
+                  "categories": ["string", "string"],
+                  "case_summary": "string",
+                  "learning_objectives": "string",
+                  "motif_consultation": "string",
+                  "age": integer,
+                  "sexe": "string (Homme/Femme)",
+                  "symptoms": [{{ "nom": "string", "localisation": "string", "date_debut": "string", "degre": integer }}],
+                  "history_entries": [{{ "type": "string (medical/chirurgical/familial/allergie)", "description": "string" }}],
+                  "current_treatments": [{{ "nom": "string", "posologie": "string" }}],
+                  "exams": [{{ "nom": "string", "resultat": "string" }}],
+                  "physical_findings": [{{ "nom_examen": "string", "resultat_observation": "string" }}],
+                  "diagnoses": [{{ "description": "string", "is_final": boolean }}]
+                }}
+
+                Données brutes :
+                {raw_data}
+
+                JSON de sortie :
+                """
+            cache_key = 'import_llm:' + hashlib.sha256(f'{LLM_MODEL}\n{prompt}'.encode()).hexdigest()
+
+        cached = self.llm_cache.get(cache_key) if self.llm_cache is not None else None
+        if cached is not None:
+            with self.telemetry.stage('parse'):
+                data = json.loads(cached['text'])
+            self.telemetry.record_llm(cached['prompt_tokens'], cached['response_tokens'], cached=True)
+            return data
+
+        retries = settings.CASES_IMPORT_LLM_RETRIES
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(settings.CASES_IMPORT_LLM_RETRY_BACKOFF * 2 ** (attempt - 1))
+            self.telemetry.record_attempt(retry=attempt > 0)
+            response = None
+            try:
+                with self.telemetry.stage('llm'):
+                    model = genai.GenerativeModel(
+                        LLM_MODEL,
+                        generation_config={"response_mime_type": "application/json"}
+                    )
+                    response = model.generate_content(prompt)
+                    json_response_text = response.text
+                prompt_tokens, response_tokens, estimated = self._token_counts(response, prompt, json_response_text)
+                self.telemetry.record_llm(prompt_tokens, response_tokens, estimated=estimated)
 
-        prompt = f"""
-            Tâche : Analyser les données cliniques brutes suivantes et les structurer au format JSON.
-
-            Contexte Important : Voici la liste des catégories médicales officielles déjà existantes :
-            [{categories_list_str}]
-
-            Instructions :
-            1. Lis attentivement les données cliniques brutes.
-            2. Remplis tous les champs du JSON de sortie en te basant exclusivement sur les données fournies. Si une information n'est pas présente, laisse le champ comme une liste vide `[]` ou une chaîne vide `""`.
-            3. Pour le champ "categories", attribue une ou plusieurs catégories PERTINENTES à ce cas en choisissant EXCLUSIVEMENT dans la liste fournie ci-dessus.
-            4. EXCEPTION : Si, et seulement si, tu estimes avec une grande certitude que le cas appartient à une nouvelle catégorie médicale non présente dans la liste, tu peux l'ajouter dans le champ "categories".
-
-            Format de sortie JSON attendu (uniquement le JSON) :
-            {{
-              "case_title": "string",
-              "categories": ["string", "string"],
-              "case_summary": "string",
-              "learning_objectives": "string",
-              "motif_consultation": "string",
-              "age": integer,
-              "sexe": "string (Homme/Femme)",
-              "symptoms": [{{ "nom": "string", "localisation": "string", "date_debut": "string", "degre": integer }}],
-              "history_entries": [{{ "type": "string (medical/chirurgical/familial/allergie)", "description": "string" }}],
-              "current_treatments": [{{ "nom": "string", "posologie": "string" }}],
-              "exams": [{{ "nom": "string", "resultat": "string" }}],
-              "physical_findings": [{{ "nom_examen": "string", "resultat_observation": "string" }}],
-              "diagnoses": [{{ "description": "string", "is_final": boolean }}]
-            }}
-
-            Données brutes :
-            {raw_data}
-
-            JSON de sortie :
-            """
-
-        try:
-
-            model = genai.GenerativeModel(
-                'gemini-flash-latest',
-                generation_config={"response_mime_type": "application/json"}
-            )
-            response = model.generate_content(prompt)
-
-            json_response_text = response.text
+                with self.telemetry.stage('parse'):
+                    data = json.loads(json_response_text)
 
-            return json.loads(json_response_text)
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(
+                    f"Erreur lors de l'appel à l'API Gemini (tentative {attempt + 1}/{retries + 1}): {e}"
+                ))
+                if response is not None:
+                    self.stderr.write(self.style.ERROR(f"Réponse brute de Gemini : {getattr(response, 'text', '')}"))
+                continue
 
-        except Exception as e:
-            self.stderr.write(self.style.ERROR(f"Erreur lors de l'appel à l'API Gemini: {e}"))
-            if 'response' in locals():
-                self.stderr.write(self.style.ERROR(f"Réponse brute de Gemini : {response.text}"))
-            return None
\ No newline at end of file
+            if self.llm_cache is not None:
+                self.llm_cache.set(cache_key, {'text': json_response_text, 'prompt_tokens': prompt_tokens,
+                                               'response_tokens': response_tokens})
+            return data
+        return None
+
+    def _token_counts(self, response, prompt, text):
+        """(tokens du prompt, tokens de la réponse, estimés ?) depuis usage_metadata, estimés à défaut."""
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', None)
+        response_tokens = getattr(usage, 'candidates_token_count', None)
+        if prompt_tokens is None or response_tokens is None:
+            return estimate_tokens(prompt), estimate_tokens(text), True
+        return prompt_tokens, response_tokens, False
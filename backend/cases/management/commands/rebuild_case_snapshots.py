@@ -0,0 +1,45 @@
+# backend/cases/management/commands/rebuild_case_snapshots.py
+from django.core.management.base import BaseCommand
+
+from cases.logic.snapshot import refresh_snapshots
+from cases.models import ClinicalCase
+
+
+class Command(BaseCommand):
+    help = "Reconstruit le document dénormalisé (snapshot) des cas cliniques existants."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status',
+            type=str,
+            help='Ne reconstruit que les cas ayant ce statut. Par défaut : tous les cas.'
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help="Ne reconstruit que les cas dont le document n'a jamais été calculé."
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Nombre de cas reconstruits par transaction. Par défaut : 200.'
+        )
+
+    def handle(self, *args, **options):
+        queryset = ClinicalCase.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+        if options['missing_only']:
+            queryset = queryset.filter(snapshot_version=0)
+
+        case_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        self.stdout.write(f"{len(case_ids)} cas à reconstruire...")
+
+        batch_size = options['batch_size']
+        done = 0
+        for start in range(0, len(case_ids), batch_size):
+            done += refresh_snapshots(case_ids[start:start + batch_size], batch_size=batch_size)
+            self.stdout.write(f"  {done}/{len(case_ids)}")
+
+        self.stdout.write(self.style.SUCCESS(f"{done} documents de cas reconstruits."))
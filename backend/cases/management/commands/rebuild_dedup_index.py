@@ -0,0 +1,55 @@
+# backend/cases/management/commands/rebuild_dedup_index.py
+import json
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cases.logic.dedup import normalize_notes, rebuild_index
+from cases.models import ClinicalCase
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit l'index des quasi-doublons (cf. cases.logic.dedup) à partir des notes normalisées "
+        "enregistrées sur les cas. Les cas importés avant l'enregistrement des notes n'en ont pas : "
+        "--notes complète d'abord leur note à partir d'un export Fultang."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=str, default=None,
+                            help="Fichier JSON de cas Fultang (liste de {id, raw_notes}, comme le fichier mock) : "
+                                 "renseigne la note des cas qui n'en ont pas avant la reconstruction.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['notes']:
+            self.backfill_notes(options['notes'], options['batch_size'])
+
+        start = perf_counter()
+        notes = (ClinicalCase.objects.exclude(source_notes='').order_by('pk')
+                 .values_list('pk', 'source_notes').iterator(chunk_size=options['batch_size']))
+        indexed = rebuild_index(settings.CASES_DEDUP_INDEX_DIR, notes, num_perm=settings.CASES_DEDUP_NUM_PERM,
+                                bands=settings.CASES_DEDUP_BANDS, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{indexed} note(s) indexées en {perf_counter() - start:.2f} s."))
+
+        missing = ClinicalCase.objects.filter(source_notes='').count()
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f"{missing} cas sans note enregistrée ne sont pas indexés (importés avant l'enregistrement "
+                f"des notes) : relancer avec --notes et un export Fultang qui les contient."
+            ))
+
+    def backfill_notes(self, path, batch_size):
+        try:
+            with open(path, encoding='utf-8') as f:
+                raw_cases = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Export Fultang illisible ({path}) : {e}")
+        raw_notes = {str(raw['id']): raw.get('raw_notes', '') for raw in raw_cases if raw.get('id')}
+        cases = list(ClinicalCase.objects.filter(source_notes='', source_fultang_id__in=list(raw_notes))
+                     .only('pk', 'source_fultang_id'))
+        for case in cases:
+            case.source_notes = ' '.join(normalize_notes(raw_notes[case.source_fultang_id]))
+        ClinicalCase.objects.bulk_update(cases, ['source_notes'], batch_size=batch_size)
+        self.stdout.write(f"{len(cases)} note(s) renseignées à partir de {path}.")
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0002_category_clinicalcase_raw_llm_suggestions_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clinicalcase',
+            name='review_lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Fin de la réservation ; le cas redevient disponible ensuite', null=True),
+        ),
+        migrations.AddField(
+            model_name='clinicalcase',
+            name='review_lease_owner',
+            field=models.ForeignKey(blank=True, help_text='Expert qui a réservé le cas dans la file de relecture', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='review_leases', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='clinicalcase',
+            index=models.Index(fields=['status', 'review_lease_expires_at'], name='case_review_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index (category_id, clinicalcase_id) sur la table M2M auto-générée des catégories.
+    La contrainte d'unicité existante couvre le sens cas -> catégorie ; celui-ci couvre
+    le filtre par catégorie (list_filter de l'admin, API) sans relire la table de cas.
+    La table étant gérée par Django (M2M implicite, nécessaire à filter_horizontal),
+    l'index est créé en SQL brut.
+    """
+
+    dependencies = [
+        ("cases", "0003_clinicalcase_review_lease"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS case_category_lookup_idx "
+                "ON cases_clinicalcase_categories (category_id, clinicalcase_id);"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS case_category_lookup_idx;",
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0004_clinicalcase_categories_lookup_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clinicalcase',
+            name='snapshot',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Document JSON dénormalisé du cas complet'),
+        ),
+        migrations.AddField(
+            model_name='clinicalcase',
+            name='snapshot_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Incrémenté à chaque reconstruction du document'),
+        ),
+    ]
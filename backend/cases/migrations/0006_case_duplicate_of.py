@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0005_clinicalcase_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clinicalcase',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Cas existant dont la note source est quasi identique', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='cases.clinicalcase'),
+        ),
+        migrations.AddField(
+            model_name='clinicalcase',
+            name='duplicate_similarity',
+            field=models.FloatField(blank=True, help_text='Similarité estimée (MinHash) avec duplicate_of', null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_closure(apps, schema_editor):
+    # Les catégories existantes sont toutes des racines : une ligne (elle-même, profondeur 0) chacune
+    Category = apps.get_model('cases', 'Category')
+    CategoryClosure = apps.get_model('cases', 'CategoryClosure')
+    CategoryClosure.objects.bulk_create(
+        [CategoryClosure(ancestor_id=pk, descendant_id=pk, depth=0) for pk in Category.objects.values_list('pk', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0006_case_duplicate_of'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='parent',
+            field=models.ForeignKey(blank=True, help_text='Catégorie parente (ex: Cardiologie pour Rythmologie)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='cases.category'),
+        ),
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='cases.category')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='cases.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'ancestor'], name='category_closure_desc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='category_closure_unique')],
+            },
+        ),
+        migrations.RunPython(seed_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0007_category_hierarchy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SymptomTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Forme normalisée (minuscules, sans accents ni pluriel)', max_length=200)),
+                ('label', models.CharField(help_text='Libellé affiché (première graphie rencontrée)', max_length=200)),
+                ('case_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExamTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Forme normalisée (minuscules, sans accents ni pluriel)', max_length=200)),
+                ('label', models.CharField(help_text='Libellé affiché (première graphie rencontrée)', max_length=200)),
+                ('case_count', models.PositiveIntegerField(default=0)),
+                ('kind', models.CharField(choices=[('complementaire', 'Examen complémentaire'), ('physique', 'Examen physique')], max_length=20)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', '-case_count'], name='exam_term_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'name'), name='exam_term_kind_name_unique')],
+            },
+        ),
+        migrations.AddField(
+            model_name='complementaryexam',
+            name='term',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Terme canonique, déduit de `nom`', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exams', to='cases.examterm'),
+        ),
+        migrations.AddField(
+            model_name='physicalfinding',
+            name='term',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Terme canonique, déduit de `nom_examen`', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='physical_findings', to='cases.examterm'),
+        ),
+        migrations.AddIndex(
+            model_name='complementaryexam',
+            index=models.Index(fields=['term', 'case'], name='exam_term_case_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='physicalfinding',
+            index=models.Index(fields=['term', 'case'], name='finding_term_case_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='symptomterm',
+            index=models.Index(fields=['-case_count'], name='symptom_term_count_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='symptomterm',
+            constraint=models.UniqueConstraint(fields=('name',), name='symptom_term_name_unique'),
+        ),
+        migrations.AddField(
+            model_name='symptom',
+            name='term',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Terme canonique, déduit de `nom`', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='symptoms', to='cases.symptomterm'),
+        ),
+        migrations.AddIndex(
+            model_name='symptom',
+            index=models.Index(fields=['term', 'case'], name='symptom_term_case_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0008_vocabulary_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clinicalcase',
+            name='source_notes',
+            field=models.TextField(blank=True, default='', help_text='Note Fultang normalisée, pour la détection des quasi-doublons'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 21:10
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def recount_approved(apps, schema_editor):
+    # case_count ne compte plus que les cas approuvés (cf. cases.logic.vocabulary)
+    for row_model, term_model in (('Symptom', 'SymptomTerm'), ('ComplementaryExam', 'ExamTerm'),
+                                  ('PhysicalFinding', 'ExamTerm')):
+        Row = apps.get_model('cases', row_model)
+        Term = apps.get_model('cases', term_model)
+        counts = (
+            Row.objects.filter(term__isnull=False, case__status='approuve').order_by()
+            .values_list('term_id').annotate(n=Count('case_id', distinct=True))
+        )
+        Term.objects.filter(pk__in=Row.objects.filter(term__isnull=False).values('term_id')).update(case_count=0)
+        for term_id, n in counts:
+            Term.objects.filter(pk=term_id).update(case_count=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0009_clinicalcase_source_notes'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_approved, migrations.RunPython.noop),
+    ]
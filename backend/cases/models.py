@@ -6,9 +6,15 @@ from django.conf import settings
 
 
 class Category(models.Model):
-    """Représente une catégorie médicale officielle pour classer les cas."""
+    """
+    Représente une catégorie médicale officielle pour classer les cas.
+    Les catégories forment une hiérarchie (parent) ; la table de fermeture CategoryClosure,
+    tenue à jour à chaque écriture (cf. cases.logic.taxonomy), évite les requêtes récursives.
+    """
     name = models.CharField(max_length=100, unique=True, help_text="Nom unique de la catégorie (ex: Cardiologie)")
     description = models.TextField(blank=True, help_text="Description optionnelle de la catégorie.")
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='children',
+                               help_text="Catégorie parente (ex: Cardiologie pour Rythmologie)")
 
     class Meta:
         verbose_name_plural = "Categories"
@@ -16,6 +22,34 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .logic.taxonomy import creates_cycle
+
+        if self.pk and self.parent_id and creates_cycle(self.pk, self.parent_id):
+            raise ValidationError({'parent': "Une catégorie ne peut pas être rangée sous l'une de ses sous-catégories."})
+
+
+class CategoryClosure(models.Model):
+    """
+    Table de fermeture de la hiérarchie : une ligne par couple (ancêtre, descendant), la catégorie
+    elle-même comprise (depth = 0). « Cardiologie et ses sous-spécialités » est une simple jointure.
+    """
+    ancestor = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='category_closure_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'ancestor'], name='category_closure_desc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
 
 class ClinicalCase(models.Model):
     """
@@ -64,6 +98,36 @@ class ClinicalCase(models.Model):
     raw_llm_suggestions = models.JSONField(default=dict, blank=True,
                                            help_text="Stocke les suggestions brutes du LLM (catégories, etc.) pour revue par l'expert.")
 
+    # Quasi-doublon détecté à l'import (cf. cases.logic.dedup) : cas existant dont la note Fultang
+    # est presque identique, pour que l'expert écarte ou fusionne le cas en relecture
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='near_duplicates',
+                                     help_text="Cas existant dont la note source est quasi identique")
+    duplicate_similarity = models.FloatField(null=True, blank=True,
+                                             help_text="Similarité estimée (MinHash) avec duplicate_of")
+    # Note Fultang normalisée (cf. cases.logic.dedup.normalize_notes) : l'index des quasi-doublons
+    # se reconstruit à partir de ce champ (commande rebuild_dedup_index)
+    source_notes = models.TextField(blank=True, default='',
+                                    help_text="Note Fultang normalisée, pour la détection des quasi-doublons")
+
+    # File de relecture : un expert "réserve" un lot de cas pour une durée limitée
+    review_lease_owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                                           related_name='review_leases',
+                                           help_text="Expert qui a réservé le cas dans la file de relecture")
+    review_lease_expires_at = models.DateTimeField(null=True, blank=True,
+                                                   help_text="Fin de la réservation ; le cas redevient disponible ensuite")
+
+    # Document complet du cas (enfants et catégories inclus), reconstruit à chaque modification
+    # (cf. cases.logic.snapshot) pour être servi en une seule lecture par clé primaire.
+    snapshot = models.JSONField(default=dict, blank=True, editable=False,
+                                help_text="Document JSON dénormalisé du cas complet")
+    snapshot_version = models.PositiveIntegerField(default=0, editable=False,
+                                                   help_text="Incrémenté à chaque reconstruction du document")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'review_lease_expires_at'], name='case_review_queue_idx'),
+        ]
 
     def __str__(self):
         return f"Cas #{self.id} ({self.case_title}) - {self.get_status_display()}"
@@ -71,10 +135,50 @@ class ClinicalCase(models.Model):
 
 
 
+class VocabularyTerm(models.Model):
+    """
+    Terme canonique partagé par toutes les lignes qui l'emploient (cf. cases.logic.vocabulary) :
+    « Céphalées », « cephalée » et « CEPHALEES » pointent vers le même terme.
+    `case_count` (nombre de cas approuvés distincts qui l'emploient) est tenu à jour à chaque écriture.
+    """
+    name = models.CharField(max_length=200, help_text="Forme normalisée (minuscules, sans accents ni pluriel)")
+    label = models.CharField(max_length=200, help_text="Libellé affiché (première graphie rencontrée)")
+    case_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return self.label
+
+
+class SymptomTerm(VocabularyTerm):
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['name'], name='symptom_term_name_unique')]
+        indexes = [models.Index(fields=['-case_count'], name='symptom_term_count_idx')]
+
+
+class ExamTerm(VocabularyTerm):
+    """Examen complémentaire (NFS, radiographie...) ou geste de l'examen physique (auscultation...)."""
+
+    class Kind(models.TextChoices):
+        COMPLEMENTAIRE = 'complementaire', 'Examen complémentaire'
+        PHYSIQUE = 'physique', 'Examen physique'
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['kind', 'name'], name='exam_term_kind_name_unique')]
+        indexes = [models.Index(fields=['kind', '-case_count'], name='exam_term_count_idx')]
+
+
 class Symptom(models.Model):
     """Un symptôme spécifique rapporté par le patient."""
     case = models.ForeignKey(ClinicalCase, related_name='symptoms', on_delete=models.CASCADE)
     nom = models.CharField(max_length=200)
+    term = models.ForeignKey(SymptomTerm, related_name='symptoms', on_delete=models.SET_NULL, null=True, blank=True,
+                             editable=False, help_text="Terme canonique, déduit de `nom`")
     localisation = models.CharField(max_length=200, blank=True)
     date_debut = models.CharField(max_length=100, help_text="ex: 'il y a 3 jours', 'depuis ce matin'")
     frequence = models.CharField(max_length=100, blank=True)
@@ -83,6 +187,10 @@ class Symptom(models.Model):
     activite_declenchante = models.CharField(max_length=255, blank=True)
     degre = models.PositiveIntegerField(help_text="Échelle de douleur/sévérité, ex: 8 sur 10")
 
+    class Meta:
+        # « Cas présentant le symptôme X » : parcours d'index, sans lire la table des cas
+        indexes = [models.Index(fields=['term', 'case'], name='symptom_term_case_idx')]
+
     def __str__(self):
         return f"{self.nom} (Cas #{self.case.id})"
 
@@ -122,8 +230,13 @@ class ComplementaryExam(models.Model):
     """Résultat d'un examen complémentaire (biologie, imagerie, etc.)."""
     case = models.ForeignKey(ClinicalCase, related_name='exams', on_delete=models.CASCADE)
     nom = models.CharField(max_length=200, help_text="ex: 'NFS', 'Radiographie du thorax'")
+    term = models.ForeignKey(ExamTerm, related_name='exams', on_delete=models.SET_NULL, null=True, blank=True,
+                             editable=False, help_text="Terme canonique, déduit de `nom`")
     resultat = models.TextField(help_text="Résultats complets ou interprétation")
 
+    class Meta:
+        indexes = [models.Index(fields=['term', 'case'], name='exam_term_case_idx')]
+
     def __str__(self):
         return f"Examen : {self.nom} (Cas #{self.case.id})"
 
@@ -132,9 +245,14 @@ class PhysicalFinding(models.Model):
     """Une observation faite lors de l'examen physique du patient."""
     case = models.ForeignKey(ClinicalCase, related_name='physical_findings', on_delete=models.CASCADE)
     nom_examen = models.CharField(max_length=200, help_text="ex: 'Auscultation cardiaque', 'Palpation abdominale'")
+    term = models.ForeignKey(ExamTerm, related_name='physical_findings', on_delete=models.SET_NULL, null=True,
+                             blank=True, editable=False, help_text="Terme canonique, déduit de `nom_examen`")
     resultat_observation = models.TextField(
         help_text="ex: 'Bruits du cœur réguliers, pas de souffle', 'Abdomen souple et dépressible'")
 
+    class Meta:
+        indexes = [models.Index(fields=['term', 'case'], name='finding_term_case_idx')]
+
     def __str__(self):
         return f"Examen physique : {self.nom_examen} (Cas #{self.case.id})"
 
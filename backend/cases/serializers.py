@@ -18,4 +18,35 @@ class ClinicalCaseDetailSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = ClinicalCase
-        fields = '__all__' # Inclut tous les champs du modèle
\ No newline at end of file
+        # Liste explicite des champs montrés aux apprenants : les champs de travail (suggestions brutes
+        # du LLM, doublons, réservation de relecture, document dénormalisé) n'y apparaissent pas.
+        # Le document complet est servi par /document/.
+        fields = ['id', 'case_title', 'case_summary', 'learning_objectives', 'motif_consultation', 'age', 'sexe',
+                  'etat_civil', 'profession', 'nombre_enfant', 'groupe_sanguin', 'mode_de_vie', 'categories',
+                  'status', 'created_at', 'updated_at']
+
+
+class ClinicalCaseReviewSerializer(serializers.ModelSerializer):
+    """
+    Serializer des cas distribués par la file de relecture des experts.
+    """
+    class Meta:
+        model = ClinicalCase
+        fields = ['id', 'source_fultang_id', 'case_title', 'case_summary', 'status', 'created_at',
+                  'review_lease_expires_at', 'duplicate_of', 'duplicate_similarity']
+
+
+class ReviewClaimSerializer(serializers.Serializer):
+    """Paramètres optionnels d'une demande de lot dans la file de relecture."""
+    batch_size = serializers.IntegerField(required=False, min_value=1, max_value=100)
+
+
+class ImportCasesSerializer(serializers.Serializer):
+    """Paramètres d'un import Fultang lancé en tâche de fond."""
+    mock = serializers.BooleanField(default=False)
+    dedupe = serializers.ChoiceField(choices=['off', 'flag', 'skip'], default='flag')
+
+
+class ReviewBatchSerializer(serializers.Serializer):
+    """Liste d'identifiants de cas sur lesquels appliquer une décision groupée."""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
@@ -0,0 +1,198 @@
+# backend/cases/signals.py
+"""
+Maintien du document dénormalisé des cas (cf. cases.logic.snapshot).
+Toute modification d'un cas, d'une ligne enfant ou d'une catégorie reconstruit le
+document des cas concernés dans la même transaction.
+Maintien de la table de fermeture des catégories (cf. cases.logic.taxonomy) et du
+vocabulaire canonique des symptômes et examens (cf. cases.logic.vocabulary).
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import (
+    Category, ClinicalCase, Symptom, MedicalHistory, CurrentTreatment,
+    ComplementaryExam, PhysicalFinding, Diagnosis,
+)
+
+# Envoyé après la reconstruction du document d'un ou plusieurs cas (argument : case_ids).
+# Point d'accroche pour les index et caches dérivés du contenu des cas.
+case_document_changed = Signal()
+
+CASE_CHILD_MODELS = (Symptom, MedicalHistory, CurrentTreatment, ComplementaryExam, PhysicalFinding, Diagnosis)
+
+
+def _schedule(case_ids):
+    from .logic.snapshot import schedule_snapshot_refresh
+    schedule_snapshot_refresh(case_ids)
+
+
+def _deleting_case(origin):
+    # Suppression en cascade depuis un cas : inutile de reconstruire un document qui va disparaître
+    model = getattr(origin, 'model', type(origin))
+    return model is ClinicalCase
+
+
+@receiver(post_save, sender=ClinicalCase)
+def refresh_case_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _schedule([instance.pk])
+
+
+def refresh_case_on_child_change(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or (origin is not None and _deleting_case(origin)):
+        return
+    _schedule([instance.case_id])
+
+
+for child_model in CASE_CHILD_MODELS:
+    post_save.connect(refresh_case_on_child_change, sender=child_model,
+                      dispatch_uid=f'snapshot_save_{child_model.__name__}')
+    post_delete.connect(refresh_case_on_child_change, sender=child_model,
+                        dispatch_uid=f'snapshot_delete_{child_model.__name__}')
+
+
+@receiver(m2m_changed, sender=ClinicalCase.categories.through)
+def refresh_case_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _schedule([instance.pk])
+    elif pk_set:
+        _schedule(pk_set)
+    elif action == 'post_clear':
+        # pre_clear a mémorisé les cas concernés (pk_set est vide pour un clear inverse)
+        _schedule(getattr(instance, '_snapshot_case_ids', []))
+
+
+@receiver(m2m_changed, sender=ClinicalCase.categories.through)
+def remember_cases_before_clear(sender, instance, action, reverse, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._snapshot_case_ids = list(instance.cases.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category)
+def refresh_cases_on_category_save(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        case_ids = list(instance.cases.values_list('pk', flat=True))
+        if case_ids:
+            _schedule(case_ids)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_cases_before_category_delete(sender, instance, **kwargs):
+    instance._snapshot_case_ids = list(instance.cases.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def refresh_cases_on_category_delete(sender, instance, **kwargs):
+    case_ids = getattr(instance, '_snapshot_case_ids', None)
+    if case_ids:
+        _schedule(case_ids)
+
+
+# --- Hiérarchie des catégories ----------------------------------------------------------
+
+@receiver(pre_save, sender=Category)
+def check_category_parent(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .logic.taxonomy import creates_cycle
+
+    previous = Category.objects.filter(pk=instance.pk).values_list('parent_id', flat=True).first() if instance.pk else None
+    instance._closure_previous_parent_id = previous
+    if instance.pk and instance.parent_id != previous and instance.parent_id is not None \
+            and creates_cycle(instance.pk, instance.parent_id):
+        raise ValueError(f"La catégorie {instance.pk} ne peut pas être rangée sous l'une de ses sous-catégories.")
+
+
+@receiver(post_save, sender=Category)
+def update_category_closure(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    from .logic import taxonomy
+
+    if created:
+        taxonomy.attach(instance)
+    elif instance.parent_id != getattr(instance, '_closure_previous_parent_id', instance.parent_id):
+        taxonomy.move(instance.pk, instance.parent_id)
+
+
+@receiver(pre_delete, sender=Category)
+def detach_subcategories_before_delete(sender, instance, **kwargs):
+    # Les sous-catégories remontent à la racine (parent SET_NULL, appliqué sans signal)
+    from .logic import taxonomy
+
+    for child_id in instance.children.values_list('pk', flat=True):
+        taxonomy.move(child_id, None)
+
+
+# --- Vocabulaire canonique ---------------------------------------------------------------
+
+def assign_term(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .logic.vocabulary import SOURCES, resolve_term
+
+    source = SOURCES[sender]
+    instance._term_previous = (
+        sender.objects.filter(pk=instance.pk).values_list('case_id', 'term_id').first() if instance.pk else None
+    )
+    instance.term_id = resolve_term(source, getattr(instance, source.field))
+
+
+def count_term_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .logic.vocabulary import SOURCES, term_added, term_removed
+
+    source = SOURCES[sender]
+    previous = getattr(instance, '_term_previous', None)
+    if previous == (instance.case_id, instance.term_id):
+        return
+    term_added(source, instance.case_id, instance.term_id, instance.pk)
+    if previous:
+        term_removed(source, *previous)
+
+
+def count_term_on_delete(sender, instance, origin=None, **kwargs):
+    from .logic.vocabulary import SOURCES, term_removed
+
+    # Suppression groupée (cas supprimé en cascade) : toutes les lignes sont déjà effacées
+    # quand post_delete est envoyé ; un couple (cas, terme) n'est décompté qu'une fois.
+    seen = getattr(origin, '_vocabulary_removed', None) if origin is not None else None
+    if seen is None:
+        seen = set()
+        if origin is not None:
+            origin._vocabulary_removed = seen
+    key = (sender, instance.case_id, instance.term_id)
+    if key not in seen:
+        seen.add(key)
+        term_removed(SOURCES[sender], instance.case_id, instance.term_id)
+
+
+@receiver(pre_save, sender=ClinicalCase)
+def remember_case_status(sender, instance, raw=False, **kwargs):
+    if not raw and instance.pk:
+        instance._vocabulary_previous_status = (
+            ClinicalCase.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=ClinicalCase)
+def count_terms_on_approval_change(sender, instance, created, raw=False, **kwargs):
+    # Les facettes ne comptent que les cas approuvés
+    if raw or created:
+        return
+    from .logic.vocabulary import cases_approval_changed
+
+    approved = instance.status == ClinicalCase.Status.APPROUVE
+    previous = getattr(instance, '_vocabulary_previous_status', None)
+    if previous is not None and (previous == ClinicalCase.Status.APPROUVE) != approved:
+        cases_approval_changed([instance.pk], approved)
+
+
+for term_model in (Symptom, ComplementaryExam, PhysicalFinding):
+    pre_save.connect(assign_term, sender=term_model, dispatch_uid=f'vocabulary_assign_{term_model.__name__}')
+    post_save.connect(count_term_on_save, sender=term_model, dispatch_uid=f'vocabulary_save_{term_model.__name__}')
+    post_delete.connect(count_term_on_delete, sender=term_model,
+                        dispatch_uid=f'vocabulary_delete_{term_model.__name__}')
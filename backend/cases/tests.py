@@ -1,3 +1,309 @@
-from django.test import TestCase
+# backend/cases/tests.py
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.stats import latency_summary
+
+from .logic import review_queue, taxonomy, vocabulary
+from .logic.dataset_stats import compute_stats
+from .logic.dedup import NoteDedupIndex, normalize_notes
+from .logic.import_telemetry import STAGES, ImportTelemetry
+from .logic.snapshot import get_case_document
+from .models import Category, CategoryClosure, ClinicalCase, ComplementaryExam, Symptom, SymptomTerm
+from .serializers import ClinicalCaseDetailSerializer
+
+
+class CaseDocumentTests(TestCase):
+
+    def setUp(self):
+        self.case = ClinicalCase.objects.create(
+            source_fultang_id='f1', case_title='Cas', case_summary='s', learning_objectives='o',
+            motif_consultation='m', age=40, sexe='Homme', status=ClinicalCase.Status.APPROUVE,
+        )
+
+    def test_missing_document_is_built_without_writing(self):
+        ClinicalCase.objects.filter(pk=self.case.pk).update(snapshot={})
+        with CaptureQueriesContext(connection) as queries:
+            document = get_case_document(self.case.pk)
+        self.assertEqual(document['case_title'], 'Cas')
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in queries.captured_queries))
+
+    def test_detail_serializer_hides_internal_fields(self):
+        data = ClinicalCaseDetailSerializer(self.case).data
+        for field in ('snapshot', 'raw_llm_suggestions', 'duplicate_of', 'duplicate_similarity', 'source_notes',
+                      'review_lease_owner', 'review_lease_expires_at'):
+            self.assertNotIn(field, data)
+        self.assertEqual(data['case_title'], 'Cas')
+
+
+NOTE = ("Patient de 55 ans, douleur thoracique oppressante irradiant vers le bras gauche depuis deux heures. "
+        "Antécédents d'hypertension artérielle et de diabète de type 2, fumeur. ECG : sus-décalage du segment ST.")
+RESUBMITTED = NOTE.replace('deux heures', 'trois heures')
+OTHER = "Enfant de 4 ans, fièvre à 40 °C depuis trois jours, convulsions, goutte épaisse positive à Plasmodium."
+
+
+class NoteDedupIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def index(self):
+        return NoteDedupIndex(self.directory, num_perm=128, bands=16)
+
+    def test_signature_estimates_similarity(self):
+        index = self.index()
+        note, resubmitted, other = (index.signature(text) for text in (NOTE, RESUBMITTED, OTHER))
+        self.assertEqual(note.shape, (128,))
+        self.assertTrue((index.signature(NOTE.upper()) == note).all())
+        self.assertGreater((note == resubmitted).mean(), 0.6)
+        self.assertLess((note == other).mean(), 0.1)
+        self.assertIsNone(index.signature(' ,; '))
+
+    def test_query_finds_pending_and_saved_notes(self):
+        index = self.index()
+        index.add(1, index.signature(NOTE))
+        self.assertEqual([case_id for case_id, _ in index.query(index.signature(NOTE), 0.8)], [1])
+        index.save()
+        self.assertEqual(index.pending, 0)
+        self.assertEqual(index.query(index.signature(NOTE), 0.8), [(1, 1.0)])
+        self.assertEqual(index.query(index.signature(OTHER), 0.5), [])
+
+    def test_save_keeps_notes_saved_by_another_process(self):
+        first, second = self.index(), self.index()
+        first.add(1, first.signature(NOTE))
+        second.add(2, second.signature(OTHER))
+        first.save()
+        second.save()
+        reopened = self.index()
+        self.assertEqual(reopened.count, 2)
+        self.assertEqual(reopened.query(reopened.signature(NOTE), 0.8), [(1, 1.0)])
+        self.assertEqual(reopened.query(reopened.signature(OTHER), 0.8), [(2, 1.0)])
+
+
+class RebuildDedupIndexTests(TestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.directory = os.path.join(root, 'notes_dedup')
+        self.export = os.path.join(root, 'fultang.json')
+        self.settings = override_settings(CASES_DEDUP_INDEX_DIR=self.directory, CASES_DEDUP_NUM_PERM=128,
+                                          CASES_DEDUP_BANDS=16)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def create_case(self, fultang_id, source_notes=''):
+        return ClinicalCase.objects.create(
+            source_fultang_id=fultang_id, case_title='Cas', case_summary='s', learning_objectives='o',
+            motif_consultation='m', age=40, sexe='Homme', source_notes=source_notes,
+        )
+
+    def test_rebuild_indexes_stored_and_backfilled_notes(self):
+        stored = self.create_case('f1', ' '.join(normalize_notes(NOTE)))
+        legacy = self.create_case('f2')
+        with open(self.export, 'w', encoding='utf-8') as f:
+            json.dump([{'id': 'f2', 'raw_notes': OTHER}, {'id': 'inconnu', 'raw_notes': NOTE}], f)
+        # Un index construit avec d'autres paramètres est remplacé
+        NoteDedupIndex(self.directory, num_perm=64, bands=8)
+
+        call_command('rebuild_dedup_index', notes=self.export, stdout=StringIO())
+
+        legacy.refresh_from_db()
+        self.assertTrue(legacy.source_notes.startswith('enfant de 4 ans'))
+        index = NoteDedupIndex(self.directory, num_perm=128, bands=16)
+        self.assertEqual(index.count, 2)
+        self.assertEqual([case_id for case_id, _ in index.query(index.signature(RESUBMITTED), 0.6)], [stored.pk])
+        self.assertEqual(index.query(index.signature(OTHER), 0.8), [(legacy.pk, 1.0)])
+
+
+def create_case(fultang_id, status=ClinicalCase.Status.APPROUVE):
+    return ClinicalCase.objects.create(
+        source_fultang_id=fultang_id, case_title='Cas', case_summary='s', learning_objectives='o',
+        motif_consultation='m', age=40, sexe='Homme', status=status,
+    )
+
+
+def add_symptom(case, nom, degre=5):
+    return Symptom.objects.create(case=case, nom=nom, date_debut='hier', degre=degre)
+
+
+class VocabularyCountTests(TestCase):
+
+    def count(self, name):
+        return SymptomTerm.objects.get(name=name).case_count
+
+    def test_spellings_share_a_term_counted_once_per_case(self):
+        case = create_case('f1')
+        add_symptom(case, 'Céphalées')
+        add_symptom(case, 'cephalees')
+        add_symptom(create_case('f2'), 'CEPHALEE')
+        self.assertEqual(SymptomTerm.objects.count(), 1)
+        self.assertEqual(self.count('cephalee'), 2)
+
+    def test_only_approved_cases_are_counted(self):
+        pending = create_case('f1', ClinicalCase.Status.NON_APPROUVE)
+        add_symptom(pending, 'Fièvre')
+        self.assertEqual(self.count('fievre'), 0)
+
+        pending.status = ClinicalCase.Status.APPROUVE
+        pending.save()
+        self.assertEqual(self.count('fievre'), 1)
+        pending.status = ClinicalCase.Status.REJETE
+        pending.save()
+        self.assertEqual(self.count('fievre'), 0)
+
+    def test_review_decision_counts_approved_cases(self):
+        expert = User.objects.create_user('expert', 'expert@example.cm', 'pw')
+        cases = [create_case(f'f{i}', ClinicalCase.Status.NON_APPROUVE) for i in range(3)]
+        for case in cases:
+            add_symptom(case, 'Toux')
+        ComplementaryExam.objects.create(case=cases[0], nom='NFS', resultat='normale')
+        review_queue.apply_decision(expert, [cases[0].pk, cases[1].pk], ClinicalCase.Status.APPROUVE)
+        review_queue.apply_decision(expert, [cases[2].pk], ClinicalCase.Status.REJETE)
+        self.assertEqual(self.count('toux'), 2)
+        self.assertEqual(vocabulary.facets(vocabulary.ExamTerm, kind='complementaire')[0]['case_count'], 1)
+
+    def test_deletions_decrement_and_match_a_recount(self):
+        first, second = create_case('f1'), create_case('f2')
+        symptom = add_symptom(first, 'Douleur thoracique')
+        add_symptom(first, 'douleurs thoraciques')
+        add_symptom(second, 'Douleur thoracique')
+        symptom.delete()
+        self.assertEqual(self.count('douleur thoracique'), 2)
+        second.delete()
+        self.assertEqual(self.count('douleur thoracique'), 1)
+
+        SymptomTerm.objects.update(case_count=0)
+        vocabulary.recount(vocabulary.SOURCES[Symptom])
+        self.assertEqual(self.count('douleur thoracique'), 1)
+
+    def test_dataset_stats_group_symptoms_by_term(self):
+        case = create_case('f1')
+        add_symptom(case, 'Céphalées', degre=4)
+        add_symptom(create_case('f2'), 'cephalees', degre=6)
+        symptoms = compute_stats(full_refresh=True)['symptoms']
+        self.assertEqual(symptoms, [{'name': 'Céphalées', 'cases': 2, 'mean_degre': 5.0}])
+
+
+class CategoryClosureTests(TestCase):
+
+    def setUp(self):
+        self.medecine = Category.objects.create(name='Médecine interne')
+        self.cardio = Category.objects.create(name='Cardiologie', parent=self.medecine)
+        self.rythmo = Category.objects.create(name='Rythmologie', parent=self.cardio)
+        self.pneumo = Category.objects.create(name='Pneumologie')
+
+    def assert_closure_matches_parents(self):
+        parents = dict(Category.objects.values_list('pk', 'parent_id'))
+        expected = set()
+        for pk in parents:
+            ancestor, depth = pk, 0
+            while ancestor is not None:
+                expected.add((ancestor, pk, depth))
+                ancestor, depth = parents[ancestor], depth + 1
+        self.assertEqual(set(CategoryClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth')), expected)
+
+    def test_create_builds_ancestor_links(self):
+        self.assert_closure_matches_parents()
+        self.assertEqual(CategoryClosure.objects.get(ancestor=self.medecine, descendant=self.rythmo).depth, 2)
+
+    def test_move_reattaches_the_subtree(self):
+        self.cardio.parent = self.pneumo
+        self.cardio.save()
+        self.assert_closure_matches_parents()
+        self.assertFalse(CategoryClosure.objects.filter(ancestor=self.medecine, descendant=self.rythmo).exists())
+
+        self.cardio.parent = None
+        self.cardio.save()
+        self.assert_closure_matches_parents()
+
+    def test_delete_moves_subcategories_to_the_root(self):
+        self.cardio.delete()
+        self.rythmo.refresh_from_db()
+        self.assertIsNone(self.rythmo.parent_id)
+        self.assert_closure_matches_parents()
+
+    def test_cycle_is_rejected(self):
+        for parent in (self.rythmo, self.medecine):
+            self.medecine.parent = parent
+            with self.subTest(parent=parent.name), self.assertRaises(ValueError):
+                self.medecine.save()
+        self.assert_closure_matches_parents()
+
+    def test_filter_cases_scopes(self):
+        in_medecine, in_cardio, in_rythmo = (create_case(f'f{i}') for i in range(3))
+        in_medecine.categories.add(self.medecine)
+        in_cardio.categories.add(self.cardio)
+        # Deux catégories de la même portée : le cas ne doit apparaître qu'une fois
+        in_rythmo.categories.add(self.rythmo, self.cardio)
+        expected = {
+            'descendants': [in_cardio.pk, in_rythmo.pk],
+            'ancestors': [in_medecine.pk, in_cardio.pk, in_rythmo.pk],
+            'exact': [in_cardio.pk, in_rythmo.pk],
+        }
+        for scope, case_ids in expected.items():
+            with self.subTest(scope=scope):
+                cases = taxonomy.filter_cases(ClinicalCase.objects.all(), self.cardio.pk, scope)
+                self.assertEqual(sorted(cases.values_list('pk', flat=True)), case_ids)
+        rythmo_only = taxonomy.filter_cases(ClinicalCase.objects.all(), self.rythmo.pk, 'exact')
+        self.assertEqual(list(rythmo_only.values_list('pk', flat=True)), [in_rythmo.pk])
+
+
+class ImportTelemetryTests(SimpleTestCase):
+
+    def run_import(self):
+        telemetry = ImportTelemetry(price_input=0.3, price_output=2.5)
+        with telemetry.stage('fetch'):
+            pass
+        telemetry.begin_case('f1')
+        with telemetry.stage('llm'):
+            telemetry.record_attempt(retry=False)
+        with telemetry.stage('llm'):
+            telemetry.record_attempt(retry=True)
+        telemetry.record_llm(1_000_000, 500_000)
+        telemetry.end_case('imported', 1)
+        telemetry.begin_case('f2')
+        telemetry.record_llm(2000, 400, cached=True)
+        telemetry.end_case('duplicate_skipped')
+        telemetry.end_case('missing_id')
+        return telemetry
+
+    def test_latency_summary(self):
+        self.assertEqual(latency_summary([]), {'samples': 0})
+        summary = latency_summary([i / 1000 for i in range(1, 101)])
+        self.assertEqual((summary['samples'], summary['p50_ms'], summary['p95_ms'], summary['max_ms']),
+                         (100, 50.0, 95.0, 100.0))
+
+    def test_report_aggregates_stages_cases_and_llm(self):
+        report = self.run_import().report({'mock': True})
+        self.assertEqual(report['outcomes'], {'imported': 1, 'duplicate_skipped': 1, 'missing_id': 1})
+        self.assertEqual(set(report['stages']), set(STAGES))
+        self.assertEqual(report['stages']['llm']['samples'], 2)
+        self.assertEqual(report['stages']['parse'], {'samples': 0})
+        self.assertEqual(report['cases_timing']['samples'], 2)
+        self.assertEqual([case['attempts'] for case in report['cases']], [2, 0])
+        self.assertEqual([case['cached'] for case in report['cases']], [False, True])
+        llm = report['llm']
+        self.assertEqual((llm['calls'], llm['attempts'], llm['retries'], llm['cache_hits']), (1, 2, 1, 1))
+        self.assertEqual(llm['tokens_saved_by_cache'], 2400)
+        self.assertAlmostEqual(llm['cost_usd'], 0.3 + 1.25)
+
+    def test_write_and_summary_lines(self):
+        telemetry = self.run_import()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(telemetry.write(directory, {'mock': True}), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['parameters'], {'mock': True})
+        lines = telemetry.summary_lines()
+        self.assertEqual(len(lines), 1 + len(STAGES) + 2)
+        self.assertIn('1 reprise(s)', lines[-2])
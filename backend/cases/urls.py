@@ -1,8 +1,14 @@
 # backend/cases/urls.py
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import ClinicalCaseViewSet
+from .views import ClinicalCaseViewSet, ReviewQueueViewSet, ImportCasesView, DatasetStatsView, VocabularyFacetsView
 
 router = DefaultRouter()
 router.register(r'cases', ClinicalCaseViewSet, basename='case')
+router.register(r'review-queue', ReviewQueueViewSet, basename='review-queue')
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path('imports/', ImportCasesView.as_view(), name='case-import'),
+    path('dataset-stats/', DatasetStatsView.as_view(), name='dataset-stats'),
+    path('vocabulary/<str:kind>/', VocabularyFacetsView.as_view(), name='vocabulary-facets'),
+] + router.urls
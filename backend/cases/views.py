@@ -2,20 +2,170 @@ from django.shortcuts import render
 
 # backend/cases/views.py
 
-from rest_framework import viewsets, permissions
-from .models import ClinicalCase
-from .serializers import ClinicalCaseListSerializer, ClinicalCaseDetailSerializer
+from django.http import Http404
+from rest_framework import generics, viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
+from core.db_routers import ReplicaReadsMixin
+from core.metrics import SerializerTimingMixin, serialized
+from jobs.queue import enqueue
+from users.permissions import IsExpert
+from .logic import review_queue, taxonomy, vocabulary
+from .logic.dataset_stats import compute_stats
+from .logic.snapshot import get_case_document
+from .models import ClinicalCase, ExamTerm, SymptomTerm
+from .serializers import (
+    ClinicalCaseListSerializer, ClinicalCaseDetailSerializer, ClinicalCaseReviewSerializer,
+    ReviewClaimSerializer, ReviewBatchSerializer, ImportCasesSerializer,
+)
 
-class ClinicalCaseViewSet(viewsets.ReadOnlyModelViewSet):
+
+class ClinicalCaseViewSet(ReplicaReadsMixin, SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet pour visualiser les cas cliniques.
     ReadOnly : on ne permet que la lecture via cette API pour l'instant.
+    Les lectures sont servies par le réplica lorsqu'il est configuré.
+    Filtre : ?category=<id> (la catégorie et ses sous-catégories) ; ?category_scope=ancestors
+    pour la catégorie et ses parents, =exact pour la seule catégorie.
+    ?symptom=<id>, ?exam=<id> (identifiants de termes, répétables) : cas présentant tous ces termes.
     """
-    queryset = ClinicalCase.objects.filter(status='approuve')  # Ne montre que les cas approuvés
+    queryset = ClinicalCase.objects.filter(status='approuve').defer('snapshot')  # Ne montre que les cas approuvés
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        category = params.get('category')
+        if category is not None:
+            scope = params.get('category_scope', 'descendants')
+            if not category.isdigit() or scope not in taxonomy.SCOPES:
+                raise ValidationError({'category': "Identifiant de catégorie ou portée (descendants, ancestors, exact) invalide."})
+            queryset = taxonomy.filter_cases(queryset, int(category), scope)
+        terms = {name: params.getlist(name) for name in ('symptom', 'exam')}
+        if any(terms.values()):
+            if not all(value.isdigit() for values in terms.values() for value in values):
+                raise ValidationError({'symptom': "Les identifiants de termes doivent être des entiers."})
+            queryset = vocabulary.filter_cases(queryset, symptom_ids=[int(v) for v in terms['symptom']],
+                                               exam_ids=[int(v) for v in terms['exam']])
+        return queryset
 
     def get_serializer_class(self):
         # Utilise un serializer différent pour la liste et le détail
         if self.action == 'list':
             return ClinicalCaseListSerializer
-        return ClinicalCaseDetailSerializer
\ No newline at end of file
+        return ClinicalCaseDetailSerializer
+
+    @action(detail=True, methods=['get'])
+    def document(self, request, pk=None):
+        """Cas complet (symptômes, antécédents, examens, diagnostics...) lu en une seule ligne."""
+        try:
+            document = get_case_document(int(pk), status=ClinicalCase.Status.APPROUVE)
+        except ValueError:
+            raise Http404
+        if document is None:
+            raise Http404
+        return Response(document)
+
+
+class ReviewQueueViewSet(viewsets.ViewSet):
+    """
+    File de relecture des experts.
+    - GET    : cas actuellement réservés par l'expert connecté
+    - claim  : réserve un lot de cas non approuvés (les cas réservés par d'autres sont sautés)
+    - approve / reject : décision groupée, appliquée en une seule transaction
+    - release : rend des cas à la file sans décision
+    """
+    permission_classes = [permissions.IsAuthenticated, IsExpert]
+
+    def list(self, request):
+        leased = ClinicalCase.objects.filter(
+            review_lease_owner_id=request.user.pk,
+            status=ClinicalCase.Status.NON_APPROUVE,
+        ).order_by('created_at', 'id')
+        return Response(serialized(ClinicalCaseReviewSerializer(leased, many=True)))
+
+    @action(detail=False, methods=['post'])
+    def claim(self, request):
+        params = ReviewClaimSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        batch = review_queue.claim_batch(request.user, batch_size=params.validated_data.get('batch_size'))
+        return Response(serialized(ClinicalCaseReviewSerializer(batch, many=True)))
+
+    @action(detail=False, methods=['post'])
+    def approve(self, request):
+        return self._decide(request, ClinicalCase.Status.APPROUVE)
+
+    @action(detail=False, methods=['post'])
+    def reject(self, request):
+        return self._decide(request, ClinicalCase.Status.REJETE)
+
+    @action(detail=False, methods=['post'])
+    def release(self, request):
+        params = ReviewBatchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        released = review_queue.release(request.user, params.validated_data['ids'])
+        return Response({'released': released})
+
+    def _decide(self, request, new_status):
+        params = ReviewBatchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        updated, skipped = review_queue.apply_decision(request.user, params.validated_data['ids'], new_status)
+        return Response(
+            {'status': new_status, 'updated': updated, 'skipped': skipped},
+            status=status.HTTP_200_OK,
+        )
+
+
+class ImportCasesView(generics.GenericAPIView):
+    """
+    Lance un import Fultang en tâche de fond et rend la main immédiatement.
+    L'avancement se suit sur /api/jobs/<id>/.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsExpert]
+    serializer_class = ImportCasesSerializer
+
+    def post(self, request):
+        params = self.get_serializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        job = enqueue('cases.import_cases', payload=params.validated_data,
+                      priority=5, timeout_seconds=3600, enqueued_by=request.user)
+        return Response({'job_id': job.id, 'status': job.status}, status=status.HTTP_202_ACCEPTED)
+
+
+class DatasetStatsView(ReplicaReadsMixin, generics.GenericAPIView):
+    """
+    Statistiques du jeu de cas pour les experts (cf. cases.logic.dataset_stats).
+    ?status=<statut> limite les statistiques par cas (âge, symptômes...) à ce statut.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsExpert]
+
+    def get(self, request):
+        case_status = request.query_params.get('status')
+        if case_status is not None and case_status not in ClinicalCase.Status.values:
+            return Response({'detail': f"Statut inconnu : {case_status}."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(compute_stats(status=case_status))
+
+
+class VocabularyFacetsView(ReplicaReadsMixin, generics.GenericAPIView):
+    """
+    Termes canoniques les plus employés et leur nombre de cas approuvés (ceux que liste /cases/).
+    /vocabulary/symptoms/, /vocabulary/exams/, /vocabulary/physical-exams/ ; ?q=<début du terme>, ?limit=<n>.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    SOURCES = {
+        'symptoms': (SymptomTerm, None),
+        'exams': (ExamTerm, ExamTerm.Kind.COMPLEMENTAIRE),
+        'physical-exams': (ExamTerm, ExamTerm.Kind.PHYSIQUE),
+    }
+
+    def get(self, request, kind):
+        if kind not in self.SOURCES:
+            raise Http404
+        limit = request.query_params.get('limit', '50')
+        if not limit.isdigit():
+            return Response({'detail': "limit doit être un entier."}, status=status.HTTP_400_BAD_REQUEST)
+        term_model, term_kind = self.SOURCES[kind]
+        terms = vocabulary.facets(term_model, kind=term_kind, prefix=request.query_params.get('q'),
+                                  limit=min(int(limit), 500))
+        return Response({'kind': kind, 'terms': terms})
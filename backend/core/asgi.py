@@ -3,6 +3,10 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Le dialogue avec le patient simulé est diffusé en streaming (Server-Sent Events) par des
+vues asynchrones : en production, servir ce module avec un serveur ASGI, par exemple
+    uvicorn core.asgi:application --workers 2
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
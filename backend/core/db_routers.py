@@ -0,0 +1,60 @@
+# backend/core/db_routers.py
+"""
+Routage des lectures vers le réplica.
+
+Les lectures ne partent vers l'alias "replica" que dans un bloc `use_replica()`
+(API de consultation des cas, exports, recherches du simulateur) ; tout le reste,
+et toutes les écritures, passent par la base primaire. Sans alias "replica"
+configuré, le routeur est transparent.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+@contextmanager
+def use_replica():
+    """Envoie les lectures exécutées dans ce bloc vers le réplica (si configuré)."""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReplicaReadsMixin:
+    """Mixin de vue : les requêtes GET/HEAD/OPTIONS lisent sur le réplica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            with use_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or REPLICA_DB_ALIAS not in settings.DATABASES:
+            return None
+        # Dans une transaction sur la primaire, on relit ce qu'on vient d'écrire
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaire et réplica contiennent les mêmes données
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Autorisé partout pour qu'un réplica local (fichier SQLite) puisse recevoir le schéma
+        return True
@@ -0,0 +1,223 @@
+# backend/core/metrics.py
+"""
+Métriques de performance en mémoire (par processus).
+
+- `RequestMetrics` accumule, pour la requête en cours, le nombre de requêtes SQL,
+  le temps passé en base et la durée de chaque phase (auth, serialize, render, ...) ;
+  `SerializerTimingMixin` (vues génériques DRF) et `serialized()` (serializers construits à la
+  main) comptent le travail des serializers dans la phase « serialize ».
+- `registry` conserve des histogrammes cumulés par vue, exposés au format
+  texte Prometheus par `render_prometheus()` (cf. core.views.metrics_view).
+"""
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+_current_request = ContextVar('current_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Mesures collectées pendant le traitement d'une requête HTTP."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """À installer via connection.execute_wrapper() : chronomètre chaque requête SQL."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.db_seconds += perf_counter() - start
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def current_request_metrics():
+    return _current_request.get()
+
+
+@contextmanager
+def track_request(metrics):
+    token = _current_request.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_request.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """Chronomètre un bloc et l'ajoute à la requête en cours (sans effet hors requête)."""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current_request.get()
+        if metrics is not None:
+            metrics.add_phase(name, perf_counter() - start)
+
+
+def serialized(serializer):
+    """`serializer.data`, chronométré dans la phase « serialize » de la requête en cours."""
+    with phase('serialize'):
+        return serializer.data
+
+
+_timed_serializer_classes = {}
+
+
+def _timed_data(serializer):
+    with phase('serialize'):
+        return super(type(serializer), serializer).data
+
+
+def _timed_serializer_class(serializer_class):
+    """Sous-classe (mise en cache) dont `.data` est chronométré ; nom et module inchangés pour le schéma."""
+    timed = _timed_serializer_classes.get(serializer_class)
+    if timed is None:
+        timed = _timed_serializer_classes[serializer_class] = type(serializer_class)(
+            serializer_class.__name__, (serializer_class,), {
+                '__module__': serializer_class.__module__,
+                '__qualname__': serializer_class.__qualname__,
+                'data': property(_timed_data),
+            },
+        )
+    return timed
+
+
+class SerializerTimingMixin:
+    """
+    Mixin de vue générique DRF : le `.data` des serializers obtenus par `get_serializer()` (objet
+    seul ou liste) est compté dans la phase « serialize ». Le rendu de la réponse reste « render ».
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        serializer.__class__ = _timed_serializer_class(type(serializer))
+        return serializer
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes, étiqueté (au sens Prometheus)."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: dict(series, counts=list(series['counts'])) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(key, le=_format(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(key, le='+Inf')} {series['count']}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_format(series['sum'])}")
+            lines.append(f"{self.name}_count{_labels(key)} {series['count']}")
+        return lines
+
+
+class Counter:
+    """Compteur étiqueté (au sens Prometheus)."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for key, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_labels(key)} {_format(value)}")
+        return lines
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(key, **extra):
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class MetricsRegistry:
+    """Ensemble des métriques exposées sur /metrics."""
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+    def __init__(self):
+        self.requests = Counter('http_requests_total', "Nombre de requêtes HTTP traitées.")
+        self.latency = Histogram('http_request_duration_seconds', "Durée totale des requêtes.",
+                                 self.LATENCY_BUCKETS)
+        self.db_time = Histogram('http_request_db_seconds', "Temps passé en base par requête.",
+                                 self.LATENCY_BUCKETS)
+        self.queries = Histogram('http_request_db_queries', "Nombre de requêtes SQL par requête HTTP.",
+                                 self.QUERY_BUCKETS)
+        self.phases = Histogram('http_request_phase_seconds', "Durée des phases (auth, serialize, render, ...).",
+                                self.LATENCY_BUCKETS)
+        self.over_budget = Counter('http_requests_over_query_budget_total',
+                                   "Requêtes ayant dépassé le budget de requêtes SQL.")
+        self.simulation_answers = Counter('simulation_answers_total',
+                                          "Réponses du patient simulé, par source (facts ou llm).")
+        self.simulation_ttft = Histogram('simulation_answer_first_token_seconds',
+                                         "Temps jusqu'au premier token des réponses du patient simulé.",
+                                         self.LATENCY_BUCKETS)
+
+    def record(self, view, method, status, total_seconds, metrics, over_budget=False):
+        labels = {'view': view, 'method': method}
+        self.requests.inc(dict(labels, status=str(status)))
+        self.latency.observe(labels, total_seconds)
+        self.db_time.observe(labels, metrics.db_seconds)
+        self.queries.observe(labels, metrics.query_count)
+        for name, seconds in metrics.phases.items():
+            self.phases.observe(dict(labels, phase=name), seconds)
+        if over_budget:
+            self.over_budget.inc(labels)
+
+    def render_prometheus(self):
+        lines = []
+        metrics = (self.requests, self.latency, self.db_time, self.queries, self.phases, self.over_budget,
+                   self.simulation_answers, self.simulation_ttft)
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
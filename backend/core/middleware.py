@@ -0,0 +1,99 @@
+# backend/core/middleware.py
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .metrics import RequestMetrics, current_request_metrics, registry, track_request
+
+logger = logging.getLogger('core.performance')
+
+
+class PerformanceMiddleware:
+    """
+    Mesure chaque requête : nombre de requêtes SQL, temps en base, phases (auth JWT,
+    serializers, rendu de la réponse DRF) et latence totale.
+    - ajoute un en-tête `Server-Timing` lisible dans les outils de développement du navigateur ;
+    - journalise les requêtes qui dépassent PERF_QUERY_BUDGET requêtes SQL ;
+    - alimente les histogrammes exposés sur /metrics.
+    Compatible synchrone et asynchrone : sous ASGI, les vues async (streaming du simulateur)
+    sont appelées sans passer par un thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        start = perf_counter()
+        with track_request(metrics), self._wrap_connections(metrics):
+            response = self.get_response(request)
+        return self._finish(request, response, metrics, perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        start = perf_counter()
+        # Sous ASGI, l'ORM d'une requête s'exécute dans un thread dédié (sync_to_async), avec ses
+        # propres connexions : les chronomètres SQL sont installés et retirés dans ce thread
+        wrappers = await sync_to_async(self._wrap_connections)(metrics)
+        try:
+            with track_request(metrics):
+                response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.close)()
+        return self._finish(request, response, metrics, perf_counter() - start)
+
+    @staticmethod
+    def _wrap_connections(metrics):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(metrics.db_wrapper))
+        return stack
+
+    def _finish(self, request, response, metrics, total):
+        view = self._view_label(request)
+        over_budget = metrics.query_count > settings.PERF_QUERY_BUDGET
+        if over_budget:
+            logger.warning(
+                "Budget de requêtes SQL dépassé sur %s %s (%s) : %d requêtes (budget %d), %.1f ms en base, %.1f ms au total",
+                request.method, request.path, view, metrics.query_count, settings.PERF_QUERY_BUDGET,
+                metrics.db_seconds * 1000, total * 1000,
+            )
+        registry.record(view, request.method, response.status_code, total, metrics, over_budget)
+        response['Server-Timing'] = self._server_timing(metrics, total)
+        return response
+
+    def process_template_response(self, request, response):
+        # Appelé juste avant le rendu des SimpleTemplateResponse (dont les Response DRF) :
+        # on chronomètre le rendu (encodage JSON de response.data). Le travail des serializers
+        # (`.data`), fait dans la vue, est compté à part dans « serialize » (cf. SerializerTimingMixin).
+        metrics = current_request_metrics()
+        if metrics is not None:
+            render_start = perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: metrics.add_phase('render', perf_counter() - render_start)
+            )
+        return response
+
+    @staticmethod
+    def _view_label(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match.route or 'unknown'
+
+    @staticmethod
+    def _server_timing(metrics, total):
+        entries = [f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.query_count} queries"']
+        entries += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in metrics.phases.items()]
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
@@ -0,0 +1,39 @@
+# backend/core/pagination.py
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator qui remplace COUNT(*) par l'estimation du planificateur PostgreSQL
+    (pg_class.reltuples) lorsque le queryset n'est pas filtré et que la table est grosse.
+    Dès qu'un filtre ou une recherche est actif, ou sur les autres bases, le comptage exact est conservé.
+    """
+    estimate_threshold = 10_000
+
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def _estimated_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or queryset.query.where:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples vaut -1 tant que la table n'a jamais été analysée
+        if not row or row[0] is None or row[0] < 0:
+            return None
+        return int(row[0])
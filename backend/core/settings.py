@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,10 +50,13 @@ INSTALLED_APPS = [
     'simulation.apps.SimulationConfig',
     'evaluation.apps.EvaluationConfig',
     'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
     'rest_framework_simplejwt'
 ]
 
 MIDDLEWARE = [
+    # En premier pour mesurer la requête complète (cf. core.metrics)
+    "core.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -84,12 +88,106 @@ WSGI_APPLICATION = "core.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# Configurée par variables d'environnement :
+#   DB_ENGINE=sqlite (défaut) ou postgresql, DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+#   DB_CONN_MAX_AGE : durée de vie (s) des connexions persistantes, DB_POOL=1 : pool psycopg 3 (PostgreSQL)
+#   DB_REPLICA_NAME / DB_REPLICA_HOST / ... : ajoute un alias "replica" pour les lectures (cf. core.db_routers)
+# En local, deux fichiers SQLite peuvent jouer le rôle de primaire et de réplica :
+#   DB_REPLICA_NAME=replica.sqlite3 python manage.py migrate --database=replica
+
+load_dotenv(os.path.join(BASE_DIR, '.env'))
+
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+# Base de développement versionnée avec le dépôt
+DEV_SQLITE_DB = BASE_DIR / "db.sqlite3"
+
+
+def _database_config(prefix):
+    conn_max_age = int(os.getenv(f"{prefix}CONN_MAX_AGE", os.getenv("DB_CONN_MAX_AGE", 60)))
+
+    if DB_ENGINE == "sqlite":
+        name = os.getenv(f"{prefix}NAME", DEV_SQLITE_DB)
+        # WAL (les lecteurs ne bloquent plus l'écrivain) est un mode persistant, inscrit dans l'en-tête
+        # du fichier : il n'est pas appliqué à db.sqlite3, que toute commande manage.py modifierait.
+        # Utiliser DB_NAME=<fichier non versionné> pour en profiter en local.
+        wal = os.path.abspath(name) != os.path.abspath(DEV_SQLITE_DB)
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": name,
+            "CONN_MAX_AGE": conn_max_age,
+            "OPTIONS": {
+                # Attend un verrou d'écriture au lieu d'échouer immédiatement ("database is locked")
+                "timeout": 20,
+                # Prend le verrou d'écriture dès le début des transactions pour éviter les interblocages
+                "transaction_mode": "IMMEDIATE",
+                # Le reste réduit les fsync et les E/S
+                "init_command": (
+                    ("PRAGMA journal_mode=WAL;" if wal else "")
+                    + "PRAGMA synchronous=NORMAL;"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000;"
+                    "PRAGMA mmap_size=134217728;"
+                ),
+            },
+        }
+
+    options = {}
+    if os.getenv("DB_POOL") == "1":
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            raise ImproperlyConfigured(
+                "DB_POOL=1 nécessite psycopg 3 et son pool : pip install 'psycopg[binary,pool]'."
+            )
+        # Pool de connexions natif (Django >= 5.1, nécessite psycopg[pool]) ;
+        # incompatible avec les connexions persistantes.
+        options["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+        }
+        conn_max_age = 0
+    return {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.getenv(f"{prefix}NAME", os.getenv("DB_NAME", "medical_tutor")),
+        "USER": os.getenv(f"{prefix}USER", os.getenv("DB_USER", "postgres")),
+        "PASSWORD": os.getenv(f"{prefix}PASSWORD", os.getenv("DB_PASSWORD", "")),
+        "HOST": os.getenv(f"{prefix}HOST", os.getenv("DB_HOST", "localhost")),
+        "PORT": os.getenv(f"{prefix}PORT", os.getenv("DB_PORT", "5432")),
+        "CONN_MAX_AGE": conn_max_age,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": options,
+    }
+
 
 DATABASES = {
+    "default": _database_config("DB_"),
+}
+
+if os.getenv("DB_REPLICA_NAME") or os.getenv("DB_REPLICA_HOST"):
+    DATABASES["replica"] = _database_config("DB_REPLICA_")
+    # En test, le réplica pointe sur la base de test principale
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["core.db_routers.PrimaryReplicaRouter"]
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Colonnes des statistiques du jeu de cas (cf. cases.logic.dataset_stats), partagées entre
+    # les processus de l'API et la commande dataset_stats
+    "dataset_stats": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("DATASET_STATS_CACHE_DIR", BASE_DIR / "var" / "cache" / "dataset_stats"),
+        "TIMEOUT": None,
+    },
+    # Réponses du LLM à l'import, par empreinte du prompt (cf. la commande import_cases)
+    "import_llm": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CASES_IMPORT_LLM_CACHE_DIR", BASE_DIR / "var" / "cache" / "import_llm"),
+        "TIMEOUT": int(os.getenv("CASES_IMPORT_LLM_CACHE_TIMEOUT", 7 * 24 * 3600)),
+    },
 }
 
 
@@ -136,15 +234,118 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
 
-load_dotenv(os.path.join(BASE_DIR, '.env'))
-
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 FULTANG_API_URL = os.getenv("FULTANG_API_URL")
 
+# File de relecture des experts : taille d'un lot et durée de réservation (secondes)
+REVIEW_QUEUE_BATCH_SIZE = int(os.getenv("REVIEW_QUEUE_BATCH_SIZE", 10))
+REVIEW_QUEUE_LEASE_SECONDS = int(os.getenv("REVIEW_QUEUE_LEASE_SECONDS", 15 * 60))
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Authentification sans accès BDD : l'utilisateur est reconstruit à partir des claims signés
+        'users.authentication.StatelessJWTAuthentication',
+        # Conservée pour l'API navigable (session de l'admin)
+        'rest_framework.authentication.SessionAuthentication',
     ),
-}
\ No newline at end of file
+}
+
+SIMPLE_JWT = {
+    'TOKEN_USER_CLASS': 'users.authentication.ClaimsUser',
+}
+
+# Fréquence de rechargement de la liste des comptes désactivés (secondes)
+JWT_DENYLIST_REFRESH_SECONDS = int(os.getenv("JWT_DENYLIST_REFRESH_SECONDS", 60))
+
+# File de tâches : délai de base (s) avant une nouvelle tentative, doublé à chaque échec
+JOBS_RETRY_BACKOFF_SECONDS = int(os.getenv("JOBS_RETRY_BACKOFF_SECONDS", 30))
+# Intervalle (s) entre deux prolongations de la réservation d'une tâche en cours ; elle expire
+# après trois battements manqués (worker arrêté)
+JOBS_HEARTBEAT_SECONDS = int(os.getenv("JOBS_HEARTBEAT_SECONDS", 30))
+
+# Journalisation : les workers de la file (run_jobs) écrivent leur activité sur la console
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "simple": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "simple"},
+    },
+    "loggers": {
+        "jobs": {"handlers": ["console"], "level": os.getenv("JOBS_LOG_LEVEL", "INFO"), "propagate": False},
+    },
+}
+
+# Index vectoriel des cas (RAG du simulateur)
+SIMULATION_INDEX_DIR = os.getenv("SIMULATION_INDEX_DIR", BASE_DIR / "var" / "case_index")
+SIMULATION_INDEX_MODE = os.getenv("SIMULATION_INDEX_MODE", "exact")  # "exact" ou "ivf"
+SIMULATION_INDEX_NPROBE = int(os.getenv("SIMULATION_INDEX_NPROBE", 8))
+SIMULATION_INDEX_AUTO_UPDATE = os.getenv("SIMULATION_INDEX_AUTO_UPDATE", "1") == "1"
+
+# Détection des notes Fultang quasi identiques à l'import (cf. cases.logic.dedup).
+# Seuil : similarité de Jaccard estimée (triplets de mots) au-delà de laquelle une note est un quasi-doublon.
+CASES_DEDUP_INDEX_DIR = os.getenv("CASES_DEDUP_INDEX_DIR", BASE_DIR / "var" / "notes_dedup")
+CASES_DEDUP_THRESHOLD = float(os.getenv("CASES_DEDUP_THRESHOLD", 0.8))
+CASES_DEDUP_NUM_PERM = int(os.getenv("CASES_DEDUP_NUM_PERM", 128))
+CASES_DEDUP_BANDS = int(os.getenv("CASES_DEDUP_BANDS", 16))
+# Nombre de notes indexées entre deux sauvegardes de l'index pendant un import
+CASES_DEDUP_SAVE_EVERY = int(os.getenv("CASES_DEDUP_SAVE_EVERY", 20))
+# Import Fultang : rapports de télémétrie (cf. cases.logic.import_telemetry) et reprises des appels au LLM.
+# Prix en USD par million de tokens, pour estimer le coût d'un import (tarif indicatif de Gemini Flash).
+CASES_IMPORT_REPORT_DIR = os.getenv("CASES_IMPORT_REPORT_DIR", BASE_DIR / "var" / "import_reports")
+CASES_IMPORT_LLM_RETRIES = int(os.getenv("CASES_IMPORT_LLM_RETRIES", 2))
+CASES_IMPORT_LLM_RETRY_BACKOFF = float(os.getenv("CASES_IMPORT_LLM_RETRY_BACKOFF", 2.0))
+CASES_IMPORT_LLM_PRICE_INPUT = float(os.getenv("CASES_IMPORT_LLM_PRICE_INPUT", 0.30))
+CASES_IMPORT_LLM_PRICE_OUTPUT = float(os.getenv("CASES_IMPORT_LLM_PRICE_OUTPUT", 2.50))
+SIMULATION_EMBEDDER = os.getenv("SIMULATION_EMBEDDER", "simulation.logic.embeddings.HashingEmbedder")
+
+# LLM du patient simulé : "stub" (local, sans réseau) ou "gemini"
+SIMULATION_LLM_BACKEND = os.getenv("SIMULATION_LLM_BACKEND", "stub")
+SIMULATION_STUB_FIRST_TOKEN_LATENCY = float(os.getenv("SIMULATION_STUB_FIRST_TOKEN_LATENCY", 0.3))
+SIMULATION_STUB_TOKENS_PER_SECOND = float(os.getenv("SIMULATION_STUB_TOKENS_PER_SECOND", 40))
+
+# Journal des sessions : messages gardés tels quels dans le prompt, taille des écritures groupées,
+# lignes conservées dans le résumé des échanges plus anciens, sessions gardées en mémoire par processus.
+SIMULATION_CONTEXT_TURNS = int(os.getenv("SIMULATION_CONTEXT_TURNS", 8))
+SIMULATION_LOG_FLUSH_TURNS = int(os.getenv("SIMULATION_LOG_FLUSH_TURNS", 8))
+SIMULATION_SUMMARY_MAX_LINES = int(os.getenv("SIMULATION_SUMMARY_MAX_LINES", 20))
+SIMULATION_LOG_CACHE_SIZE = int(os.getenv("SIMULATION_LOG_CACHE_SIZE", 1000))
+# Contextes de prompt des cas rendus en mémoire (nombre d'entrées, fraîcheur entre processus en secondes)
+SIMULATION_PROMPT_CACHE_SIZE = int(os.getenv("SIMULATION_PROMPT_CACHE_SIZE", 2000))
+SIMULATION_PROMPT_CACHE_TTL = int(os.getenv("SIMULATION_PROMPT_CACHE_TTL", 60))
+# Cache des réponses du patient partagé entre apprenants : similarité minimale entre questions,
+# durée de vie d'une réponse (s), réponses gardées par cas, cas gardés, lectures entre deux
+# écritures des statistiques
+SIMULATION_ANSWER_CACHE_THRESHOLD = float(os.getenv("SIMULATION_ANSWER_CACHE_THRESHOLD", 0.85))
+SIMULATION_ANSWER_CACHE_TTL = int(os.getenv("SIMULATION_ANSWER_CACHE_TTL", 24 * 3600))
+SIMULATION_ANSWER_CACHE_PER_CASE = int(os.getenv("SIMULATION_ANSWER_CACHE_PER_CASE", 200))
+SIMULATION_ANSWER_CACHE_CASES = int(os.getenv("SIMULATION_ANSWER_CACHE_CASES", 500))
+SIMULATION_ANSWER_CACHE_STATS_FLUSH = int(os.getenv("SIMULATION_ANSWER_CACHE_STATS_FLUSH", 50))
+
+# Barème de notation des diagnostics (cf. evaluation.logic.scoring) : changer `version` après toute
+# modification, puis renoter avec `manage.py rescore_submissions --stale`
+EVALUATION_RUBRIC = {
+    "version": os.getenv("EVALUATION_RUBRIC_VERSION", "3"),
+    "final_weight": 0.6,
+    "differential_weight": 0.4,
+    "full_credit": 0.85,
+    "partial_credit": 0.5,
+}
+# Poids du dernier score dans la tendance récente des agrégats apprenant (moyenne mobile exponentielle)
+EVALUATION_TREND_ALPHA = float(os.getenv("EVALUATION_TREND_ALPHA", 0.3))
+# Recommandeur de cas : faiblesse attribuée aux catégories jamais travaillées, et durée de vie (s)
+# de l'index catégorie -> cas approuvés de chaque processus
+EVALUATION_RECOMMENDER_UNSEEN_WEAKNESS = float(os.getenv("EVALUATION_RECOMMENDER_UNSEEN_WEAKNESS", 0.75))
+EVALUATION_RECOMMENDER_INDEX_TTL = int(os.getenv("EVALUATION_RECOMMENDER_INDEX_TTL", 300))
+# Rapports de feedback : délai d'exécution de la tâche de génération (s) ; un rapport resté en
+# attente au-delà (worker perdu, tâche abandonnée) est redemandé à la consultation suivante
+EVALUATION_REPORT_JOB_TIMEOUT = int(os.getenv("EVALUATION_REPORT_JOB_TIMEOUT", 600))
+
+# Instrumentation : au-delà de ce nombre de requêtes SQL, la requête HTTP est journalisée
+PERF_QUERY_BUDGET = int(os.getenv("PERF_QUERY_BUDGET", 20))
+# Adresses autorisées à lire /metrics hors mode DEBUG
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1").split(",")
@@ -0,0 +1,22 @@
+# backend/core/stats.py
+"""Résumés de latences partagés par les benchmarks et la télémétrie de l'import."""
+
+
+def percentile(values, percent):
+    """Percentile au rang le plus proche (valeurs non vides)."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(latencies):
+    """Résumé p50/p95/p99/max en millisecondes d'une liste de durées en secondes."""
+    if not latencies:
+        return {'samples': 0}
+    return {
+        'samples': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2),
+    }
@@ -1,3 +1,34 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import DiagnosisSubmission, FeedbackReport, LearnerCaseProgress, LearnerCategoryStats
+
+
+@admin.register(DiagnosisSubmission)
+class DiagnosisSubmissionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'learner', 'case', 'final_diagnosis', 'score', 'rubric_version', 'submitted_at')
+    list_filter = ('rubric_version',)
+    list_select_related = ('learner', 'case')
+    raw_id_fields = ('learner', 'case', 'session')
+    readonly_fields = ('score', 'final_score', 'differential_score', 'rubric_version', 'scored_at', 'score_details')
+
+
+@admin.register(LearnerCategoryStats)
+class LearnerCategoryStatsAdmin(admin.ModelAdmin):
+    list_display = ('learner', 'category', 'attempts', 'mean_score', 'recent_score', 'time_spent_s', 'last_attempt_at')
+    list_select_related = ('learner', 'category')
+    raw_id_fields = ('learner',)
+
+
+@admin.register(FeedbackReport)
+class FeedbackReportAdmin(admin.ModelAdmin):
+    list_display = ('session', 'rubric_version', 'status', 'prompt_hash', 'generated_at')
+    list_filter = ('status', 'rubric_version')
+    raw_id_fields = ('session',)
+    exclude = ('pdf',)
+
+
+@admin.register(LearnerCaseProgress)
+class LearnerCaseProgressAdmin(admin.ModelAdmin):
+    list_display = ('learner', 'completed_count', 'updated_at')
+    raw_id_fields = ('learner',)
+    exclude = ('completed',)
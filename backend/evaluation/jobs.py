@@ -0,0 +1,11 @@
+# backend/evaluation/jobs.py
+from jobs.registry import register_job
+
+
+@register_job('evaluation.generate_feedback_reports')
+def generate_feedback_reports(submission_ids, force=False):
+    from .models import DiagnosisSubmission
+    from .services.feedback_engine import generate_reports
+
+    submissions = DiagnosisSubmission.objects.filter(pk__in=submission_ids)
+    return generate_reports(submissions, force=force)
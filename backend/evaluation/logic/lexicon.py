@@ -0,0 +1,167 @@
+# backend/evaluation/logic/lexicon.py
+"""
+Normalisation des libellés de diagnostic.
+
+Un libellé est mis en minuscules sans accents, débarrassé des mots-outils, ses abréviations
+sont développées (« HTA » -> « hypertension artérielle ») puis il est ramené à sa forme
+canonique si c'est un synonyme connu (« IDM » -> « syndrome coronarien aigu »). L'index
+variante -> forme canonique est calculé une fois au chargement du module.
+
+Les synonymes ne regroupent jamais deux diagnostics qui ne diffèrent que par un qualificatif
+discriminant (aigu / chronique, ischémique / hémorragique, avec / sans aura...) : la forme
+canonique n'est retenue que si elle ne contredit aucun qualificatif du libellé saisi, pour que
+la notation (cf. scoring) puisse encore les distinguer.
+"""
+import re
+from functools import lru_cache
+
+from simulation.logic.embeddings import normalize_text
+
+# Abréviations courantes, développées mot à mot avant la recherche de synonymes
+ABBREVIATIONS = {
+    'hta': 'hypertension arterielle',
+    'avc': 'accident vasculaire cerebral',
+    'ait': 'accident ischemique transitoire',
+    'idm': 'infarctus du myocarde',
+    'sca': 'syndrome coronarien aigu',
+    'ep': 'embolie pulmonaire',
+    'tvp': 'thrombose veineuse profonde',
+    'bpco': 'bronchopneumopathie chronique obstructive',
+    'pfla': 'pneumopathie franche lobaire aigue',
+    'pnp': 'pneumopathie',
+    'ira': 'insuffisance renale aigue',
+    'irc': 'insuffisance renale chronique',
+    'ic': 'insuffisance cardiaque',
+    'icc': 'insuffisance cardiaque congestive',
+    'oap': 'oedeme aigu du poumon',
+    'acfa': 'fibrillation auriculaire',
+    'fa': 'fibrillation auriculaire',
+    'dt1': 'diabete de type 1',
+    'dt2': 'diabete de type 2',
+    'did': 'diabete de type 1',
+    'dnid': 'diabete de type 2',
+    'acidocetose': 'acidocetose diabetique',
+    'iu': 'infection urinaire',
+    'ivu': 'infection urinaire',
+    'pna': 'pyelonephrite aigue',
+    'vih': 'infection par le vih',
+    'sida': 'infection par le vih',
+    'tb': 'tuberculose',
+    'tbc': 'tuberculose',
+    'tpm+': 'tuberculose pulmonaire',
+    'rgo': 'reflux gastro oesophagien',
+    'ugd': 'ulcere gastro duodenal',
+    'mici': 'maladie inflammatoire chronique de l intestin',
+    'pr': 'polyarthrite rhumatoide',
+    'hbp': 'hypertrophie benigne de la prostate',
+    'geu': 'grossesse extra uterine',
+}
+
+# Forme canonique -> variantes et synonymes (déjà sans accents)
+SYNONYMS = {
+    'syndrome coronarien aigu': [
+        'sca', 'infarctus du myocarde', 'infarctus du myocarde aigu', 'crise cardiaque',
+        'insuffisance coronarienne aigue',
+    ],
+    'pneumopathie franche lobaire aigue': [
+        'pneumonie franche lobaire aigue', 'pneumonie a pneumocoque', 'pneumopathie a pneumocoque',
+    ],
+    'embolie pulmonaire': ['embolie pulmonaire aigue', 'thrombo embolie pulmonaire', 'tep'],
+    'paludisme grave': ['paludisme severe', 'acces palustre grave', 'neuropaludisme', 'paludisme compliquee'],
+    'paludisme simple': ['acces palustre simple', 'paludisme non complique', 'malaria'],
+    'fievre typhoide': ['typhoide', 'salmonellose typhique'],
+    'cholecystite aigue': ['cholecystite', 'cholecystite lithiasique'],
+    'decompensation diabetique': ['diabete desequilibre', 'decompensation d un diabete'],
+    'migraine': ['crise migraineuse'],
+    'accident vasculaire cerebral': ['attaque cerebrale'],
+    'accident vasculaire cerebral ischemique': ['infarctus cerebral'],
+    'insuffisance cardiaque': ['insuffisance cardiaque congestive', 'insuffisance cardiaque decompensee'],
+    'tuberculose pulmonaire': ['tuberculose pulmonaire commune', 'bacillose pulmonaire'],
+    'infection urinaire': ['cystite', 'infection urinaire basse'],
+    'pyelonephrite aigue': ['pyelonephrite', 'infection urinaire haute'],
+    'hypertension arterielle': ['hypertension', 'hypertension arterielle essentielle', 'poussee hypertensive'],
+    'diabete de type 2': ['diabete non insulinodependant', 'diabete sucre de type 2'],
+}
+
+# Qualificatifs qui distinguent deux diagnostics proches ; variante -> valeur, par groupe
+QUALIFIERS = {
+    'acuite': {'aigu': 'aigu', 'aigue': 'aigu', 'suraigu': 'aigu', 'suraigue': 'aigu',
+               'subaigu': 'subaigu', 'subaigue': 'subaigu', 'chronique': 'chronique'},
+    'gravite': {'simple': 'simple', 'grave': 'grave', 'severe': 'grave', 'complique': 'grave',
+                'compliquee': 'grave'},
+    'cote': {'droit': 'droit', 'droite': 'droit', 'gauche': 'gauche', 'bilateral': 'bilateral',
+             'bilaterale': 'bilateral'},
+    'mecanisme': {'ischemique': 'ischemique', 'hemorragique': 'hemorragique'},
+}
+# Qualificatifs de deux mots, lus avant les mots isolés (« non compliqué » n'est pas « compliqué »)
+QUALIFIER_PHRASES = {
+    ('non', 'complique'): ('gravite', 'simple'),
+    ('non', 'compliquee'): ('gravite', 'simple'),
+    ('avec', 'aura'): ('aura', 'avec'),
+    ('sans', 'aura'): ('aura', 'sans'),
+}
+QUALIFIER_GROUPS = ('numero', *QUALIFIERS, 'aura')
+
+STOPWORDS = frozenset('a au aux d de des du en et l la le les par sur un une'.split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9+]+")
+
+
+def _tokens(label):
+    return [token for token in _TOKEN_RE.findall(normalize_text(label)) if token not in STOPWORDS]
+
+
+def _expand(tokens):
+    expanded = []
+    for token in tokens:
+        replacement = ABBREVIATIONS.get(token)
+        expanded.extend(_tokens(replacement) if replacement else [token])
+    return expanded
+
+
+def _build_index():
+    index = {}
+    for canonical, variants in SYNONYMS.items():
+        key = ' '.join(_expand(_tokens(canonical)))
+        for variant in [canonical, *variants]:
+            index.setdefault(' '.join(_expand(_tokens(variant))), key)
+    return index
+
+
+CANONICAL_INDEX = _build_index()
+
+
+def qualifiers(label):
+    """Qualificatifs d'un libellé normalisé : {groupe: frozenset(valeurs)} ; les nombres forment le groupe 'numero'."""
+    tokens = label.split()
+    found = {group: set() for group in QUALIFIER_GROUPS}
+    skip = False
+    for token, following in zip(tokens, tokens[1:] + [None]):
+        if skip:
+            skip = False
+            continue
+        phrase = QUALIFIER_PHRASES.get((token, following))
+        if phrase:
+            found[phrase[0]].add(phrase[1])
+            skip = True
+        elif token.isdigit():
+            found['numero'].add(token)
+        else:
+            for group, values in QUALIFIERS.items():
+                if token in values:
+                    found[group].add(values[token])
+    return {group: frozenset(values) for group, values in found.items()}
+
+
+def _compatible(text, canonical):
+    # La forme canonique peut préciser un qualificatif absent du libellé, jamais en contredire un
+    mine, theirs = qualifiers(text), qualifiers(canonical)
+    return all(not mine[group] or mine[group] == theirs[group] for group in QUALIFIER_GROUPS)
+
+
+@lru_cache(maxsize=50_000)
+def normalize_diagnosis(label):
+    """Forme normalisée et canonique d'un libellé de diagnostic (chaîne vide si rien d'exploitable)."""
+    text = ' '.join(_expand(_tokens(label or '')))
+    canonical = CANONICAL_INDEX.get(text)
+    return canonical if canonical is not None and _compatible(text, canonical) else text
@@ -0,0 +1,120 @@
+# backend/evaluation/logic/performance.py
+"""
+Agrégats de performance par apprenant et par catégorie (LearnerCategoryStats).
+
+Chaque soumission notée met à jour, par des UPDATE atomiques (F()), la ligne « toutes catégories »
+de l'apprenant et celle de chaque catégorie du cas : le tableau de bord lit ces lignes sans
+parcourir l'historique. La tendance récente est une moyenne mobile exponentielle, qui se met à
+jour sans relire les scores précédents. Une renotation (changement de barème) ou un reclassement
+de cas ne se prête pas à une mise à jour incrémentale : rebuild_learner_stats recalcule alors
+les agrégats des apprenants concernés en un seul parcours ordonné de leurs soumissions.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+
+from cases.models import ClinicalCase
+from evaluation.models import DiagnosisSubmission, LearnerCategoryStats
+
+
+def case_categories(case_ids):
+    """case_id -> [None (toutes catégories), category_id, ...]"""
+    keys = {case_id: [None] for case_id in case_ids}
+    rows = ClinicalCase.categories.through.objects.filter(clinicalcase_id__in=keys).values_list(
+        'clinicalcase_id', 'category_id',
+    )
+    for case_id, category_id in rows:
+        keys[case_id].append(category_id)
+    return keys
+
+
+def time_spent(submitted_at, started_at, ended_at):
+    if started_at is None:
+        return 0.0
+    return max(((ended_at or submitted_at) - started_at).total_seconds(), 0.0)
+
+
+def record_submissions(submissions):
+    """Ajoute des soumissions fraîchement notées aux agrégats de leur apprenant."""
+    submissions = [submission for submission in submissions if submission.score is not None]
+    if not submissions:
+        return
+    alpha = settings.EVALUATION_TREND_ALPHA
+    categories = case_categories({submission.case_id for submission in submissions})
+    with transaction.atomic():
+        keys = {(s.learner_id, category_id) for s in submissions for category_id in categories[s.case_id]}
+        LearnerCategoryStats.objects.bulk_create(
+            [LearnerCategoryStats(learner_id=learner_id, category_id=category_id) for learner_id, category_id in keys],
+            ignore_conflicts=True,
+        )
+        for submission in sorted(submissions, key=lambda s: s.submitted_at):
+            session = submission.session
+            spent = time_spent(submission.submitted_at, session and session.started_at, session and session.ended_at)
+            score = submission.score
+            # Mêmes incréments pour la ligne « toutes catégories » et celles des catégories du cas
+            LearnerCategoryStats.objects.filter(
+                Q(category__isnull=True) | Q(category_id__in=categories[submission.case_id][1:]),
+                learner_id=submission.learner_id,
+            ).update(
+                attempts=F('attempts') + 1,
+                score_sum=F('score_sum') + score,
+                best_score=Greatest(F('best_score'), Value(score)),
+                recent_score=Case(
+                    When(attempts=0, then=Value(score)),
+                    default=F('recent_score') * (1 - alpha) + score * alpha,
+                ),
+                time_spent_s=F('time_spent_s') + spent,
+                last_attempt_at=submission.submitted_at,
+            )
+
+
+class _Aggregate:
+    __slots__ = ('attempts', 'score_sum', 'best_score', 'recent_score', 'time_spent_s', 'last_attempt_at')
+
+    def __init__(self):
+        self.attempts, self.score_sum, self.best_score, self.recent_score, self.time_spent_s = 0, 0.0, 0.0, 0.0, 0.0
+        self.last_attempt_at = None
+
+    def add(self, score, spent, submitted_at, alpha):
+        self.recent_score = score if not self.attempts else self.recent_score * (1 - alpha) + score * alpha
+        self.attempts += 1
+        self.score_sum += score
+        self.best_score = max(self.best_score, score)
+        self.time_spent_s += spent
+        self.last_attempt_at = submitted_at
+
+
+def rebuild_learner_stats(learner_ids=None, chunk_size=5000):
+    """
+    Recalcule les agrégats depuis les soumissions notées (de tous les apprenants si learner_ids
+    est None). Renvoie le nombre de lignes écrites.
+    """
+    alpha = settings.EVALUATION_TREND_ALPHA
+    submissions = DiagnosisSubmission.objects.filter(score__isnull=False)
+    if learner_ids is not None:
+        submissions = submissions.filter(learner_id__in=learner_ids)
+    rows = submissions.order_by('learner_id', 'submitted_at', 'id').values_list(
+        'learner_id', 'case_id', 'score', 'submitted_at', 'session__started_at', 'session__ended_at',
+    )
+    categories = case_categories(set(submissions.values_list('case_id', flat=True).distinct()))
+    aggregates = defaultdict(_Aggregate)
+    for learner_id, case_id, score, submitted_at, started_at, ended_at in rows.iterator(chunk_size=chunk_size):
+        spent = time_spent(submitted_at, started_at, ended_at)
+        for category_id in categories[case_id]:
+            aggregates[learner_id, category_id].add(score, spent, submitted_at, alpha)
+
+    stale = LearnerCategoryStats.objects.all()
+    if learner_ids is not None:
+        stale = stale.filter(learner_id__in=learner_ids)
+    with transaction.atomic():
+        stale.delete()
+        LearnerCategoryStats.objects.bulk_create([
+            LearnerCategoryStats(learner_id=learner_id, category_id=category_id, **{
+                name: getattr(aggregate, name) for name in _Aggregate.__slots__
+            })
+            for (learner_id, category_id), aggregate in aggregates.items()
+        ], batch_size=1000)
+    return len(aggregates)
@@ -0,0 +1,253 @@
+# backend/evaluation/logic/recommender.py
+"""
+Recommandation du prochain cas d'un apprenant, sans ORDER BY RANDOM() ni parcours de l'historique.
+
+- `CaseIndex` : index du processus catégorie -> cas approuvés. Chaque cas approuvé reçoit une
+  position dense (0, 1, 2... ; les positions libérées sont réutilisées) et chaque catégorie porte
+  un masque binaire sur ces positions (entier Python) : sa taille suit le nombre de cas approuvés,
+  pas la plus grande clé primaire. Construit une fois, puis mis à jour cas par cas à réception de
+  case_document_changed (approbation, reclassement) ; reconstruit au-delà de
+  EVALUATION_RECOMMENDER_INDEX_TTL secondes pour rattraper les changements vus par d'autres processus.
+- `LearnerCaseProgress` : identifiants triés des cas terminés par l'apprenant (int64 little-endian),
+  mis à jour à la fin de chaque session. Les positions n'étant propres qu'à un processus, le
+  masque des cas terminés est recalculé à chaque recommandation (une opération par cas terminé).
+- Faiblesse par catégorie : 1 - score récent (LearnerCategoryStats) ; une catégorie jamais
+  travaillée vaut EVALUATION_RECOMMENDER_UNSEEN_WEAKNESS.
+
+`recommend()` parcourt les catégories une fois (masque & ~terminés pour savoir s'il reste un cas),
+retient la plus faible, puis tire un cas non terminé à partir d'une position aléatoire de sa liste.
+Les cas sans catégorie forment la catégorie None, pondérée par la ligne « toutes catégories ».
+"""
+import random
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from time import monotonic
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from cases.models import ClinicalCase
+from evaluation.models import LearnerCaseProgress, LearnerCategoryStats
+
+
+def case_ids_from_bytes(data):
+    return np.frombuffer(bytes(data or b''), dtype='<i8').tolist()
+
+
+def case_ids_to_bytes(case_ids):
+    return np.asarray(sorted(case_ids), dtype='<i8').tobytes()
+
+
+class CategoryCases:
+    __slots__ = ('cases', 'positions', 'mask')
+
+    def __init__(self):
+        self.cases = []
+        self.positions = {}
+        self.mask = 0  # bit n = cas de position dense n dans le CaseIndex
+
+    def add(self, case_id, bit):
+        if case_id not in self.positions:
+            self.positions[case_id] = len(self.cases)
+            self.cases.append(case_id)
+            self.mask |= 1 << bit
+
+    def remove(self, case_id, bit):
+        position = self.positions.pop(case_id, None)
+        if position is None:
+            return
+        # Le dernier cas prend la place du cas retiré (suppression en O(1))
+        last = self.cases.pop()
+        if last != case_id:
+            self.cases[position] = last
+            self.positions[last] = position
+        self.mask &= ~(1 << bit)
+
+    def pick(self, completed_mask, completed, rng):
+        """Un cas hors de `completed` (ids), en partant d'une position aléatoire ; None si tous sont terminés."""
+        if not self.mask & ~completed_mask:
+            return None
+        start = rng.randrange(len(self.cases))
+        for offset in range(len(self.cases)):
+            case_id = self.cases[(start + offset) % len(self.cases)]
+            if case_id not in completed:
+                return case_id
+        return None
+
+
+class CaseIndex:
+
+    def __init__(self):
+        self._categories = {}
+        self._case_categories = {}  # case_id -> catégories indexées
+        self._bits = {}  # case_id -> position dense
+        self._free_bits = []
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _approved_categories(case_ids=None):
+        cases = ClinicalCase.objects.filter(status=ClinicalCase.Status.APPROUVE)
+        if case_ids is not None:
+            cases = cases.filter(pk__in=case_ids)
+        by_case = {case_id: set() for case_id in cases.values_list('pk', flat=True)}
+        links = ClinicalCase.categories.through.objects.filter(clinicalcase_id__in=by_case).values_list(
+            'clinicalcase_id', 'category_id',
+        )
+        for case_id, category_id in links:
+            by_case[case_id].add(category_id)
+        return {case_id: categories or {None} for case_id, categories in by_case.items()}
+
+    def _add(self, case_id, categories):
+        bit = self._free_bits.pop() if self._free_bits else len(self._bits)
+        self._bits[case_id] = bit
+        self._case_categories[case_id] = categories
+        for category_id in categories:
+            self._categories.setdefault(category_id, CategoryCases()).add(case_id, bit)
+
+    def _remove(self, case_id):
+        bit = self._bits.pop(case_id, None)
+        if bit is None:
+            return
+        self._free_bits.append(bit)
+        for category_id in self._case_categories.pop(case_id, ()):
+            entry = self._categories[category_id]
+            entry.remove(case_id, bit)
+            if not entry.cases:
+                del self._categories[category_id]
+
+    def _reset(self):
+        self._categories, self._case_categories, self._bits, self._free_bits = {}, {}, {}, []
+
+    def rebuild(self):
+        approved = self._approved_categories()
+        with self._lock:
+            self._reset()
+            for case_id, categories in sorted(approved.items()):
+                self._add(case_id, categories)
+            self._built_at = monotonic()
+
+    def refresh(self, case_ids):
+        """Mise à jour incrémentale : relit le statut et les catégories de ces cas seulement."""
+        if self._built_at is None:
+            return
+        approved = self._approved_categories(case_ids)
+        with self._lock:
+            for case_id in case_ids:
+                self._remove(case_id)
+                if case_id in approved:
+                    self._add(case_id, approved[case_id])
+
+    def snapshot(self, case_ids):
+        """(catégories indexées, masque des positions de `case_ids` parmi les cas indexés)."""
+        if self._built_at is None or monotonic() - self._built_at >= settings.EVALUATION_RECOMMENDER_INDEX_TTL:
+            self.rebuild()
+        with self._lock:
+            mask = 0
+            for case_id in case_ids:
+                bit = self._bits.get(case_id)
+                if bit is not None:
+                    mask |= 1 << bit
+            return list(self._categories.items()), mask
+
+    def categories(self):
+        return self.snapshot(())[0]
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._built_at = None
+
+
+case_index = CaseIndex()
+
+
+@dataclass(frozen=True)
+class Recommendation:
+    case_id: int
+    category_id: int
+    weakness: float
+    repeat: bool
+
+
+def category_weaknesses(learner_id):
+    weaknesses = {}
+    for category_id, attempts, recent_score in LearnerCategoryStats.objects.filter(
+        learner_id=learner_id,
+    ).values_list('category_id', 'attempts', 'recent_score'):
+        if attempts:
+            weaknesses[category_id] = 1.0 - recent_score
+    return weaknesses
+
+
+def completed_cases(learner_id):
+    data = LearnerCaseProgress.objects.filter(learner_id=learner_id).values_list('completed', flat=True).first()
+    return set(case_ids_from_bytes(data))
+
+
+def recommend(learner_id, rng=None, exclude=()):
+    """Prochain cas conseillé à l'apprenant, ou None s'il n'y a aucun cas approuvé."""
+    rng = rng or random.Random()
+    weaknesses = category_weaknesses(learner_id)
+    unseen = settings.EVALUATION_RECOMMENDER_UNSEEN_WEAKNESS
+    completed = completed_cases(learner_id) | set(exclude)
+    categories, completed_mask = case_index.snapshot(completed)
+
+    best, fallback = None, None
+    for category_id, entry in categories:
+        # La ligne « toutes catégories » (None) pondère aussi les cas sans catégorie
+        weakness = weaknesses.get(category_id, unseen)
+        # Petit bruit : départage les catégories de même faiblesse
+        key = (weakness, rng.random())
+        if entry.mask & ~completed_mask:
+            if best is None or key > best[0]:
+                best = (key, category_id, entry)
+        elif fallback is None or key > fallback[0]:
+            fallback = (key, category_id, entry)
+
+    if best is not None:
+        (weakness, _), category_id, entry = best
+        return Recommendation(entry.pick(completed_mask, completed, rng), category_id, round(weakness, 4), repeat=False)
+    if fallback is not None:
+        # Tous les cas ont été faits : révision dans la catégorie la plus faible
+        (weakness, _), category_id, entry = fallback
+        return Recommendation(rng.choice(entry.cases), category_id, round(weakness, 4), repeat=True)
+    return None
+
+
+def mark_completed(learner_id, case_id):
+    """Ajoute un cas aux cas terminés de l'apprenant."""
+    with transaction.atomic():
+        progress, _ = LearnerCaseProgress.objects.select_for_update().get_or_create(learner_id=learner_id)
+        case_ids = case_ids_from_bytes(progress.completed)
+        position = bisect_left(case_ids, case_id)
+        if position < len(case_ids) and case_ids[position] == case_id:
+            return
+        case_ids.insert(position, case_id)
+        progress.completed = case_ids_to_bytes(case_ids)
+        progress.completed_count = len(case_ids)
+        progress.save(update_fields=['completed', 'completed_count', 'updated_at'])
+
+
+def rebuild_progress(learner_ids=None):
+    """Recalcule les cas terminés depuis les sessions terminées. Renvoie le nombre d'apprenants traités."""
+    from simulation.models import SimulationSession
+
+    sessions = SimulationSession.objects.filter(status=SimulationSession.Status.COMPLETED)
+    stale = LearnerCaseProgress.objects.all()
+    if learner_ids is not None:
+        sessions = sessions.filter(learner_id__in=learner_ids)
+        stale = stale.filter(learner_id__in=learner_ids)
+    completed = {}
+    for learner_id, case_id in sessions.values_list('learner_id', 'case_id').distinct().iterator():
+        completed.setdefault(learner_id, set()).add(case_id)
+    with transaction.atomic():
+        stale.delete()
+        LearnerCaseProgress.objects.bulk_create([
+            LearnerCaseProgress(learner_id=learner_id, completed=case_ids_to_bytes(case_ids),
+                                completed_count=len(case_ids))
+            for learner_id, case_ids in completed.items()
+        ], batch_size=1000)
+    return len(completed)
@@ -0,0 +1,190 @@
+# backend/evaluation/logic/scoring.py
+"""
+Notation des diagnostics proposés par les apprenants, par lots.
+
+Les libellés sont normalisés (cf. lexicon), puis chaque libellé distinct du lot est vectorisé
+une seule fois. Pour chaque cas, les similarités entre toutes les propositions des apprenants
+et tous les diagnostics attendus sont calculées en un produit matriciel ; les réductions par
+soumission (np.maximum.reduceat / np.add.reduceat) remplacent les boucles par paire.
+
+Barème (Rubric) :
+- une similarité >= `full_credit` vaut 1, <= `partial_credit` vaut 0, linéaire entre les deux ;
+  deux libellés de même forme canonique valent toujours 1 ;
+- diagnostic final : crédit de la proposition face au(x) diagnostic(s) marqué(s) is_final ;
+- qualificatifs discriminants (cf. lexicon.QUALIFIERS : numéro de type, aigu / chronique, simple / grave,
+  côté, avec / sans aura...) :
+  deux libellés qui se contredisent (« diabète de type 1 » / « type 2 ») valent `conflict_credit`,
+  quelle que soit leur similarité ; si un seul des deux précise le qualificatif, le crédit est
+  plafonné à `underspecified_credit` ;
+- différentiel : F1 entre propositions et diagnostics différentiels attendus (lignes non
+  is_final ; rappel : meilleur crédit obtenu par chaque diagnostic attendu ; précision : meilleur
+  crédit de chaque proposition), ce qui donne un crédit partiel sans récompenser les listes à
+  rallonge. Une proposition identique au diagnostic final proposé n'est pas comptée ;
+- score = moyenne pondérée des deux ; un volet sans objet (pas de diagnostic final attendu,
+  aucun diagnostic différentiel attendu) est retiré de la pondération.
+"""
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+from django.conf import settings
+
+from simulation.logic.embeddings import HashingEmbedder
+from .lexicon import QUALIFIER_GROUPS, normalize_diagnosis, qualifiers
+
+
+@dataclass(frozen=True)
+class Rubric:
+    version: str = '1'
+    final_weight: float = 0.6
+    differential_weight: float = 0.4
+    full_credit: float = 0.85
+    partial_credit: float = 0.5
+    conflict_credit: float = 0.0
+    underspecified_credit: float = 0.5
+
+
+def get_rubric():
+    return Rubric(**settings.EVALUATION_RUBRIC)
+
+
+@dataclass
+class SubmissionInput:
+    case_id: int
+    final_diagnosis: str
+    differentials: list = field(default_factory=list)
+
+
+@dataclass
+class ScoreResult:
+    score: float
+    final_score: float
+    differential_score: float
+    details: dict
+
+
+class ScoringEngine:
+
+    def __init__(self, rubric=None, embedder=None):
+        self.rubric = rubric or get_rubric()
+        # Libellés courts : une dimension plus large que pour les passages limite les collisions
+        self.embedder = embedder or HashingEmbedder(dim=1024)
+
+    def credit(self, similarities):
+        low, high = self.rubric.partial_credit, self.rubric.full_credit
+        return np.clip((similarities - low) / (high - low), 0.0, 1.0)
+
+    def score_batch(self, submissions, expected_by_case):
+        """
+        Note une liste de SubmissionInput. `expected_by_case` : case_id -> [(libellé, is_final), ...].
+        Renvoie une liste de ScoreResult dans l'ordre des soumissions.
+        """
+        labels = {}
+
+        def row(label):
+            return labels.setdefault(normalize_diagnosis(label), len(labels))
+
+        expected_rows = {
+            case_id: ([row(label) for label, is_final in expected if not is_final],
+                      [row(label) for label, is_final in expected if is_final])
+            for case_id, expected in expected_by_case.items()
+        }
+        final_rows = [row(submission.final_diagnosis) for submission in submissions]
+        differential_rows = [
+            [row(label) for label in submission.differentials
+             if normalize_diagnosis(label) and row(label) != final_rows[index]]
+            for index, submission in enumerate(submissions)
+        ]
+
+        texts = list(labels)
+        vectors = self.embedder.embed(texts)
+        empty = np.array([not text for text in texts])
+        qualifier_codes = self._qualifier_codes(texts)
+
+        by_case = defaultdict(list)
+        for index, submission in enumerate(submissions):
+            by_case[submission.case_id].append(index)
+
+        results = [None] * len(submissions)
+        for case_id, indexes in by_case.items():
+            differentials, finals = expected_rows.get(case_id, ([], []))
+            differentials, finals = np.array(differentials, dtype=int), np.array(finals, dtype=int)
+
+            final_scores = np.full(len(indexes), np.nan)
+            final_matches = [None] * len(indexes)
+            if len(finals):
+                submitted = np.array([final_rows[i] for i in indexes])
+                credits = self._credits(vectors, empty, qualifier_codes, submitted, finals)
+                best = credits.argmax(axis=1)
+                final_scores = credits[np.arange(len(indexes)), best]
+                final_matches = [texts[finals[b]] for b in best]
+
+            differential_scores = np.full(len(indexes), np.nan)
+            if len(differentials):
+                differential_scores = np.zeros(len(indexes))
+                owners = [position for position, i in enumerate(indexes) for _ in differential_rows[i]]
+                items = np.array([r for i in indexes for r in differential_rows[i]], dtype=int)
+                if len(items):
+                    credits = self._credits(vectors, empty, qualifier_codes, items, differentials)
+                    owners = np.array(owners)
+                    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+                    present = owners[starts]
+                    counts = np.diff(np.r_[starts, len(owners)])
+                    recall = np.maximum.reduceat(credits, starts, axis=0).sum(axis=1) / len(differentials)
+                    precision = np.add.reduceat(credits.max(axis=1), starts) / counts
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        f1 = np.where(recall + precision > 0, 2 * recall * precision / (recall + precision), 0.0)
+                    differential_scores[present] = f1
+
+            for position, index in enumerate(indexes):
+                results[index] = self._combine(final_scores[position], differential_scores[position], {
+                    'final_normalized': texts[final_rows[index]],
+                    'final_matched': final_matches[position],
+                    'differentials_normalized': [texts[r] for r in differential_rows[index]],
+                })
+        return results
+
+    def _credits(self, vectors, empty, qualifier_codes, rows, expected):
+        similarities = vectors[rows] @ vectors[expected].T
+        # Une ligne par forme canonique : même ligne => similarité 1, sans dépendre du hachage
+        similarities[rows[:, None] == expected[None, :]] = 1.0
+        similarities[empty[rows]] = 0.0
+        credits = self.credit(similarities)
+        # Qualificatifs discriminants : la similarité des mots ne suffit pas à donner le crédit plein
+        ceiling = np.ones_like(credits)
+        for codes in qualifier_codes:
+            mine, theirs = codes[rows][:, None], codes[expected][None, :]
+            differ = mine != theirs
+            ceiling = np.where(differ & ((mine == 0) | (theirs == 0)),
+                               np.minimum(ceiling, self.rubric.underspecified_credit), ceiling)
+            ceiling = np.where(differ & (mine != 0) & (theirs != 0),
+                               np.minimum(ceiling, self.rubric.conflict_credit), ceiling)
+        credits = np.minimum(credits, ceiling)
+        credits[(rows[:, None] == expected[None, :]) & ~empty[rows][:, None]] = 1.0
+        return credits
+
+    @staticmethod
+    def _qualifier_codes(texts):
+        """Un tableau par groupe de qualificatifs : code de l'ensemble de valeurs de chaque libellé (0 : aucune)."""
+        per_label = [qualifiers(text) for text in texts]
+        arrays = []
+        for group in QUALIFIER_GROUPS:
+            codes = {frozenset(): 0}
+            arrays.append(np.array([codes.setdefault(found[group], len(codes)) for found in per_label], dtype=int))
+        return arrays
+
+    def _combine(self, final_score, differential_score, details):
+        parts = [
+            (score, weight) for score, weight in (
+                (final_score, self.rubric.final_weight), (differential_score, self.rubric.differential_weight),
+            ) if not np.isnan(score)
+        ]
+        total_weight = sum(weight for _, weight in parts)
+        total = sum(score * weight for score, weight in parts) / total_weight if total_weight else 0.0
+        details['rubric'] = asdict(self.rubric)
+        return ScoreResult(
+            score=round(float(total), 4),
+            final_score=None if np.isnan(final_score) else round(float(final_score), 4),
+            differential_score=None if np.isnan(differential_score) else round(float(differential_score), 4),
+            details=details,
+        )
@@ -0,0 +1,76 @@
+# backend/evaluation/logic/submissions.py
+"""Notation des DiagnosisSubmission en base, par lots (soumission isolée ou cohorte entière)."""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from cases.models import Diagnosis
+from evaluation.models import DiagnosisSubmission
+from .scoring import ScoringEngine, SubmissionInput
+
+SCORE_FIELDS = ['score', 'final_score', 'differential_score', 'rubric_version', 'scored_at', 'score_details']
+
+
+def expected_diagnoses(case_ids):
+    expected = defaultdict(list)
+    rows = Diagnosis.objects.filter(case_id__in=case_ids).order_by('case_id', 'id').values_list(
+        'case_id', 'description', 'is_final',
+    )
+    for case_id, description, is_final in rows:
+        expected[case_id].append((description, is_final))
+    return expected
+
+
+def score_submissions(submissions, engine=None):
+    """Note les soumissions (instances) et enregistre leurs scores en une requête UPDATE groupée."""
+    submissions = list(submissions)
+    if not submissions:
+        return 0
+    engine = engine or ScoringEngine()
+    expected = expected_diagnoses({submission.case_id for submission in submissions})
+    results = engine.score_batch(
+        [SubmissionInput(s.case_id, s.final_diagnosis, s.differentials or []) for s in submissions], expected,
+    )
+    now = timezone.now()
+    for submission, result in zip(submissions, results):
+        submission.score = result.score
+        submission.final_score = result.final_score
+        submission.differential_score = result.differential_score
+        submission.score_details = result.details
+        submission.rubric_version = engine.rubric.version
+        submission.scored_at = now
+    _save_scores(submissions)
+    return len(submissions)
+
+
+def _save_scores(submissions):
+    # Un UPDATE paramétré exécuté en executemany : bulk_update générerait un CASE WHEN par champ
+    # et par ligne, dont le coût domine celui de la notation sur une cohorte entière
+    fields = [DiagnosisSubmission._meta.get_field(name) for name in SCORE_FIELDS]
+    quote = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        quote(DiagnosisSubmission._meta.db_table),
+        ', '.join(f'{quote(field.column)} = %s' for field in fields),
+        quote(DiagnosisSubmission._meta.pk.column),
+    )
+    params = [
+        [field.get_db_prep_save(getattr(submission, field.attname), connection) for field in fields]
+        + [submission.pk]
+        for submission in submissions
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def rescore(queryset, batch_size=5000, engine=None):
+    """Renote un queryset par lots de `batch_size` ; renvoie le nombre de soumissions notées."""
+    engine = engine or ScoringEngine()
+    fields = ['id', 'case_id', 'final_diagnosis', 'differentials']
+    total, last_id = 0, 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_id).order_by('pk').only(*fields)[:batch_size])
+        if not batch:
+            return total
+        total += score_submissions(batch, engine)
+        last_id = batch[-1].pk
@@ -0,0 +1,53 @@
+# backend/evaluation/management/commands/generate_feedback_reports.py
+import os
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from evaluation.models import DiagnosisSubmission
+from evaluation.services.feedback_engine import generate_reports
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère en parallèle les rapports de feedback des sessions notées (ex: régénération de fin "
+        "de semestre). Les prompts identiques ne sont envoyés qu'une fois au LLM ; les rapports déjà "
+        "à jour pour la version du barème sont conservés, sauf avec --force."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Nombre de processus de génération. Par défaut : nombre de CPU.')
+        parser.add_argument('--since', type=str,
+                            help="Ne traite que les soumissions depuis cette date (AAAA-MM-JJ).")
+        parser.add_argument('--case', type=int, action='append', dest='cases',
+                            help="Limite aux soumissions de ce cas (option répétable).")
+        parser.add_argument('--force', action='store_true', help='Régénère aussi les rapports déjà prêts.')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Soumissions traitées par lot. Par défaut : 2000.')
+
+    def handle(self, *args, **options):
+        queryset = DiagnosisSubmission.objects.filter(score__isnull=False, session__isnull=False)
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d')
+            except ValueError:
+                raise CommandError("--since attend une date au format AAAA-MM-JJ.")
+            queryset = queryset.filter(submitted_at__gte=timezone.make_aware(since))
+        if options['cases']:
+            queryset = queryset.filter(case_id__in=options['cases'])
+
+        totals = {'reports': 0, 'unique_prompts': 0, 'llm_calls': 0, 'elapsed_s': 0.0}
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        for offset in range(0, len(ids), options['batch_size']):
+            batch = DiagnosisSubmission.objects.filter(pk__in=ids[offset:offset + options['batch_size']])
+            stats = generate_reports(batch, workers=options['workers'], force=options['force'])
+            for key in totals:
+                totals[key] += stats[key]
+            self.stdout.write(f"  {min(offset + options['batch_size'], len(ids)):>7} / {len(ids)} : {stats}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['reports']} rapport(s) générés en {totals['elapsed_s']:.1f} s : "
+            f"{totals['unique_prompts']} prompt(s) distinct(s), {totals['llm_calls']} appel(s) au LLM."
+        ))
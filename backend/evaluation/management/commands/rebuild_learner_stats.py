@@ -0,0 +1,28 @@
+# backend/evaluation/management/commands/rebuild_learner_stats.py
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from evaluation.logic.performance import rebuild_learner_stats
+from evaluation.logic.recommender import rebuild_progress
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les agrégats de performance des apprenants (LearnerCategoryStats) depuis leurs "
+        "soumissions notées, et leurs cas terminés (LearnerCaseProgress). Utile après un reclassement de cas ou une correction manuelle ; "
+        "rescore_submissions l'appelle déjà pour les apprenants renotés."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--learner', type=int, action='append', dest='learners',
+                            help="Limite à cet apprenant (option répétable).")
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        count = rebuild_learner_stats(options['learners'])
+        learners = rebuild_progress(options['learners'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} ligne(s) d'agrégats et {learners} progression(s) d'apprenants reconstruites "
+            f"en {perf_counter() - start:.2f} s."
+        ))
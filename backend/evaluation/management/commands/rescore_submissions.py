@@ -0,0 +1,45 @@
+# backend/evaluation/management/commands/rescore_submissions.py
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from evaluation.logic.performance import rebuild_learner_stats
+from evaluation.logic.scoring import ScoringEngine
+from evaluation.logic.submissions import rescore
+from evaluation.models import DiagnosisSubmission
+
+
+class Command(BaseCommand):
+    help = (
+        "Renote les diagnostics soumis avec le barème courant (settings.EVALUATION_RUBRIC), par lots "
+        "vectorisés. À lancer après toute modification du barème ou des diagnostics attendus d'un cas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--case', type=int, action='append', dest='cases',
+                            help="Limite aux soumissions de ce cas (option répétable).")
+        parser.add_argument('--stale', action='store_true',
+                            help="Ne renote que les soumissions notées avec une autre version du barème.")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Soumissions notées par lot. Par défaut : 5000.')
+
+    def handle(self, *args, **options):
+        engine = ScoringEngine()
+        queryset = DiagnosisSubmission.objects.all()
+        if options['cases']:
+            queryset = queryset.filter(case_id__in=options['cases'])
+        if options['stale']:
+            queryset = queryset.exclude(rubric_version=engine.rubric.version)
+
+        learner_ids = set(queryset.values_list('learner_id', flat=True).distinct())
+        start = perf_counter()
+        count = rescore(queryset, batch_size=options['batch_size'], engine=engine)
+        elapsed = perf_counter() - start
+        rate = f" ({count / elapsed:.0f}/s)" if elapsed and count else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} soumission(s) notée(s) avec le barème {engine.rubric.version} en {elapsed:.2f} s{rate}."
+        ))
+        if count:
+            # Les scores ont changé : les agrégats des apprenants concernés sont recalculés
+            rows = rebuild_learner_stats(learner_ids)
+            self.stdout.write(f"{rows} ligne(s) d'agrégats apprenant reconstruite(s).")
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cases', '0005_clinicalcase_snapshot'),
+        ('simulation', '0005_answer_cache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiagnosisSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('final_diagnosis', models.CharField(max_length=255)),
+                ('differentials', models.JSONField(blank=True, default=list, help_text='Liste des diagnostics différentiels proposés')),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('score', models.FloatField(blank=True, null=True)),
+                ('final_score', models.FloatField(blank=True, null=True)),
+                ('differential_score', models.FloatField(blank=True, null=True)),
+                ('rubric_version', models.CharField(blank=True, max_length=20)),
+                ('scored_at', models.DateTimeField(blank=True, null=True)),
+                ('score_details', models.JSONField(blank=True, default=dict)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='diagnosis_submissions', to='cases.clinicalcase')),
+                ('learner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='diagnosis_submissions', to=settings.AUTH_USER_MODEL)),
+                ('session', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='diagnosis_submission', to='simulation.simulationsession')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['learner', '-submitted_at'], name='submission_learner_idx'), models.Index(fields=['rubric_version'], name='submission_rubric_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0005_clinicalcase_snapshot'),
+        ('evaluation', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnerCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('best_score', models.FloatField(default=0.0)),
+                ('recent_score', models.FloatField(default=0.0, help_text='Moyenne mobile exponentielle des scores (EVALUATION_TREND_ALPHA)')),
+                ('time_spent_s', models.FloatField(default=0.0, help_text='Durée cumulée des consultations notées (s)')),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='learner_stats', to='cases.category')),
+                ('learner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Learner category stats',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('learner', 'category'), name='learner_category_stats_unique'), models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('learner',), name='learner_overall_stats_unique')],
+            },
+        ),
+    ]
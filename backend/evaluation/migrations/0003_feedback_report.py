@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation', '0002_learner_category_stats'),
+        ('simulation', '0005_answer_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rubric_version', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('ready', 'Prêt')], default='pending', max_length=20)),
+                ('prompt_hash', models.CharField(blank=True, db_index=True, help_text='Empreinte du prompt de feedback, partagée entre réponses identiques', max_length=64)),
+                ('feedback', models.TextField(blank=True)),
+                ('html', models.TextField(blank=True)),
+                ('pdf', models.BinaryField(blank=True, help_text="Vide si WeasyPrint n'est pas installé", null=True)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('generated_at', models.DateTimeField(blank=True, null=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feedback_reports', to='simulation.simulationsession')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('session', 'rubric_version'), name='feedback_report_unique')],
+            },
+        ),
+    ]
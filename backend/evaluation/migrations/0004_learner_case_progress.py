@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('evaluation', '0003_feedback_report'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnerCaseProgress',
+            fields=[
+                ('learner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='case_progress', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('completed', models.BinaryField(default=bytes)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Learner case progress',
+            },
+        ),
+    ]
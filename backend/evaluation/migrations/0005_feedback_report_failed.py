@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation', '0004_learner_case_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackreport',
+            name='error',
+            field=models.TextField(blank=True, help_text='Cause du dernier échec de génération'),
+        ),
+        migrations.AlterField(
+            model_name='feedbackreport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'En attente'), ('ready', 'Prêt'), ('failed', 'Échec')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 21:30
+
+from django.db import migrations
+
+
+def bitsets_to_case_ids(apps, schema_editor):
+    # Bitset (bit n = cas n) -> identifiants triés en int64 little-endian (cf. logic.recommender)
+    LearnerCaseProgress = apps.get_model('evaluation', 'LearnerCaseProgress')
+    for progress in LearnerCaseProgress.objects.iterator():
+        bits = int.from_bytes(bytes(progress.completed or b''), 'little')
+        case_ids = [bit for bit in range(bits.bit_length()) if bits >> bit & 1]
+        progress.completed = b''.join(case_id.to_bytes(8, 'little', signed=True) for case_id in case_ids)
+        progress.completed_count = len(case_ids)
+        progress.save(update_fields=['completed', 'completed_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluation', '0005_feedback_report_failed'),
+    ]
+
+    operations = [
+        migrations.RunPython(bitsets_to_case_ids, migrations.RunPython.noop),
+    ]
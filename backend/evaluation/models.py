@@ -1,3 +1,129 @@
+# backend/evaluation/models.py
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+from cases.models import Category, ClinicalCase
+from simulation.models import SimulationSession
+
+
+class DiagnosisSubmission(models.Model):
+    """Diagnostic final et différentiel proposés par un apprenant à l'issue d'une consultation simulée."""
+
+    learner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                related_name='diagnosis_submissions')
+    case = models.ForeignKey(ClinicalCase, on_delete=models.CASCADE, related_name='diagnosis_submissions')
+    session = models.OneToOneField(SimulationSession, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='diagnosis_submission')
+    final_diagnosis = models.CharField(max_length=255)
+    differentials = models.JSONField(default=list, blank=True,
+                                     help_text="Liste des diagnostics différentiels proposés")
+    submitted_at = models.DateTimeField(auto_now_add=True)
+
+    # Résultat de la notation (cf. logic.scoring), recalculé à chaque changement de barème
+    score = models.FloatField(null=True, blank=True)
+    final_score = models.FloatField(null=True, blank=True)
+    differential_score = models.FloatField(null=True, blank=True)
+    rubric_version = models.CharField(max_length=20, blank=True)
+    scored_at = models.DateTimeField(null=True, blank=True)
+    score_details = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['learner', '-submitted_at'], name='submission_learner_idx'),
+            models.Index(fields=['rubric_version'], name='submission_rubric_idx'),
+        ]
+
+    def __str__(self):
+        return f"Soumission #{self.id} ({self.learner} / Cas #{self.case_id})"
+
+
+class LearnerCategoryStats(models.Model):
+    """
+    Agrégats de performance d'un apprenant, par catégorie de cas (category vide : toutes catégories).
+    Tenus à jour à chaque soumission notée (cf. logic.performance) ; reconstruits par
+    `manage.py rebuild_learner_stats` après une renotation ou un reclassement de cas.
+    """
+
+    learner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='category_stats')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='learner_stats')
+    attempts = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    best_score = models.FloatField(default=0.0)
+    recent_score = models.FloatField(default=0.0,
+                                     help_text="Moyenne mobile exponentielle des scores (EVALUATION_TREND_ALPHA)")
+    time_spent_s = models.FloatField(default=0.0, help_text="Durée cumulée des consultations notées (s)")
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Learner category stats"
+        constraints = [
+            models.UniqueConstraint(fields=['learner', 'category'], condition=models.Q(category__isnull=False),
+                                    name='learner_category_stats_unique'),
+            models.UniqueConstraint(fields=['learner'], condition=models.Q(category__isnull=True),
+                                    name='learner_overall_stats_unique'),
+        ]
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.attempts if self.attempts else None
+
+    @property
+    def trend(self):
+        """Écart entre les résultats récents et la moyenne : positif si l'apprenant progresse."""
+        return self.recent_score - self.mean_score if self.attempts else None
+
+    def __str__(self):
+        return f"{self.learner} / {self.category or 'Toutes catégories'} ({self.attempts} tentative(s))"
+
+
+class FeedbackReport(models.Model):
+    """
+    Rapport de feedback de l'Évaluateur-Tuteur pour une session, à une version du barème.
+    Généré par lots hors requête (cf. services.feedback_engine) et servi tel quel par l'API.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'En attente'
+        READY = 'ready', 'Prêt'
+        FAILED = 'failed', 'Échec'
+
+    session = models.ForeignKey(SimulationSession, on_delete=models.CASCADE, related_name='feedback_reports')
+    rubric_version = models.CharField(max_length=20)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    prompt_hash = models.CharField(max_length=64, blank=True, db_index=True,
+                                   help_text="Empreinte du prompt de feedback, partagée entre réponses identiques")
+    feedback = models.TextField(blank=True)
+    html = models.TextField(blank=True)
+    pdf = models.BinaryField(null=True, blank=True, help_text="Vide si WeasyPrint n'est pas installé")
+    error = models.TextField(blank=True, help_text="Cause du dernier échec de génération")
+    requested_at = models.DateTimeField(auto_now_add=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'rubric_version'], name='feedback_report_unique'),
+        ]
+
+    def __str__(self):
+        return f"Rapport session #{self.session_id} (barème {self.rubric_version}, {self.get_status_display()})"
+
+
+class LearnerCaseProgress(models.Model):
+    """
+    Cas terminés par un apprenant : identifiants triés, en int64 little-endian (8 octets par cas
+    terminé), lus en une requête par le recommandeur (cf. logic.recommender).
+    """
+
+    learner = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='case_progress')
+    completed = models.BinaryField(default=bytes)
+    completed_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Learner case progress"
+
+    def __str__(self):
+        return f"{self.learner} : {self.completed_count} cas terminé(s)"
@@ -0,0 +1,41 @@
+# backend/evaluation/serializers.py
+from rest_framework import serializers
+
+from .models import DiagnosisSubmission, LearnerCategoryStats
+
+
+class DiagnosisSubmissionSerializer(serializers.ModelSerializer):
+    differentials = serializers.ListField(child=serializers.CharField(max_length=255), max_length=20,
+                                          required=False, default=list)
+
+    class Meta:
+        model = DiagnosisSubmission
+        fields = ['id', 'session', 'case', 'final_diagnosis', 'differentials', 'submitted_at',
+                  'score', 'final_score', 'differential_score', 'rubric_version', 'scored_at', 'score_details']
+        read_only_fields = ['case', 'submitted_at', 'score', 'final_score', 'differential_score',
+                            'rubric_version', 'scored_at', 'score_details']
+        # Unicité vérifiée dans validate_session, avec un message explicite
+        extra_kwargs = {'session': {'required': True, 'allow_null': False, 'validators': []}}
+
+    def validate_session(self, session):
+        if session.learner_id != self.context['request'].user.pk:
+            raise serializers.ValidationError("Cette session ne vous appartient pas.")
+        if hasattr(session, 'diagnosis_submission'):
+            raise serializers.ValidationError("Un diagnostic a déjà été soumis pour cette session.")
+        return session
+
+    def create(self, validated_data):
+        session = validated_data['session']
+        validated_data['case_id'] = session.case_id
+        return super().create(validated_data)
+
+
+class LearnerCategoryStatsSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True, default=None)
+    mean_score = serializers.FloatField(read_only=True)
+    trend = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = LearnerCategoryStats
+        fields = ['category', 'category_name', 'attempts', 'mean_score', 'best_score', 'recent_score', 'trend',
+                  'time_spent_s', 'last_attempt_at']
@@ -0,0 +1,238 @@
+# backend/evaluation/services/feedback_engine.py
+"""
+Rapports de feedback de l'Évaluateur-Tuteur, générés par lots hors des requêtes HTTP.
+
+- Le prompt de feedback ne dépend que du cas (contexte « tutor », cf. simulation.logic.prompt_context)
+  et de la réponse normalisée de l'apprenant : deux apprenants qui proposent les mêmes diagnostics
+  pour le même cas partagent un seul appel au LLM. Un feedback déjà rédigé pour le même prompt
+  (empreinte `prompt_hash`) est réutilisé sans appel.
+- Chaque groupe de rapports partageant un prompt est traité par un processus du pool : appel
+  au LLM puis rendu HTML (gabarit Django) et PDF (WeasyPrint, dépendance optionnelle).
+- Les rapports terminés sont rangés dans FeedbackReport, clé (session, version du barème) :
+  l'API les sert depuis cette table ; une renotation avec un nouveau barème en appelle de nouveaux.
+- Un groupe dont la génération échoue (erreur du LLM...) passe ses rapports en échec sans bloquer
+  les autres ; `request_report()` les redemande, comme ceux restés en attente au-delà du délai
+  de la tâche (worker perdu).
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from time import perf_counter
+
+import django
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from evaluation.models import FeedbackReport
+from simulation.logic.llm import get_llm_client
+from simulation.logic.prompt_context import prompt_contexts
+
+REPORT_TEMPLATE = 'evaluation/feedback_report.html'
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(settings_module):
+    # Nécessaire lorsque les processus sont lancés en mode "spawn" (macOS, Windows)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _percent(value):
+    return 'n/a' if value is None else f"{round(value * 100)} %"
+
+
+def feedback_prompt(submission):
+    """Consigne de feedback, sans rien de propre à l'apprenant (nom, session, date) : elle est partagée."""
+    details = submission.score_details or {}
+    differentials = sorted(set(details.get('differentials_normalized', [])))
+    return '\n'.join([
+        "L'étudiant a terminé la consultation et propose :",
+        f"- diagnostic final : {details.get('final_normalized') or 'aucun'}",
+        f"- diagnostics différentiels : {', '.join(differentials) or 'aucun'}",
+        f"Score obtenu : {_percent(submission.score)} (diagnostic final {_percent(submission.final_score)}, "
+        f"différentiel {_percent(submission.differential_score)}).",
+        "",
+        "Rédige un feedback pédagogique bref et bienveillant : ce qui est juste, ce qui manque, "
+        "les éléments de l'anamnèse qui orientaient vers le bon diagnostic, et un conseil pour la suite.",
+    ])
+
+
+def prompt_hash(system_prompt, prompt):
+    return hashlib.sha256(f"{system_prompt}\x00{prompt}".encode()).hexdigest()
+
+
+async def _collect(stream):
+    return ''.join([token async for token in stream])
+
+
+def generate_feedback(system_prompt, prompt):
+    client = get_llm_client()
+    return asyncio.run(_collect(client.stream(system_prompt, [{'role': 'user', 'content': prompt}]))).strip()
+
+
+def html_to_pdf(html):
+    """PDF du rapport si WeasyPrint est installé (dépendance optionnelle), sinon None."""
+    try:
+        from weasyprint import HTML
+    except ImportError:
+        return None
+    return HTML(string=html).write_pdf()
+
+
+def build_group(group):
+    """
+    Traite un groupe de rapports partageant le même prompt (exécuté dans un processus du pool) :
+    rédige le feedback s'il n'est pas déjà connu, puis rend chaque rapport.
+    """
+    feedback = group['feedback']
+    if feedback is None:
+        feedback = generate_feedback(group['system_prompt'], group['prompt'])
+    rendered = []
+    for context in group['reports']:
+        html = render_to_string(REPORT_TEMPLATE, {**context, 'feedback': feedback})
+        rendered.append((context['session_id'], html, html_to_pdf(html)))
+    return feedback, rendered
+
+
+def _build_group_or_error(group):
+    """build_group, l'erreur éventuelle étant renvoyée plutôt que levée : (feedback, rendus, erreur)."""
+    try:
+        return (*build_group(group), None)
+    except Exception as e:
+        return None, [], f"{type(e).__name__}: {e}"
+
+
+def _report_context(submission):
+    return {
+        'session_id': submission.session_id,
+        'learner': submission.learner.get_full_name() or submission.learner.username,
+        'case_title': submission.case.case_title,
+        'submitted_at': submission.submitted_at,
+        'final_diagnosis': submission.final_diagnosis,
+        'differentials': submission.differentials,
+        'score': _percent(submission.score),
+        'final_score': _percent(submission.final_score),
+        'differential_score': _percent(submission.differential_score),
+        'expected': [d.description for d in submission.case.diagnoses.all() if d.is_final],
+        'rubric_version': submission.rubric_version,
+    }
+
+
+def generate_reports(submissions, workers=1, force=False):
+    """
+    Génère (ou régénère si `force`) les rapports des soumissions notées qui n'en ont pas encore
+    pour leur version du barème. Renvoie des statistiques de la génération.
+    """
+    start = perf_counter()
+    submissions = [s for s in submissions if s.session_id and s.score is not None]
+    if not force:
+        done = set(FeedbackReport.objects.filter(
+            session_id__in=[s.session_id for s in submissions], status=FeedbackReport.Status.READY,
+        ).values_list('session_id', 'rubric_version'))
+        submissions = [s for s in submissions if (s.session_id, s.rubric_version) not in done]
+
+    prefetch_related_objects(submissions, 'learner', 'case__diagnoses')
+    groups = {}
+    for submission in submissions:
+        system_prompt = prompt_contexts.get(submission.case_id, 'tutor').text
+        prompt = feedback_prompt(submission)
+        key = prompt_hash(system_prompt, prompt)
+        group = groups.setdefault(key, {
+            'hash': key, 'system_prompt': system_prompt, 'prompt': prompt, 'feedback': None, 'reports': [],
+        })
+        group['reports'].append((submission.rubric_version, _report_context(submission)))
+
+    known = dict(FeedbackReport.objects.filter(
+        prompt_hash__in=list(groups), status=FeedbackReport.Status.READY,
+    ).values_list('prompt_hash', 'feedback'))
+    for key, feedback in known.items():
+        groups[key]['feedback'] = feedback
+
+    payloads = [
+        {**group, 'reports': [context for _, context in group['reports']]} for group in groups.values()
+    ]
+    if workers <= 1 or len(payloads) <= 1:
+        results = map(_build_group_or_error, payloads)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(os.environ['DJANGO_SETTINGS_MODULE'],),
+        )
+        with executor:
+            results = list(executor.map(_build_group_or_error, payloads))
+
+    now = timezone.now()
+    reports, failed, errors = [], Q(pk__in=[]), set()
+    failed_count = 0
+    for group, (feedback, rendered, error) in zip(groups.values(), results):
+        versions = dict((context['session_id'], version) for version, context in group['reports'])
+        if error is not None:
+            logger.warning("Feedback impossible pour %d rapport(s) : %s", len(versions), error)
+            failed_count += len(versions)
+            errors.add(error)
+            for session_id, version in versions.items():
+                failed |= Q(session_id=session_id, rubric_version=version)
+            continue
+        reports += [
+            FeedbackReport(session_id=session_id, rubric_version=versions[session_id], prompt_hash=group['hash'],
+                           feedback=feedback, html=html, pdf=pdf, status=FeedbackReport.Status.READY,
+                           generated_at=now, error='')
+            for session_id, html, pdf in rendered
+        ]
+    with transaction.atomic():
+        FeedbackReport.objects.bulk_create(
+            reports, batch_size=500, update_conflicts=True, unique_fields=['session', 'rubric_version'],
+            update_fields=['prompt_hash', 'feedback', 'html', 'pdf', 'status', 'generated_at', 'error'],
+        )
+        if failed_count:
+            # Un rapport déjà prêt (régénération forcée) garde sa version précédente
+            FeedbackReport.objects.filter(failed).exclude(status=FeedbackReport.Status.READY).update(
+                status=FeedbackReport.Status.FAILED, error='\n'.join(sorted(errors))[:2000],
+            )
+    return {
+        'reports': len(reports),
+        'failed': failed_count,
+        'unique_prompts': len(groups),
+        'llm_calls': len(groups) - len(known),
+        'elapsed_s': round(perf_counter() - start, 2),
+    }
+
+
+def request_report(submission):
+    """
+    Demande le rapport d'une soumission sans le générer dans la requête : une ligne « en attente »
+    est posée (une seule par session et version du barème) et la génération confiée à un worker.
+    Un rapport en échec, ou en attente depuis plus que le délai de la tâche, est redemandé ;
+    l'UPDATE conditionnel garantit qu'une seule requête relance la tâche.
+    """
+    if not submission.session_id or submission.score is None:
+        return None
+    report, created = FeedbackReport.objects.get_or_create(
+        session_id=submission.session_id, rubric_version=submission.rubric_version,
+    )
+    if not created:
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.EVALUATION_REPORT_JOB_TIMEOUT)
+        retried = FeedbackReport.objects.filter(pk=report.pk).filter(
+            Q(status=FeedbackReport.Status.FAILED) | Q(status=FeedbackReport.Status.PENDING, requested_at__lt=stale)
+        ).update(status=FeedbackReport.Status.PENDING, requested_at=now)
+        if not retried:
+            return report
+        report.refresh_from_db()
+
+    from jobs.queue import enqueue
+
+    transaction.on_commit(lambda: enqueue(
+        'evaluation.generate_feedback_reports', {'submission_ids': [submission.pk]}, priority=-1,
+        timeout_seconds=settings.EVALUATION_REPORT_JOB_TIMEOUT,
+    ))
+    return report
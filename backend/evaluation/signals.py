@@ -0,0 +1,20 @@
+# backend/evaluation/signals.py
+from django.dispatch import receiver
+
+from cases.signals import case_document_changed
+from simulation.signals import session_completed
+
+
+@receiver(case_document_changed)
+def refresh_case_index(sender, case_ids, **kwargs):
+    # Approbation, rejet ou reclassement : seuls ces cas sont relus dans l'index du recommandeur
+    from .logic.recommender import case_index
+
+    case_index.refresh(case_ids)
+
+
+@receiver(session_completed)
+def record_completed_case(sender, learner_id, case_id, **kwargs):
+    from .logic.recommender import mark_completed
+
+    mark_completed(learner_id, case_id)
@@ -1,3 +1,225 @@
-from django.test import TestCase
+# backend/evaluation/tests.py
+import random
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from cases.models import Category, ClinicalCase
+from jobs.models import Job
+from simulation.logic.embeddings import HashingEmbedder
+from simulation.models import SimulationSession
+from .logic import recommender
+from .logic.scoring import ScoringEngine, SubmissionInput
+from .models import DiagnosisSubmission, FeedbackReport, LearnerCaseProgress, LearnerCategoryStats
+from .services import feedback_engine
+
+
+class ScoringEngineTests(SimpleTestCase):
+
+    def setUp(self):
+        self.engine = ScoringEngine()
+
+    def score(self, final, differentials=(), expected=(('Diabète de type 2', True),)):
+        submission = SubmissionInput(case_id=1, final_diagnosis=final, differentials=list(differentials))
+        return self.engine.score_batch([submission], {1: list(expected)})[0]
+
+    def test_synonym_gets_full_credit(self):
+        result = self.score('IDM', expected=[('Syndrome coronarien aigu', True)])
+        self.assertEqual(result.final_score, 1.0)
+
+    def test_type_number_mismatch_gets_no_credit(self):
+        self.assertEqual(self.score('Diabète de type 1').final_score, 0.0)
+        self.assertEqual(self.score('DT1').final_score, 0.0)
+
+    def test_acuity_mismatch_gets_no_credit(self):
+        result = self.score('Insuffisance rénale aiguë', expected=[('Insuffisance rénale chronique', True)])
+        self.assertEqual(result.final_score, 0.0)
+
+    def test_severity_mismatch_gets_no_credit(self):
+        result = self.score('Paludisme simple', expected=[('Paludisme grave', True)])
+        self.assertEqual(result.final_score, 0.0)
+
+    def test_synonyms_do_not_merge_qualified_diagnoses(self):
+        pairs = [
+            ('AVC hémorragique', 'AVC ischémique'),
+            ('Angor instable', 'Infarctus du myocarde'),
+            ('Coma hyperosmolaire', 'Acidocétose diabétique'),
+            ('Migraine avec aura', 'Migraine sans aura'),
+            ('Gastrite chronique', 'Gastrite aiguë'),
+            ('OAP', 'Insuffisance cardiaque'),
+        ]
+        for submitted, expected in pairs:
+            with self.subTest(submitted=submitted, expected=expected):
+                self.assertLess(self.score(submitted, expected=[(expected, True)]).final_score, 1.0)
+                self.assertLess(self.score(expected, expected=[(submitted, True)]).final_score, 1.0)
+
+    def test_compatible_synonyms_keep_full_credit(self):
+        self.assertEqual(self.score('Infarctus cérébral', expected=[('AVC ischémique', True)]).final_score, 1.0)
+        self.assertEqual(self.score('Paludisme non compliqué', expected=[('Paludisme simple', True)]).final_score, 1.0)
+        self.assertEqual(self.score('Paludisme non compliqué', expected=[('Paludisme grave', True)]).final_score, 0.0)
+
+    def test_missing_qualifier_is_capped(self):
+        result = self.score('Diabète')
+        self.assertLessEqual(result.final_score, self.engine.rubric.underspecified_credit)
+
+    def test_correct_final_without_expected_differentials_scores_full(self):
+        result = self.score('Diabète de type 2')
+        self.assertIsNone(result.differential_score)
+        self.assertEqual(result.score, 1.0)
+
+    def test_differentials_exclude_the_final_diagnosis(self):
+        expected = [('Paludisme grave', True), ('Fièvre typhoïde', False), ('Méningite', False)]
+        result = self.score('Paludisme grave', ['Fièvre typhoïde', 'Méningite'], expected=expected)
+        self.assertEqual(result.differential_score, 1.0)
+        self.assertEqual(result.score, 1.0)
+
+        repeated = self.score('Paludisme grave', ['Paludisme grave', 'Fièvre typhoïde', 'Méningite'], expected=expected)
+        self.assertEqual(repeated.differential_score, 1.0)
+
+    def test_missing_differentials_are_penalized(self):
+        expected = [('Paludisme grave', True), ('Fièvre typhoïde', False)]
+        result = self.score('Paludisme grave', expected=expected)
+        self.assertEqual(result.differential_score, 0.0)
+        self.assertAlmostEqual(result.score, self.engine.rubric.final_weight, places=4)
+
+    def test_partial_differential_list_gets_partial_credit(self):
+        expected = [('Paludisme grave', True), ('Fièvre typhoïde', False), ('Méningite', False)]
+        result = self.score('Paludisme grave', ['Fièvre typhoïde', 'Pneumopathie'], expected=expected)
+        self.assertGreater(result.differential_score, 0.0)
+        self.assertLess(result.differential_score, 1.0)
+
+
+class HashingEmbedderTests(SimpleTestCase):
+
+    def test_single_digits_are_kept(self):
+        first, second = HashingEmbedder(dim=1024).embed(['diabete type 1', 'diabete type 2'])
+        self.assertLess(float(np.dot(first, second)), 0.99)
+
+
+@mock.patch.object(feedback_engine, 'html_to_pdf', return_value=None)
+class FeedbackReportTests(TestCase):
+
+    def setUp(self):
+        self.case = ClinicalCase.objects.create(
+            source_fultang_id='f1', case_title='Cas', case_summary='s', learning_objectives='o',
+            motif_consultation='m', age=40, sexe='Homme', status=ClinicalCase.Status.APPROUVE,
+        )
+
+    def submission(self, name, final='Paludisme grave'):
+        learner = User.objects.create_user(name, f'{name}@example.cm', 'pw')
+        session = SimulationSession.objects.create(learner=learner, case=self.case)
+        return DiagnosisSubmission.objects.create(
+            learner=learner, case=self.case, session=session, final_diagnosis=final, score=1.0, final_score=1.0,
+            rubric_version='1', score_details={'final_normalized': final.lower()},
+        )
+
+    def request(self, submission):
+        with self.captureOnCommitCallbacks(execute=True):
+            return feedback_engine.request_report(submission)
+
+    def test_identical_answers_share_one_llm_call(self, _pdf):
+        submissions = [self.submission('a'), self.submission('b')]
+        with mock.patch.object(feedback_engine, 'generate_feedback', return_value='Bien.') as llm:
+            stats = feedback_engine.generate_reports(submissions)
+        self.assertEqual(llm.call_count, 1)
+        self.assertEqual((stats['reports'], stats['unique_prompts'], stats['llm_calls']), (2, 1, 1))
+
+    def test_known_feedback_is_reused_without_llm_call(self, _pdf):
+        with mock.patch.object(feedback_engine, 'generate_feedback', return_value='Bien.'):
+            feedback_engine.generate_reports([self.submission('a')])
+        with mock.patch.object(feedback_engine, 'generate_feedback') as llm:
+            stats = feedback_engine.generate_reports([self.submission('b')])
+        llm.assert_not_called()
+        self.assertEqual(stats['llm_calls'], 0)
+        self.assertEqual(FeedbackReport.objects.filter(status=FeedbackReport.Status.READY).count(), 2)
+
+    def test_request_enqueues_once(self, _pdf):
+        submission = self.submission('a')
+        self.request(submission)
+        self.request(submission)
+        self.assertEqual(Job.objects.filter(name='evaluation.generate_feedback_reports').count(), 1)
+
+    def test_failed_report_is_requested_again(self, _pdf):
+        submission = self.submission('a')
+        self.request(submission)
+        with mock.patch.object(feedback_engine, 'generate_feedback', side_effect=RuntimeError('LLM indisponible')), \
+                self.assertLogs('evaluation.services.feedback_engine', 'WARNING'):
+            stats = feedback_engine.generate_reports([submission])
+        self.assertEqual(stats['failed'], 1)
+        report = FeedbackReport.objects.get(session=submission.session)
+        self.assertEqual(report.status, FeedbackReport.Status.FAILED)
+        self.assertIn('LLM indisponible', report.error)
+
+        self.assertEqual(self.request(submission).status, FeedbackReport.Status.PENDING)
+        self.assertEqual(Job.objects.filter(name='evaluation.generate_feedback_reports').count(), 2)
+
+    def test_stale_pending_report_is_requested_again(self, _pdf):
+        submission = self.submission('a')
+        self.request(submission)
+        FeedbackReport.objects.update(requested_at=timezone.now() - timedelta(hours=1))
+        self.request(submission)
+        self.assertEqual(Job.objects.filter(name='evaluation.generate_feedback_reports').count(), 2)
+
+
+class RecommenderTests(TestCase):
+
+    def setUp(self):
+        recommender.case_index.clear()
+        self.addCleanup(recommender.case_index.clear)
+        self.learner = User.objects.create_user('apprenant', 'apprenant@example.cm', 'pw')
+        self.cardio, self.infectio = Category.objects.create(name='Cardiologie'), Category.objects.create(name='Infectiologie')
+        # Clés primaires éloignées : les masques suivent le nombre de cas, pas la plus grande clé
+        self.cardio_cases = [self.case(10 ** 9 + i, self.cardio) for i in range(2)]
+        self.infectio_cases = [self.case(10 ** 6 + i, self.infectio) for i in range(2)]
+        LearnerCategoryStats.objects.create(learner=self.learner, category=self.cardio, attempts=3, recent_score=0.9)
+        LearnerCategoryStats.objects.create(learner=self.learner, category=self.infectio, attempts=3, recent_score=0.2)
+
+    def case(self, pk, category):
+        case = ClinicalCase.objects.create(
+            id=pk, source_fultang_id=f'f{pk}', case_title='Cas', case_summary='s', learning_objectives='o',
+            motif_consultation='m', age=40, sexe='Homme', status=ClinicalCase.Status.APPROUVE,
+        )
+        case.categories.add(category)
+        return case.pk
+
+    def recommend(self):
+        return recommender.recommend(self.learner.pk, rng=random.Random(0))
+
+    def test_recommends_an_unfinished_case_in_the_weakest_category(self):
+        recommendation = self.recommend()
+        self.assertEqual(recommendation.category_id, self.infectio.pk)
+        self.assertIn(recommendation.case_id, self.infectio_cases)
+        self.assertFalse(recommendation.repeat)
+        self.assertTrue(all(entry.mask.bit_length() <= 4 for _, entry in recommender.case_index.categories()))
+
+    def test_completed_cases_are_skipped_then_repeated(self):
+        recommender.mark_completed(self.learner.pk, self.infectio_cases[0])
+        self.assertEqual(self.recommend().case_id, self.infectio_cases[1])
+
+        for case_id in self.infectio_cases + self.cardio_cases:
+            recommender.mark_completed(self.learner.pk, case_id)
+        recommendation = self.recommend()
+        self.assertTrue(recommendation.repeat)
+        self.assertEqual(recommendation.category_id, self.infectio.pk)
+
+    def test_mark_completed_is_idempotent(self):
+        recommender.mark_completed(self.learner.pk, self.cardio_cases[0])
+        recommender.mark_completed(self.learner.pk, self.cardio_cases[0])
+        progress = LearnerCaseProgress.objects.get(learner=self.learner)
+        self.assertEqual(progress.completed_count, 1)
+        self.assertEqual(recommender.completed_cases(self.learner.pk), {self.cardio_cases[0]})
+
+    def test_rebuild_progress_from_completed_sessions(self):
+        for case_id, status in ((self.cardio_cases[0], SimulationSession.Status.COMPLETED),
+                                (self.cardio_cases[0], SimulationSession.Status.COMPLETED),
+                                (self.infectio_cases[0], SimulationSession.Status.ACTIVE)):
+            SimulationSession.objects.create(learner=self.learner, case_id=case_id, status=status)
+        LearnerCaseProgress.objects.create(learner=self.learner, completed=b'stale', completed_count=9)
+
+        self.assertEqual(recommender.rebuild_progress([self.learner.pk]), 1)
+        self.assertEqual(LearnerCaseProgress.objects.get(learner=self.learner).completed_count, 1)
+        self.assertEqual(recommender.completed_cases(self.learner.pk), {self.cardio_cases[0]})
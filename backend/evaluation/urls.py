@@ -0,0 +1,13 @@
+# backend/evaluation/urls.py
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+
+from .views import DiagnosisSubmissionViewSet, LearnerPerformanceView, NextCaseView
+
+router = DefaultRouter()
+router.register(r'submissions', DiagnosisSubmissionViewSet, basename='diagnosis-submission')
+
+urlpatterns = [
+    path('performance/', LearnerPerformanceView.as_view(), name='learner-performance'),
+    path('next-case/', NextCaseView.as_view(), name='next-case'),
+] + router.urls
@@ -1,3 +1,132 @@
-from django.shortcuts import render
+# backend/evaluation/views.py
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from cases.models import ClinicalCase
+from cases.serializers import ClinicalCaseListSerializer
+from core.metrics import SerializerTimingMixin, serialized
+from users.permissions import IsExpert
+
+from .logic.performance import record_submissions
+from .logic.recommender import case_index, recommend
+from .logic.submissions import score_submissions
+from .models import DiagnosisSubmission, FeedbackReport, LearnerCategoryStats
+from .services.feedback_engine import request_report
+from .serializers import DiagnosisSubmissionSerializer, LearnerCategoryStatsSerializer
+
+
+class DiagnosisSubmissionViewSet(SerializerTimingMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Diagnostics soumis par l'utilisateur connecté, un par session de simulation.
+    Le cas est celui de la session ; la soumission est notée dès sa création et son rapport de
+    feedback demandé aux workers. /report/ sert ce rapport en HTML, /report/pdf/ en PDF.
+    """
+    serializer_class = DiagnosisSubmissionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return DiagnosisSubmission.objects.filter(learner_id=self.request.user.pk).order_by('-submitted_at')
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        submission = serializer.save(learner_id=self.request.user.pk)
+        score_submissions([submission])
+        record_submissions([submission])
+        request_report(submission)
+
+    @action(detail=True, methods=['get'])
+    def report(self, request, pk=None):
+        return self._serve_report(pdf=False)
+
+    @action(detail=True, methods=['get'], url_path='report/pdf')
+    def report_pdf(self, request, pk=None):
+        return self._serve_report(pdf=True)
+
+    def _serve_report(self, pdf):
+        submission = self.get_object()
+        report = FeedbackReport.objects.filter(
+            session_id=submission.session_id, rubric_version=submission.rubric_version,
+            status=FeedbackReport.Status.READY,
+        ).first()
+        if report is None:
+            if request_report(submission) is None:
+                return Response({'detail': "Cette soumission n'a pas de rapport."}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'detail': "Rapport en cours de génération, réessayez dans quelques instants."},
+                            status=status.HTTP_202_ACCEPTED)
+        if pdf:
+            if not report.pdf:
+                return Response({'detail': "Rendu PDF indisponible sur ce serveur."},
+                                status=status.HTTP_404_NOT_FOUND)
+            response = HttpResponse(bytes(report.pdf), content_type='application/pdf')
+            response['Content-Disposition'] = f'inline; filename="feedback_session_{report.session_id}.pdf"'
+            return response
+        return HttpResponse(report.html, content_type='text/html; charset=utf-8')
+
+
+class LearnerPerformanceView(APIView):
+    """
+    Tableau de bord de performance : agrégats « toutes catégories » et par catégorie de
+    l'utilisateur connecté, lus en une requête sur LearnerCategoryStats.
+    Un expert peut consulter ceux d'un apprenant avec ?learner=<id>.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        learner_id = request.user.pk
+        if 'learner' in request.query_params:
+            if not IsExpert().has_permission(request, self):
+                self.permission_denied(request, message=IsExpert.message)
+            try:
+                learner_id = int(request.query_params['learner'])
+            except ValueError:
+                return Response({'detail': "Paramètre 'learner' invalide."}, status=400)
+
+        rows = LearnerCategoryStats.objects.filter(learner_id=learner_id).select_related('category')
+        overall, categories = None, []
+        for row in rows:
+            if row.category_id is None:
+                overall = row
+            else:
+                categories.append(row)
+        categories.sort(key=lambda row: (-row.attempts, row.category.name))
+        return Response({
+            'learner': learner_id,
+            'overall': serialized(LearnerCategoryStatsSerializer(overall)) if overall else None,
+            'categories': serialized(LearnerCategoryStatsSerializer(categories, many=True)),
+        })
+
+
+class NextCaseView(APIView):
+    """
+    Prochain cas conseillé à l'utilisateur connecté : un cas approuvé non encore fait, dans la
+    catégorie où ses résultats récents sont les plus faibles (cf. logic.recommender).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_attempts = 5
+
+    def get(self, request):
+        skipped = []
+        for _ in range(self.max_attempts):
+            recommendation = recommend(request.user.pk, exclude=skipped)
+            if recommendation is None:
+                break
+            case = ClinicalCase.objects.filter(
+                pk=recommendation.case_id, status=ClinicalCase.Status.APPROUVE,
+            ).prefetch_related('categories').first()
+            if case is None:
+                # Index de ce processus en retard sur un changement fait ailleurs
+                case_index.refresh([recommendation.case_id])
+                skipped.append(recommendation.case_id)
+                continue
+            return Response({
+                'case': serialized(ClinicalCaseListSerializer(case)),
+                'categories': [category.name for category in case.categories.all()],
+                'category': recommendation.category_id,
+                'weakness': recommendation.weakness,
+                'repeat': recommendation.repeat,
+            })
+        return Response({'detail': "Aucun cas approuvé disponible."}, status=status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'priority', 'attempts', 'duration_ms', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_by', 'locked_until', 'started_at', 'finished_at', 'duration_ms', 'result', 'last_error')
@@ -0,0 +1,98 @@
+# backend/jobs/management/commands/run_jobs.py
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import claim_next, requeue_expired, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Lance les workers de la file de tâches (processus x threads), sans broker externe."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Nombre de processus workers. Par défaut : 1.')
+        parser.add_argument('--threads', type=int, default=1,
+                            help='Nombre de threads par processus. Par défaut : 1.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Attente (s) entre deux consultations d'une file vide. Par défaut : 1.")
+        parser.add_argument('--burst', action='store_true',
+                            help="S'arrête dès que la file est vide (utile en CI ou en cron).")
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        self.stdout.write(
+            f"Démarrage de {processes} processus x {options['threads']} thread(s) "
+            f"({'burst' if options['burst'] else 'continu'})..."
+        )
+        if processes == 1:
+            _run_process(options['threads'], options['poll_interval'], options['burst'])
+            return
+
+        # Les connexions ne doivent pas être partagées avec les processus enfants
+        connections.close_all()
+        children = [
+            multiprocessing.Process(
+                target=_run_process,
+                args=(options['threads'], options['poll_interval'], options['burst']),
+            )
+            for _ in range(processes)
+        ]
+        for child in children:
+            child.start()
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            for child in children:
+                child.terminate()
+        self.stdout.write(self.style.SUCCESS("Workers arrêtés."))
+
+
+def _run_process(threads, poll_interval, burst):
+    stop = threading.Event()
+    if threads <= 1:
+        # Thread principal : les délais d'exécution peuvent être imposés par SIGALRM
+        _worker_loop(_worker_id(0), poll_interval, burst, stop)
+        return
+    workers = [
+        threading.Thread(target=_worker_loop, args=(_worker_id(i), poll_interval, burst, stop), daemon=True)
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        stop.set()
+
+
+def _worker_id(index):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def _worker_loop(worker_id, poll_interval, burst, stop):
+    try:
+        while not stop.is_set():
+            requeue_expired()
+            job = claim_next(worker_id)
+            if job is None:
+                if burst:
+                    return
+                stop.wait(poll_interval)
+                continue
+            started = time.monotonic()
+            status = run_job(job)
+            logger.info("[%s] tâche #%s %s -> %s (%.2f s)", worker_id, job.id, job.name, status,
+                        time.monotonic() - started)
+    finally:
+        connections.close_all()
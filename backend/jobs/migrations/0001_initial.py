@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Nom de la tâche enregistrée (ex: 'cases.import_cases')", max_length=200)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Arguments nommés passés à la tâche')),
+                ('priority', models.SmallIntegerField(default=0, help_text='Les tâches de priorité la plus haute passent en premier')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('succeeded', 'Terminée'), ('failed', 'Échouée')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3)),
+                ('timeout_seconds', models.PositiveIntegerField(default=600, help_text='Au-delà, la tâche est interrompue ou considérée perdue')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text="Pas d'exécution avant cette date (retries)")),
+                ('locked_by', models.CharField(blank=True, help_text='Worker qui exécute la tâche', max_length=150)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_ms', models.PositiveIntegerField(blank=True, help_text='Durée de la dernière exécution', null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('enqueued_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', '-priority', 'run_after'], name='job_claim_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# backend/jobs/models.py
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Une tâche de fond stockée en base (file sans broker externe).
+    Les workers (`manage.py run_jobs`) la réservent avec SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'En attente'
+        RUNNING = 'running', 'En cours'
+        SUCCEEDED = 'succeeded', 'Terminée'
+        FAILED = 'failed', 'Échouée'
+
+    name = models.CharField(max_length=200, help_text="Nom de la tâche enregistrée (ex: 'cases.import_cases')")
+    payload = models.JSONField(default=dict, blank=True, help_text="Arguments nommés passés à la tâche")
+    priority = models.SmallIntegerField(default=0, help_text="Les tâches de priorité la plus haute passent en premier")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    timeout_seconds = models.PositiveIntegerField(default=600,
+                                                  help_text="Au-delà, la tâche est interrompue ou considérée perdue")
+    run_after = models.DateTimeField(default=timezone.now, help_text="Pas d'exécution avant cette date (retries)")
+
+    locked_by = models.CharField(max_length=150, blank=True, help_text="Worker qui exécute la tâche")
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    enqueued_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True, help_text="Durée de la dernière exécution")
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"Tâche #{self.id} {self.name} ({self.get_status_display()})"
@@ -0,0 +1,197 @@
+# backend/jobs/queue.py
+"""
+File de tâches stockée en base de données.
+
+- `enqueue()` insère une tâche et rend la main immédiatement ;
+- `claim_next()` réserve la prochaine tâche (priorité décroissante) avec
+  SELECT ... FOR UPDATE SKIP LOCKED : plusieurs workers ne se bloquent jamais entre eux.
+  Sur SQLite, c'est l'UPDATE conditionnel qui garantit qu'un seul worker l'obtient ;
+- `run_job()` l'exécute, mesure sa durée et gère les nouvelles tentatives (backoff exponentiel).
+  Tant qu'elle tourne, un battement de cœur prolonge sa réservation toutes les
+  JOBS_HEARTBEAT_SECONDS : une tâche longue n'est jamais confiée à un second worker ;
+- `requeue_expired()` récupère les tâches dont le worker a disparu (réservation expirée).
+
+Le délai `timeout_seconds` n'est imposé (SIGALRM) que dans le thread principal d'un processus :
+en mode `--threads`, une tâche qui le dépasse continue, sous réservation, et un avertissement est journalisé.
+"""
+import logging
+import signal
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_handler
+
+logger = logging.getLogger(__name__)
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def enqueue(name, payload=None, priority=0, max_attempts=3, timeout_seconds=600, run_after=None, enqueued_by=None):
+    if get_handler(name) is None:
+        raise ValueError(f"Tâche inconnue : {name}")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts,
+        timeout_seconds=timeout_seconds,
+        run_after=run_after or timezone.now(),
+        enqueued_by_id=getattr(enqueued_by, 'pk', None),
+    )
+
+
+def claim_next(worker_id):
+    """Réserve la prochaine tâche exécutable pour `worker_id`, ou renvoie None."""
+    now = timezone.now()
+    claimable = {'status': Job.Status.PENDING, 'run_after__lte': now}
+
+    with transaction.atomic():
+        candidate = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(**claimable)
+            .order_by('-priority', 'run_after', 'id')
+            .values_list('id', 'timeout_seconds')
+            .first()
+        )
+        if candidate is None:
+            return None
+        job_id, timeout_seconds = candidate
+        claimed = Job.objects.filter(pk=job_id, **claimable).update(
+            status=Job.Status.RUNNING,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=timeout_seconds),
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+    if not claimed:
+        # Un autre worker l'a obtenue entre la lecture et l'UPDATE (bases sans FOR UPDATE)
+        return None
+    return Job.objects.get(pk=job_id)
+
+
+def requeue_expired():
+    """Remet en file (ou marque en échec) les tâches dont la réservation a expiré. Renvoie leur nombre."""
+    now = timezone.now()
+    return Job.objects.filter(status=Job.Status.RUNNING, locked_until__lt=now).update(
+        status=Case(
+            When(attempts__gte=F('max_attempts'), then=Value(Job.Status.FAILED)),
+            default=Value(Job.Status.PENDING),
+        ),
+        locked_by='',
+        locked_until=None,
+        run_after=now,
+        last_error="Réservation expirée : worker arrêté ou délai dépassé.",
+    )
+
+
+def extend_lease(job, seconds):
+    """Prolonge la réservation de `job` de `seconds` à partir de maintenant. Renvoie False si elle a été perdue."""
+    return bool(Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by).update(
+        locked_until=timezone.now() + timedelta(seconds=seconds),
+    ))
+
+
+class _Heartbeat(threading.Thread):
+    """Prolonge la réservation d'une tâche tant qu'elle s'exécute (thread dédié, sa propre connexion)."""
+
+    def __init__(self, job, interval, enforced):
+        super().__init__(name=f'job-{job.pk}-heartbeat', daemon=True)
+        self.job = job
+        self.interval = interval
+        self.enforced = enforced
+        self._done = threading.Event()
+
+    def run(self):
+        start = perf_counter()
+        warned = False
+        try:
+            while not self._done.wait(self.interval):
+                if not extend_lease(self.job, 3 * self.interval):
+                    logger.warning("Tâche #%s : réservation perdue", self.job.pk)
+                    return
+                if not self.enforced and not warned and perf_counter() - start > self.job.timeout_seconds:
+                    warned = True
+                    logger.warning("Tâche #%s (%s) : délai de %s s dépassé, non interruptible hors du thread principal",
+                                   self.job.pk, self.job.name, self.job.timeout_seconds)
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def _can_interrupt():
+    return hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Interrompt le bloc au bout de `seconds` (uniquement dans le thread principal d'un processus POSIX)."""
+    if not _can_interrupt():
+        # Sinon, la tâche va à son terme : le battement de cœur garde sa réservation
+        yield
+        return
+
+    def _raise_timeout(signum, frame):
+        raise JobTimeout(f"Délai de {seconds} s dépassé.")
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_job(job):
+    """Exécute une tâche réservée et enregistre son résultat. Renvoie le statut final."""
+    handler = get_handler(job.name)
+    start = perf_counter()
+    heartbeat = _Heartbeat(job, settings.JOBS_HEARTBEAT_SECONDS, enforced=_can_interrupt())
+    heartbeat.start()
+    try:
+        if handler is None:
+            raise LookupError(f"Aucune tâche enregistrée sous le nom '{job.name}'.")
+        with _time_limit(job.timeout_seconds):
+            result = handler(**job.payload)
+    except Exception as e:
+        heartbeat.stop()
+        duration_ms = int((perf_counter() - start) * 1000)
+        error = f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}"
+        retry = job.attempts < job.max_attempts and handler is not None
+        backoff = settings.JOBS_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+            status=Job.Status.PENDING if retry else Job.Status.FAILED,
+            run_after=timezone.now() + timedelta(seconds=backoff) if retry else job.run_after,
+            finished_at=None if retry else timezone.now(),
+            locked_by='',
+            locked_until=None,
+            duration_ms=duration_ms,
+            last_error=error,
+        )
+        return Job.Status.PENDING if retry else Job.Status.FAILED
+
+    heartbeat.stop()
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=Job.Status.SUCCEEDED,
+        finished_at=timezone.now(),
+        locked_by='',
+        locked_until=None,
+        duration_ms=int((perf_counter() - start) * 1000),
+        result=result,
+        last_error='',
+    )
+    return Job.Status.SUCCEEDED
@@ -0,0 +1,18 @@
+# backend/jobs/registry.py
+_handlers = {}
+
+
+def register_job(name):
+    """Décorateur : enregistre une fonction comme tâche de fond exécutable sous `name`."""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers.get(name)
+
+
+def registered_names():
+    return sorted(_handlers)
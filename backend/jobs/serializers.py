@@ -0,0 +1,11 @@
+# backend/jobs/serializers.py
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'name', 'status', 'priority', 'attempts', 'max_attempts', 'created_at', 'started_at',
+                  'finished_at', 'duration_ms', 'result', 'last_error']
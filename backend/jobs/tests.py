@@ -0,0 +1,42 @@
+# backend/jobs/tests.py
+import time
+from datetime import timedelta
+
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim_next, extend_lease, requeue_expired, run_job
+from .registry import register_job
+
+
+@register_job('jobs.tests.outlive_lease')
+def outlive_lease():
+    # Tâche plus longue que sa réservation initiale : le battement de cœur doit la prolonger
+    jobs = Job.objects.filter(name='jobs.tests.outlive_lease')
+    jobs.update(locked_until=timezone.now() - timedelta(seconds=1))
+    deadline = time.monotonic() + 5
+    while jobs.filter(locked_until__lt=timezone.now()).exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return requeue_expired()
+
+
+class LeaseTests(TransactionTestCase):
+
+    def test_extend_lease_only_for_the_owner(self):
+        Job.objects.create(name='jobs.tests.outlive_lease', timeout_seconds=60)
+        job = claim_next('worker-a')
+        self.assertTrue(extend_lease(job, 120))
+        job.refresh_from_db()
+        self.assertGreater(job.locked_until, timezone.now() + timedelta(seconds=100))
+        job.locked_by = 'worker-b'
+        self.assertFalse(extend_lease(job, 120))
+
+    def test_running_job_is_not_requeued(self):
+        Job.objects.create(name='jobs.tests.outlive_lease', timeout_seconds=60)
+        job = claim_next('worker-a')
+        with self.settings(JOBS_HEARTBEAT_SECONDS=1):
+            self.assertEqual(run_job(job), Job.Status.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual(job.result, 0)
+        self.assertEqual(job.attempts, 1)
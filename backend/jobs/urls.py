@@ -0,0 +1,8 @@
+# backend/jobs/urls.py
+from rest_framework.routers import DefaultRouter
+from .views import JobViewSet
+
+router = DefaultRouter()
+router.register(r'', JobViewSet, basename='job')
+
+urlpatterns = router.urls
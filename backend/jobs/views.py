@@ -0,0 +1,16 @@
+# backend/jobs/views.py
+from rest_framework import permissions, viewsets
+
+from core.metrics import SerializerTimingMixin
+from users.permissions import IsExpert
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
+    """Suivi des tâches de fond lancées par l'expert connecté."""
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated, IsExpert]
+
+    def get_queryset(self):
+        return Job.objects.filter(enqueued_by_id=self.request.user.pk).order_by('-created_at')
@@ -1,3 +1,31 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CaseAnswerCacheStats, CasePromptContext, SessionLogChunk, SimulationSession
+
+
+@admin.register(SimulationSession)
+class SimulationSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'learner', 'case', 'status', 'turn_count', 'fact_turns', 'ttft_max_ms', 'started_at')
+    list_filter = ('status',)
+    list_select_related = ('learner', 'case')
+    raw_id_fields = ('learner', 'case')
+    readonly_fields = ('summary', 'summary_turns', 'logged_turns')
+
+
+@admin.register(SessionLogChunk)
+class SessionLogChunkAdmin(admin.ModelAdmin):
+    list_display = ('session', 'first_turn', 'created_at')
+    raw_id_fields = ('session',)
+
+
+@admin.register(CasePromptContext)
+class CasePromptContextAdmin(admin.ModelAdmin):
+    list_display = ('case', 'kind', 'snapshot_version', 'token_count', 'rendered_at')
+    list_filter = ('kind',)
+    raw_id_fields = ('case',)
+
+
+@admin.register(CaseAnswerCacheStats)
+class CaseAnswerCacheStatsAdmin(admin.ModelAdmin):
+    list_display = ('case', 'exact_hits', 'semantic_hits', 'misses', 'hit_rate', 'updated_at')
+    raw_id_fields = ('case',)
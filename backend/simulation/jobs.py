@@ -0,0 +1,8 @@
+# backend/simulation/jobs.py
+from jobs.registry import register_job
+from .logic.indexing import reindex_cases
+
+
+@register_job('simulation.reindex_cases')
+def reindex_cases_job(case_ids):
+    return reindex_cases(case_ids)
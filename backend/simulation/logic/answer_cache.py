@@ -0,0 +1,205 @@
+# backend/simulation/logic/answer_cache.py
+"""
+Cache des réponses du patient simulé, partagé entre apprenants.
+
+Sur un même cas approuvé, les apprenants posent en grande partie les mêmes questions. Une réponse
+générée par le LLM est gardée sous la clé (cas, version du document, question normalisée) ; une
+question proche la réutilise si :
+- la similarité cosinus des embeddings dépasse SIMULATION_ANSWER_CACHE_THRESHOLD ;
+- et elle n'apporte aucun terme de contenu absent de la question en cache (aux variantes de
+  forme près) : « Avez-vous mal au bras ? » ne réutilise pas la réponse à « Avez-vous mal ? »,
+  ce qui garde la réponse fidèle aux faits du patient.
+
+La version du document fait partie de la clé : une modification du cas rend ses réponses
+inaccessibles (elles sont aussi purgées à réception de case_document_changed).
+Les entrées expirent après SIMULATION_ANSWER_CACHE_TTL secondes ; les cas (et, dans chaque cas,
+les réponses) les moins récemment servis sont évincés au-delà des tailles configurées.
+Les statistiques de succès par cas sont cumulées en mémoire et écrites par lots (CaseAnswerCacheStats).
+"""
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from time import monotonic
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from simulation.models import CaseAnswerCacheStats
+from .embeddings import get_embedder, tokenize
+from .facts import question_terms
+
+STEM_CHARS = 5
+
+
+def normalize_question(question):
+    """« Qu'est-ce qui vous amène ? » et « qu est ce qui vous amene » donnent la même clé."""
+    return ' '.join(tokenize(question))
+
+
+def _stems(question):
+    return {term[:STEM_CHARS] for term in question_terms(question)}
+
+
+class CachedAnswer:
+    __slots__ = ('question', 'stems', 'answer', 'created_at', 'last_used_at')
+
+    def __init__(self, question, answer, now):
+        self.question = question
+        self.stems = _stems(question)
+        self.answer = answer
+        self.created_at = now
+        self.last_used_at = now
+
+
+class CaseAnswers:
+    """Réponses d'un cas, à une version donnée : dictionnaire exact et matrice d'embeddings."""
+
+    def __init__(self):
+        self.entries = {}
+        self.questions = []  # question de chaque ligne de la matrice
+        self.matrix = None
+
+    def _drop(self, questions):
+        for question in questions:
+            del self.entries[question]
+        keep = [index for index, question in enumerate(self.questions) if question not in questions]
+        self.questions = [self.questions[index] for index in keep]
+        self.matrix = self.matrix[keep] if keep else None
+
+    def add(self, question, answer, vector, now, max_entries):
+        known = question in self.entries
+        self.entries[question] = CachedAnswer(question, answer, now)
+        if known:
+            return
+        self.questions.append(question)
+        self.matrix = vector[None, :] if self.matrix is None else np.vstack([self.matrix, vector])
+        if len(self.questions) > max_entries:
+            self._drop({min(self.questions, key=lambda q: self.entries[q].last_used_at)})
+
+    def expire(self, now, ttl):
+        expired = {question for question, entry in self.entries.items() if now - entry.created_at >= ttl}
+        if expired:
+            self._drop(expired)
+
+    def match(self, question, vector, threshold):
+        """(entrée, similarité, correspondance exacte) ; entrée à None si aucune réponse ne convient."""
+        entry = self.entries.get(question)
+        if entry is not None:
+            return entry, 1.0, True
+        if self.matrix is None:
+            return None, 0.0, False
+        similarities = self.matrix @ vector
+        stems = _stems(question)
+        for index in np.argsort(-similarities)[:5]:
+            similarity = float(similarities[index])
+            if similarity < threshold:
+                break
+            entry = self.entries[self.questions[index]]
+            if stems <= entry.stems:
+                return entry, similarity, False
+        return None, float(similarities.max()), False
+
+
+@dataclass(frozen=True)
+class AnswerCacheHit:
+    answer: str
+    similarity: float
+    exact: bool
+
+
+class AnswerCache:
+
+    def __init__(self):
+        self._cases = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: [0, 0, 0])  # case_id -> [exacts, sémantiques, échecs]
+        self._pending_stats = 0
+
+    @staticmethod
+    def _embed(question):
+        return get_embedder().embed_one(question)
+
+    def lookup(self, document, question):
+        """Réponse en cache pour cette question sur ce cas (à la version du document), ou None."""
+        key = (document['id'], document.get('version', 0))
+        normalized = normalize_question(question)
+        # L'embedding n'est calculé que si le cas a déjà des réponses en cache
+        vector = self._embed(normalized) if key in self._cases else None
+        now = monotonic()
+        with self._lock:
+            answers = self._cases.get(key)
+            entry, similarity, exact = None, 0.0, False
+            if answers is not None:
+                self._cases.move_to_end(key)
+                answers.expire(now, settings.SIMULATION_ANSWER_CACHE_TTL)
+                if vector is None:
+                    vector = self._embed(normalized)
+                entry, similarity, exact = answers.match(
+                    normalized, vector, settings.SIMULATION_ANSWER_CACHE_THRESHOLD,
+                )
+            stats = self._stats[key[0]]
+            if entry is None:
+                stats[2] += 1
+            else:
+                entry.last_used_at = now
+                stats[0 if exact else 1] += 1
+            self._pending_stats += 1
+        if entry is None:
+            return None
+        return AnswerCacheHit(entry.answer, similarity, exact)
+
+    def store(self, document, question, answer):
+        if not answer.strip():
+            return
+        key = (document['id'], document.get('version', 0))
+        normalized = normalize_question(question)
+        vector = self._embed(normalized)
+        with self._lock:
+            answers = self._cases.get(key)
+            if answers is None:
+                answers = self._cases[key] = CaseAnswers()
+            self._cases.move_to_end(key)
+            answers.add(normalized, answer, vector, monotonic(), settings.SIMULATION_ANSWER_CACHE_PER_CASE)
+            while len(self._cases) > settings.SIMULATION_ANSWER_CACHE_CASES:
+                self._cases.popitem(last=False)
+
+    def invalidate(self, case_ids):
+        case_ids = set(case_ids)
+        with self._lock:
+            for key in [key for key in self._cases if key[0] in case_ids]:
+                del self._cases[key]
+
+    def clear(self):
+        with self._lock:
+            self._cases.clear()
+
+    def stats_due(self):
+        return self._pending_stats >= settings.SIMULATION_ANSWER_CACHE_STATS_FLUSH
+
+    def flush_stats(self):
+        """Ajoute les compteurs accumulés depuis la dernière écriture à CaseAnswerCacheStats."""
+        with self._lock:
+            stats, self._stats = self._stats, defaultdict(lambda: [0, 0, 0])
+            self._pending_stats = 0
+        if not stats:
+            return 0
+        with transaction.atomic():
+            existing = set(CaseAnswerCacheStats.objects.filter(case_id__in=stats).values_list('case_id', flat=True))
+            CaseAnswerCacheStats.objects.bulk_create(
+                [CaseAnswerCacheStats(case_id=case_id) for case_id in stats if case_id not in existing],
+                ignore_conflicts=True,
+            )
+            for case_id, (exact, semantic, misses) in stats.items():
+                CaseAnswerCacheStats.objects.filter(case_id=case_id).update(
+                    exact_hits=F('exact_hits') + exact,
+                    semantic_hits=F('semantic_hits') + semantic,
+                    misses=F('misses') + misses,
+                    updated_at=timezone.now(),
+                )
+        return len(stats)
+
+
+answer_cache = AnswerCache()
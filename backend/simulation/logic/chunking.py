@@ -0,0 +1,57 @@
+# backend/simulation/logic/chunking.py
+"""Découpage du document d'un cas (cf. cases.logic.snapshot) en passages indexables, par section."""
+
+SECTIONS = ('resume', 'symptomes', 'antecedents', 'examens', 'diagnostics')
+MAX_CHUNK_CHARS = 800
+
+
+def _summary(document):
+    lines = [document.get('case_title', ''), document.get('motif_consultation', ''), document.get('case_summary', '')]
+    lines.append(f"Patient de {document.get('age')} ans, {document.get('sexe', '')}, {document.get('profession', '')}")
+    return lines
+
+
+def _symptoms(document):
+    return [
+        f"{s['nom']} {s.get('localisation', '')} depuis {s.get('date_debut', '')}, "
+        f"{s.get('evolution', '')} intensité {s.get('degre')}/10"
+        for s in document.get('symptoms', [])
+    ]
+
+
+def _history(document):
+    lines = [f"{h.get('type_display', h['type'])} : {h['description']}" for h in document.get('history', [])]
+    lines += [f"Traitement : {t['nom']} {t.get('posologie', '')}" for t in document.get('current_treatments', [])]
+    if document.get('mode_de_vie'):
+        lines.append(f"Mode de vie : {document['mode_de_vie']}")
+    return lines
+
+
+def _exams(document):
+    lines = [f"{p['nom_examen']} : {p['resultat_observation']}" for p in document.get('physical_findings', [])]
+    lines += [f"{e['nom']} : {e['resultat']}" for e in document.get('exams', [])]
+    return lines
+
+
+def _diagnoses(document):
+    return [f"{'Diagnostic final' if d['is_final'] else 'Diagnostic différentiel'} : {d['description']}"
+            for d in document.get('diagnoses', [])]
+
+
+_BUILDERS = dict(zip(SECTIONS, (_summary, _symptoms, _history, _exams, _diagnoses)))
+
+
+def case_chunks(document):
+    """Renvoie la liste des passages (section, partie, texte) d'un cas. Les sections vides sont omises."""
+    chunks = []
+    for section in SECTIONS:
+        lines = [line.strip() for line in _BUILDERS[section](document) if line and line.strip()]
+        part, current = 0, ''
+        for line in lines:
+            if current and len(current) + len(line) + 1 > MAX_CHUNK_CHARS:
+                chunks.append((section, part, current))
+                part, current = part + 1, ''
+            current = f"{current}\n{line}" if current else line
+        if current:
+            chunks.append((section, part, current))
+    return chunks
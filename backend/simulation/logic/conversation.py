@@ -0,0 +1,278 @@
+# backend/simulation/logic/conversation.py
+"""
+Journal compact des sessions de simulation et fenêtre de contexte bornée.
+
+Chaque session a un journal en ajout seul : les messages sont gardés en mémoire (objets à
+`__slots__`) et écrits par blocs (SessionLogChunk, plusieurs messages par ligne) tous les
+SIMULATION_LOG_FLUSH_TURNS messages, à la fin de la session ou quand elle sort du cache.
+
+Le prompt n'embarque que les SIMULATION_CONTEXT_TURNS derniers messages ; les plus anciens sont
+condensés dans un résumé glissant (au plus SIMULATION_SUMMARY_MAX_LINES lignes) mis en cache sur
+la session. La taille du prompt et la latence d'un tour restent ainsi à peu près constantes, quelle
+que soit la durée de la consultation.
+
+Le journal d'une session vit dans le processus qui la sert. Avec plusieurs workers sans affinité
+de session, chaque écriture relit le nombre de messages déjà journalisés sous verrou de la ligne
+de session : les blocs s'enchaînent sans collision, même si un autre worker a écrit entre-temps.
+"""
+import atexit
+import logging
+import threading
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from simulation.models import SessionLogChunk, SimulationSession
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_LINE_CHARS = 160
+FLUSH_ATTEMPTS = 3
+
+
+class Turn:
+    __slots__ = ('role', 'text', 'source')
+
+    USER = 'u'
+    PATIENT = 'p'
+
+    def __init__(self, role, text, source=''):
+        self.role = role
+        self.text = text
+        self.source = source
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    def to_row(self):
+        return [self.role, self.text, self.source]
+
+    def as_message(self):
+        return {'role': 'user' if self.role == self.USER else 'assistant', 'content': self.text}
+
+    def summary_line(self):
+        text = ' '.join(self.text.split())
+        if len(text) > SUMMARY_LINE_CHARS:
+            text = text[:SUMMARY_LINE_CHARS - 1] + '…'
+        return f"{'Médecin' if self.role == self.USER else 'Patient'} : {text}"
+
+
+class SessionLog:
+    """Journal d'une session : messages non encore écrits, fenêtre récente et résumé glissant."""
+
+    def __init__(self, session_id, logged_turns=0, summary='', summary_turns=0, window=(),
+                 context_turns=None, flush_turns=None, summary_max_lines=None):
+        self.session_id = session_id
+        self.context_turns = context_turns or settings.SIMULATION_CONTEXT_TURNS
+        self.flush_turns = flush_turns or settings.SIMULATION_LOG_FLUSH_TURNS
+        self.summary_max_lines = summary_max_lines or settings.SIMULATION_SUMMARY_MAX_LINES
+        self.flushed_turns = logged_turns
+        self.pending = []
+        self.summary_lines = deque(summary.splitlines() if summary else (), maxlen=self.summary_max_lines)
+        self.summary_turns = summary_turns
+        self.window = deque()
+        self.holders = 0  # requêtes en cours qui utilisent le journal (cf. SessionLogStore.acquire)
+        self.evicted = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        for turn in window:
+            self._push(turn)
+
+    @property
+    def total_turns(self):
+        return self.flushed_turns + len(self.pending)
+
+    @property
+    def summary(self):
+        return '\n'.join(self.summary_lines)
+
+    def _push(self, turn):
+        self.window.append(turn)
+        while len(self.window) > self.context_turns:
+            # Les lignes les plus anciennes du résumé sont évincées par la deque bornée
+            self.summary_lines.append(self.window.popleft().summary_line())
+            self.summary_turns += 1
+
+    def append(self, role, text, source=''):
+        turn = Turn(role, text, source)
+        with self._lock:
+            self.pending.append(turn)
+            self._push(turn)
+        return turn
+
+    def context(self):
+        """(résumé des échanges anciens, messages récents au format du client LLM)."""
+        with self._lock:
+            return self.summary, [turn.as_message() for turn in self.window]
+
+    def needs_flush(self):
+        # Un journal sorti du cache n'est plus écrit par personne d'autre : ses messages partent aussitôt
+        return len(self.pending) >= self.flush_turns or (self.evicted and bool(self.pending))
+
+    def flush(self):
+        """
+        Écrit les messages en attente en un seul bloc, avec le résumé courant. Renvoie le nombre écrit.
+
+        Le rang du premier message du bloc est relu en base, sous verrou de la session : un autre
+        worker a pu journaliser des messages de la même session depuis le chargement de ce journal.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self.pending)
+                summary, summary_turns = self.summary, self.summary_turns
+            if not batch:
+                return 0
+            for attempt in range(1, FLUSH_ATTEMPTS + 1):
+                try:
+                    first_turn = self._write_chunk(batch, summary, summary_turns)
+                    break
+                except IntegrityError:
+                    # Bloc écrit au même rang par un autre worker (SQLite ignore select_for_update) : on relit
+                    if attempt == FLUSH_ATTEMPTS:
+                        raise
+            if first_turn is None:
+                # Session supprimée entre-temps : il n'y a plus rien à journaliser
+                logger.warning("Session #%s introuvable : %d message(s) abandonné(s)", self.session_id, len(batch))
+            with self._lock:
+                del self.pending[:len(batch)]
+                if first_turn is not None:
+                    self.flushed_turns = first_turn + len(batch)
+            return len(batch) if first_turn is not None else 0
+
+    def _write_chunk(self, batch, summary, summary_turns):
+        with transaction.atomic():
+            first_turn = (
+                SimulationSession.objects.select_for_update().filter(pk=self.session_id)
+                .values_list('logged_turns', flat=True).first()
+            )
+            if first_turn is None:
+                return None
+            SessionLogChunk.objects.create(
+                session_id=self.session_id, first_turn=first_turn, turns=[turn.to_row() for turn in batch],
+            )
+            SimulationSession.objects.filter(pk=self.session_id).update(
+                logged_turns=first_turn + len(batch), summary=summary, summary_turns=summary_turns,
+            )
+        return first_turn
+
+
+def load_session_log(session_id):
+    """Recharge un journal depuis la base : résumé en cache et seulement les derniers blocs."""
+    state = SimulationSession.objects.filter(pk=session_id).values('logged_turns', 'summary', 'summary_turns').first()
+    if state is None:
+        return None
+    start = max(state['summary_turns'], state['logged_turns'] - settings.SIMULATION_CONTEXT_TURNS)
+    chunks = []
+    if state['logged_turns'] > start:
+        rows = SessionLogChunk.objects.filter(session_id=session_id).order_by('-first_turn').values_list(
+            'first_turn', 'turns',
+        )
+        for first_turn, turns in rows.iterator(chunk_size=4):
+            chunks.append((first_turn, turns))
+            if first_turn <= start:
+                break
+    window = [
+        Turn.from_row(row)
+        for first_turn, turns in reversed(chunks)
+        for index, row in enumerate(turns, start=first_turn)
+        if index >= start
+    ]
+    return SessionLog(session_id, logged_turns=state['logged_turns'], summary=state['summary'],
+                      summary_turns=max(state['summary_turns'], start), window=window)
+
+
+class SessionLogStore:
+    """
+    Journaux des sessions actives du processus (LRU borné ; un journal évincé est d'abord écrit).
+    Un journal réservé par `acquire()` n'est pas évincé avant `release()` : une requête en cours
+    ne peut pas ajouter de messages à un journal que le cache a déjà oublié.
+    """
+
+    def __init__(self, max_sessions=None):
+        self.max_sessions = max_sessions
+        self._logs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id, hold=False):
+        with self._lock:
+            log = self._logs.get(session_id)
+            if log is not None:
+                self._logs.move_to_end(session_id)
+                log.holders += hold
+                return log
+        log = load_session_log(session_id)
+        if log is None:
+            return None
+        with self._lock:
+            log = self._logs.setdefault(session_id, log)
+            log.holders += hold
+            evicted = self._evict(keep=session_id)
+        for old in evicted:
+            old.flush()
+        return log
+
+    def acquire(self, session_id):
+        """Journal de la session, réservé jusqu'à `release()` (à appeler dans un finally)."""
+        return self.get(session_id, hold=True)
+
+    def release(self, log):
+        with self._lock:
+            log.holders -= 1
+            orphan = log.evicted and not log.holders
+        if orphan:
+            log.flush()
+
+    def _evict(self, keep):
+        # Les plus anciens d'abord ; les journaux réservés (et celui qu'on vient de charger) restent,
+        # quitte à dépasser la taille un moment
+        max_sessions = self.max_sessions or settings.SIMULATION_LOG_CACHE_SIZE
+        evicted = []
+        for session_id, log in list(self._logs.items()):
+            if len(self._logs) <= max_sessions:
+                break
+            if log.holders or session_id == keep:
+                continue
+            del self._logs[session_id]
+            log.evicted = True
+            evicted.append(log)
+        return evicted
+
+    def flush(self, session_id):
+        with self._lock:
+            log = self._logs.get(session_id)
+        if log is not None:
+            log.flush()
+
+    def close(self, session_id):
+        """Fin de session : écrit les derniers messages et libère le journal."""
+        with self._lock:
+            log = self._logs.pop(session_id, None)
+            if log is not None:
+                log.evicted = True
+        if log is not None:
+            log.flush()
+
+    def flush_all(self):
+        with self._lock:
+            logs = list(self._logs.values())
+        for log in logs:
+            try:
+                log.flush()
+            except Exception:
+                logger.exception("Écriture du journal de la session #%s impossible", log.session_id)
+
+
+session_logs = SessionLogStore()
+atexit.register(session_logs.flush_all)
+
+
+def read_transcript(session_id):
+    """Transcription complète d'une session (messages en attente inclus)."""
+    session_logs.flush(session_id)
+    return [
+        Turn.from_row(row)
+        for turns in SessionLogChunk.objects.filter(session_id=session_id).values_list('turns', flat=True)
+        for row in turns
+    ]
@@ -0,0 +1,118 @@
+# backend/simulation/logic/dialogue.py
+"""Génération en streaming de la réponse du patient simulé, au format Server-Sent Events."""
+import json
+from time import perf_counter
+
+from asgiref.sync import sync_to_async
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from core.metrics import registry
+from simulation.models import SimulationSession
+from .answer_cache import answer_cache
+from .conversation import Turn
+from .facts import answer_from_facts
+from .llm import get_llm_client
+from .prompt_context import prompt_contexts
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def record_llm_turn(session_id, first_token_ms, total_ms):
+    await SimulationSession.objects.filter(pk=session_id).aupdate(
+        turn_count=F('turn_count') + 1,
+        llm_turns=F('llm_turns') + 1,
+        ttft_total_ms=F('ttft_total_ms') + first_token_ms,
+        ttft_max_ms=Greatest(F('ttft_max_ms'), Value(first_token_ms)),
+        llm_total_ms=F('llm_total_ms') + total_ms,
+    )
+
+
+async def record_instant_turn(session_id, source, total_ms):
+    """Tour servi sans appel au LLM : `source` vaut 'fact' ou 'cache'."""
+    await SimulationSession.objects.filter(pk=session_id).aupdate(**{
+        'turn_count': F('turn_count') + 1,
+        f'{source}_turns': F(f'{source}_turns') + 1,
+        f'{source}_total_ms': F(f'{source}_total_ms') + total_ms,
+    })
+
+
+async def build_system_prompt(document, summary):
+    context = prompt_contexts.cached(document) or await sync_to_async(prompt_contexts.for_document)(document)
+    prompt = context.text
+    if summary:
+        prompt += "\n\nDébut de la consultation (résumé des échanges précédents) :\n" + summary
+    return prompt
+
+
+async def _flush_log(log):
+    if log.needs_flush():
+        await sync_to_async(log.flush)()
+    if answer_cache.stats_due():
+        await sync_to_async(answer_cache.flush_stats)()
+
+
+async def _instant_answer(session_id, log, text, source, started_at, **details):
+    yield sse_event('token', {'text': text})
+    total_ms = (perf_counter() - started_at) * 1000
+    log.append(Turn.PATIENT, text, source)
+    registry.simulation_answers.inc({'source': source})
+    registry.simulation_ttft.observe({'source': source}, total_ms / 1000)
+    await record_instant_turn(session_id, 'fact' if source == 'facts' else source, total_ms)
+    await _flush_log(log)
+    yield sse_event('done', dict(source=source, ttft_ms=round(total_ms, 1), total_ms=round(total_ms, 1), **details))
+
+
+async def stream_patient_answer(session_id, document, log, question, started_at):
+    """
+    Génère les événements SSE d'une réponse du patient :
+    `token` pour chaque fragment, puis `done` avec le temps jusqu'au premier token (ttft_ms),
+    mesuré depuis l'arrivée de la requête (`started_at`, horloge perf_counter), et la source
+    de la réponse : "facts" si elle vient directement des données du cas, "cache" si une réponse
+    générée pour une question équivalente sur ce cas est réutilisée, "llm" sinon.
+    La question et la réponse sont ajoutées au journal de la session (`log`, cf. logic.conversation).
+    """
+    log.append(Turn.USER, question)
+    fact = answer_from_facts(document, question)
+    if fact is not None:
+        async for event in _instant_answer(session_id, log, fact.text, 'facts', started_at, intent=fact.intent):
+            yield event
+        return
+    hit = answer_cache.lookup(document, question)
+    if hit is not None:
+        async for event in _instant_answer(session_id, log, hit.answer, 'cache', started_at,
+                                           similarity=round(hit.similarity, 3)):
+            yield event
+        return
+
+    client = get_llm_client()
+    summary, messages = log.context()
+    prompt = await build_system_prompt(document, summary)
+    first_token_ms = None
+    parts = []
+    try:
+        async for token in client.stream(prompt, messages):
+            if first_token_ms is None:
+                first_token_ms = (perf_counter() - started_at) * 1000
+            parts.append(token)
+            yield sse_event('token', {'text': token})
+    except Exception as e:
+        yield sse_event('error', {'detail': f"Le patient simulé n'a pas pu répondre : {e}"})
+        return
+
+    total_ms = (perf_counter() - started_at) * 1000
+    answer = ''.join(parts)
+    log.append(Turn.PATIENT, answer, 'llm')
+    answer_cache.store(document, question, answer)
+    if first_token_ms is not None:
+        registry.simulation_answers.inc({'source': 'llm'})
+        registry.simulation_ttft.observe({'source': 'llm'}, first_token_ms / 1000)
+        await record_llm_turn(session_id, first_token_ms, total_ms)
+    await _flush_log(log)
+    yield sse_event('done', {
+        'source': 'llm',
+        'ttft_ms': round(first_token_ms, 1) if first_token_ms is not None else None,
+        'total_ms': round(total_ms, 1),
+    })
@@ -0,0 +1,82 @@
+# backend/simulation/logic/embeddings.py
+"""
+Embedders utilisés par l'index de recherche des cas (RAG du simulateur).
+
+Un embedder expose `dim` et `embed(texts)` qui renvoie une matrice float32 (len(texts), dim)
+de vecteurs normalisés (norme L2 = 1) : le produit scalaire est alors une similarité cosinus.
+L'embedder est choisi par le réglage SIMULATION_EMBEDDER (chemin pointé vers une classe).
+"""
+import math
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text):
+    """Minuscules, sans accents : 'Fièvre' et 'fievre' donnent le même texte."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+class Embedder:
+    dim = None
+
+    def embed(self, texts):
+        raise NotImplementedError
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+
+class HashingEmbedder(Embedder):
+    """
+    Embedder déterministe sans modèle ni réseau (hashing trick sur mots et trigrammes de caractères).
+    Sert hors ligne et en test ; un embedder neuronal peut le remplacer via SIMULATION_EMBEDDER.
+    """
+
+    # Les mots pèsent plus que les trigrammes, qui ne servent qu'à absorber les variantes d'orthographe
+    WORD_WEIGHT = 1.0
+    TRIGRAM_WEIGHT = 0.35
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def _features(self, text):
+        # Les chiffres isolés discriminent (« diabète de type 1 » / « type 2 ») : on les garde
+        tokens = [token for token in tokenize(text) if len(token) > 1 or token.isdigit()]
+        features = Counter({f'w:{token}': self.WORD_WEIGHT for token in tokens})
+        for token in tokens:
+            padded = f' {token} '
+            for i in range(len(padded) - 2):
+                features[padded[i:i + 3]] += self.TRIGRAM_WEIGHT
+        return features
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                # crc32 plutôt que hash() : stable d'un processus à l'autre
+                h = zlib.crc32(feature.encode('utf-8'))
+                # Pondération sous-linéaire : un terme répété ne domine pas tout le passage
+                value = math.log1p(weight)
+                matrix[row, h % self.dim] += value if (h >> 31) & 1 else -value
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    return import_string(settings.SIMULATION_EMBEDDER)()
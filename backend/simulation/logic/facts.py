@@ -0,0 +1,342 @@
+# backend/simulation/logic/facts.py
+"""
+Réponses du patient simulé tirées directement des données structurées du cas.
+
+Beaucoup de questions de l'apprenant sont fermées (« Depuis quand ? », « Vous fumez ? »,
+« Quels antécédents ? ») : leur réponse figure déjà dans les symptômes, antécédents,
+traitements ou le mode de vie du cas. Un classifieur d'intention (BM25 sur des modèles de
+questions en français) reconnaît ces questions, et l'index des faits du cas, précalculé une
+fois par version du document, fournit la réponse sans appel au LLM. Les questions ouvertes,
+ou trop éloignées des modèles, restent confiées au LLM.
+"""
+import math
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+
+from .embeddings import normalize_text, tokenize
+
+# Modèles de questions par intention (le classifieur les compare après normalisation)
+INTENT_TEMPLATES = {
+    'debut': [
+        "Depuis quand avez-vous mal ?",
+        "Depuis combien de temps avez-vous ces symptômes ?",
+        "Quand est-ce que ça a commencé ?",
+        "Quand les symptômes ont-ils débuté ?",
+        "Ça a commencé quand ?",
+    ],
+    'localisation': [
+        "Où avez-vous mal ?",
+        "Où se situe la douleur ?",
+        "Montrez-moi où ça fait mal.",
+        "La douleur est localisée où ?",
+    ],
+    'intensite': [
+        "Sur une échelle de 0 à 10, à combien évaluez-vous la douleur ?",
+        "Quelle est l'intensité de la douleur ?",
+        "La douleur est-elle forte ?",
+        "Vous avez très mal ?",
+    ],
+    'evolution': [
+        "Comment les symptômes ont-ils évolué ?",
+        "Est-ce que ça s'aggrave ou ça s'améliore ?",
+        "Ça empire ?",
+    ],
+    'frequence': [
+        "À quelle fréquence avez-vous ces crises ?",
+        "Combien de fois par jour ?",
+        "Combien de temps dure la douleur ?",
+        "C'est permanent ou ça va et ça vient ?",
+    ],
+    'declencheur': [
+        "Qu'est-ce qui déclenche la douleur ?",
+        "Ça arrive à l'effort ?",
+        "Qu'est-ce qui provoque les symptômes ?",
+    ],
+    'antecedents': [
+        "Avez-vous des antécédents médicaux ?",
+        "Quels sont vos antécédents ?",
+        "Avez-vous des maladies connues ?",
+        "Avez-vous déjà été malade, hospitalisé ?",
+    ],
+    'chirurgie': [
+        "Avez-vous déjà été opéré ?",
+        "Avez-vous des antécédents chirurgicaux ?",
+        "Avez-vous subi une opération ou une intervention chirurgicale ?",
+    ],
+    'familial': [
+        "Avez-vous des antécédents familiaux ?",
+        "Y a-t-il des maladies dans votre famille ?",
+        "Vos parents ont-ils des problèmes de santé ?",
+    ],
+    'allergies': [
+        "Avez-vous des allergies ?",
+        "Êtes-vous allergique à un médicament ?",
+    ],
+    'traitements': [
+        "Prenez-vous des médicaments ?",
+        "Quel traitement suivez-vous actuellement ?",
+        "Avez-vous un traitement en cours ?",
+        "Vous prenez quelque chose pour ça ?",
+    ],
+    'tabac': [
+        "Vous fumez ?",
+        "Fumez-vous des cigarettes ?",
+        "Quelle est votre consommation de tabac ?",
+        "Combien de cigarettes par jour ?",
+    ],
+    'alcool': [
+        "Buvez-vous de l'alcool ?",
+        "Quelle est votre consommation d'alcool ?",
+        "Vous buvez ?",
+    ],
+    'profession': [
+        "Quel est votre métier ?",
+        "Que faites-vous dans la vie ?",
+        "Quelle est votre profession ?",
+        "Vous travaillez ?",
+    ],
+    'age': [
+        "Quel âge avez-vous ?",
+        "Vous avez quel âge ?",
+    ],
+    'famille': [
+        "Êtes-vous marié ?",
+        "Avez-vous des enfants ?",
+        "Quelle est votre situation familiale ?",
+    ],
+}
+
+# Mots-outils ignorés par le classifieur (après normalisation : minuscules, sans accents).
+# « ou » est conservé : sans accents, c'est aussi « où », qui distingue la localisation.
+STOPWORDS = frozenset("""
+    a au aux avec ce ces c ca cela d de des du elle en est et etes il ils j je l la le les
+    leur m ma me mes mon n ne nous on par pas pour qu que quel quelle quelles quels qui
+    s sa se ses son sur t ta te tes ton tu un une vos votre vous y
+    dans chez avez etes avoir etre sont fait faites
+    bien bon alors donc monsieur madame dites moi
+""".split())
+
+# Symptômes nommés dans une question (« Depuis quand avez-vous de la fièvre ? ») : ils désignent
+# ce dont parle la question, pas l'intention ; le classifieur ne les compte pas dans la couverture.
+# Pas de parties du corps : « Avez-vous mal au ventre ? » n'est pas « Où avez-vous mal ? ».
+SUBJECT_TERMS = frozenset("""
+    fievre toux tousse toussez diarrhee diarrhees vomissement vomissements vomi vomissez nausee nausees
+    cephalee cephalees fatigue asthenie vertige vertiges essoufflement dyspnee palpitations frissons
+    sueurs convulsions saignement saignements eruption boutons demangeaisons constipation amaigrissement
+""".split())
+
+# Clés libres de `mode_de_vie` rattachées à chaque intention
+LIFESTYLE_KEYS = {
+    'tabac': ('tabac', 'tabagisme', 'cigarette', 'fume', 'tabagique'),
+    'alcool': ('alcool', 'ethylisme', 'boisson'),
+}
+
+
+def question_terms(text):
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+
+class IntentClassifier:
+    """BM25 sur les modèles de questions ; l'intention retenue est celle du meilleur modèle."""
+
+    def __init__(self, templates=INTENT_TEMPLATES, k1=1.2, b=0.75, min_score=1.5, min_coverage=0.8, min_margin=0.25,
+                 subjects=SUBJECT_TERMS):
+        self.k1 = k1
+        self.b = b
+        self.min_score = min_score
+        self.min_coverage = min_coverage
+        self.min_margin = min_margin
+        self.subjects = subjects
+        self.documents = []
+        self.vocabulary = defaultdict(set)  # intention -> mots de ses modèles
+        for intent, questions in templates.items():
+            for question in questions:
+                terms = question_terms(question)
+                if terms:
+                    self.documents.append((intent, Counter(terms), len(terms)))
+                    self.vocabulary[intent].update(terms)
+        self.avg_length = sum(length for _, _, length in self.documents) / len(self.documents)
+        document_frequency = Counter(term for _, terms, _ in self.documents for term in terms)
+        n = len(self.documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+        self.postings = defaultdict(list)
+        for index, (_, terms, _) in enumerate(self.documents):
+            for term in terms:
+                self.postings[term].append(index)
+
+    def scores(self, question):
+        """
+        Mots de la question (hors symptômes nommés) et score de chaque modèle : BM25, pondéré par la
+        part des mots du modèle présents dans la question (« Quels antécédents ? » est plus proche de
+        « Quels sont vos antécédents ? » que de « Avez-vous des antécédents chirurgicaux ? »).
+        """
+        terms = set(question_terms(question)) - self.subjects
+        scores = defaultdict(float)
+        matched = Counter()
+        for term in terms:
+            for index in self.postings.get(term, ()):
+                _, counts, length = self.documents[index]
+                tf = counts[term]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / self.avg_length)
+                scores[index] += self.idf[term] * tf * (self.k1 + 1) / norm
+                matched[index] += 1
+        for index in scores:
+            scores[index] *= matched[index] / len(self.documents[index][1])
+        return terms, scores
+
+    def classify(self, question):
+        """
+        Renvoie (intention, score), ou (None, score) si la question ne ressemble assez à aucun modèle.
+        Une réponse toute faite n'est donnée que si :
+        - `min_coverage` : presque tous les mots de la question, hors symptômes nommés, figurent dans
+          les modèles de l'intention retenue (« Avez-vous mal au ventre ? » n'est pas « Où avez-vous mal ? ») ;
+        - `min_margin` : l'intention devance nettement la meilleure intention concurrente.
+        Dans le doute, la question reste confiée au LLM.
+        """
+        terms, scores = self.scores(question)
+        if not scores:
+            return None, 0.0
+        by_intent = defaultdict(float)
+        for index, score in scores.items():
+            intent = self.documents[index][0]
+            by_intent[intent] = max(by_intent[intent], score)
+        ranked = sorted(by_intent.items(), key=lambda item: -item[1])
+        intent, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        covered = sum(1 for term in terms if term in self.vocabulary[intent])
+        if (best < self.min_score or covered / len(terms) < self.min_coverage
+                or best - runner_up < self.min_margin * best):
+            return None, best
+        return intent, best
+
+
+def _join(items):
+    items = [item for item in items if item]
+    if len(items) <= 1:
+        return ''.join(items)
+    return ', '.join(items[:-1]) + ' et ' + items[-1]
+
+
+def _lifestyle_value(mode_de_vie, intent):
+    if not isinstance(mode_de_vie, dict):
+        return None
+    for key, value in mode_de_vie.items():
+        if any(word in normalize_text(key) for word in LIFESTYLE_KEYS[intent]):
+            return str(value).strip() or None
+    return None
+
+
+def _history_answer(entries, empty):
+    if not entries:
+        return empty
+    return "Oui : " + _join([entry['description'] for entry in entries]) + "."
+
+
+def build_fact_index(document):
+    """
+    Précalcule, pour chaque intention, la réponse du patient à partir du document du cas.
+    Une intention sans donnée exploitable est absente de l'index (la question ira au LLM).
+    """
+    symptoms = document.get('symptoms', [])
+    history = document.get('history', [])
+    facts = {}
+
+    if symptoms:
+        facts['debut'] = _join([f"{s['nom'].lower()} : {s['date_debut']}" for s in symptoms if s.get('date_debut')])
+        facts['localisation'] = _join([
+            f"{s['nom'].lower()} : {s['localisation']}" for s in symptoms if s.get('localisation')
+        ])
+        facts['intensite'] = _join([f"{s['nom'].lower()} : {s['degre']} sur 10" for s in symptoms])
+        facts['evolution'] = _join([f"{s['nom'].lower()} : {s['evolution']}" for s in symptoms if s.get('evolution')])
+        facts['frequence'] = _join([
+            f"{s['nom'].lower()} : " + ', '.join(filter(None, [s.get('frequence'), s.get('duree')]))
+            for s in symptoms if s.get('frequence') or s.get('duree')
+        ])
+        facts['declencheur'] = _join([
+            f"{s['nom'].lower()} : {s['activite_declenchante']}" for s in symptoms if s.get('activite_declenchante')
+        ])
+
+    by_type = defaultdict(list)
+    for entry in history:
+        by_type[entry['type']].append(entry)
+    facts['antecedents'] = _history_answer(
+        by_type['medical'] + by_type['chirurgical'] + by_type['obstetrical'],
+        "Non, je n'ai pas de problème de santé connu.",
+    )
+    facts['chirurgie'] = _history_answer(by_type['chirurgical'], "Non, je n'ai jamais été opéré.")
+    facts['familial'] = _history_answer(by_type['familial'], "Pas que je sache, non.")
+    facts['allergies'] = _history_answer(by_type['allergie'], "Non, je n'ai pas d'allergie connue.")
+
+    treatments = document.get('current_treatments', [])
+    facts['traitements'] = (
+        "Oui : " + _join([f"{t['nom']} {t.get('posologie', '')}".strip() for t in treatments]) + "."
+        if treatments else "Non, je ne prends aucun médicament en ce moment."
+    )
+
+    for intent in LIFESTYLE_KEYS:
+        value = _lifestyle_value(document.get('mode_de_vie'), intent)
+        if value:
+            facts[intent] = f"{value[0].upper()}{value[1:]}."
+
+    if document.get('profession'):
+        facts['profession'] = f"Je suis {document['profession'].lower()}."
+    if document.get('age'):
+        facts['age'] = f"J'ai {document['age']} ans."
+    family = [document['etat_civil'].lower()] if document.get('etat_civil') else []
+    children = document.get('nombre_enfant') or 0
+    family.append(f"{children} enfant{'s' if children > 1 else ''}" if children else "pas d'enfant")
+    facts['famille'] = _join(family) + "."
+
+    return {intent: answer for intent, answer in facts.items() if answer}
+
+
+@dataclass(frozen=True)
+class FactAnswer:
+    intent: str
+    text: str
+    score: float
+
+
+class FactIndexCache:
+    """Index de faits par (cas, version du document) ; borné, les plus anciens sont évincés."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, document):
+        key = (document.get('id'), document.get('version'))
+        with self._lock:
+            facts = self._entries.get(key)
+            if facts is not None:
+                self._entries.move_to_end(key)
+                return facts
+        facts = build_fact_index(document)
+        with self._lock:
+            self._entries[key] = facts
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return facts
+
+
+classifier = IntentClassifier()
+fact_indexes = FactIndexCache()
+
+
+def answer_from_facts(document, question):
+    """Réponse issue des données structurées du cas, ou None si la question doit aller au LLM."""
+    intent, score = classifier.classify(question)
+    if intent is None:
+        return None
+    text = fact_indexes.get(document).get(intent)
+    if not text:
+        return None
+    text = text[0].upper() + text[1:]
+    if not text.endswith(('.', '!', '?')):
+        text += '.'
+    return FactAnswer(intent=intent, text=text, score=score)
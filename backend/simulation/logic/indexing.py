@@ -0,0 +1,17 @@
+# backend/simulation/logic/indexing.py
+from cases.logic.snapshot import iter_case_documents
+from cases.models import ClinicalCase
+from .vector_index import get_case_index
+
+
+def reindex_cases(case_ids):
+    """Met à jour l'index pour les cas donnés : les cas approuvés sont (ré)indexés, les autres retirés."""
+    index = get_case_index()
+    # Lecture sur la base principale : un réplica en retard ignorerait un cas tout juste approuvé
+    documents = list(iter_case_documents(ClinicalCase.objects.filter(pk__in=case_ids)))
+    approved = [document for document in documents if document['status'] == ClinicalCase.Status.APPROUVE]
+    approved_ids = {document['id'] for document in approved}
+    index.remove_cases([case_id for case_id in case_ids if case_id not in approved_ids])
+    if approved:
+        index.upsert_cases(approved)
+    return {'indexed': len(approved), 'removed': len(case_ids) - len(approved)}
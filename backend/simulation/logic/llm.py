@@ -0,0 +1,113 @@
+# backend/simulation/logic/llm.py
+"""
+Client LLM asynchrone du simulateur, en streaming.
+
+Deux backends :
+- "stub"   : local, sans réseau, avec une latence de premier token et un débit configurables
+             (développement, tests de charge) ;
+- "gemini" : google.generativeai en mode streaming.
+
+`AsyncLLMClient.stream()` intercale une file bornée entre le backend (producteur) et le
+consommateur (la réponse HTTP) : si le client lit lentement, le producteur est mis en
+attente au lieu d'accumuler la réponse en mémoire ; si le client se déconnecte, la
+génération est annulée.
+"""
+import asyncio
+import re
+
+from django.conf import settings
+
+_WORD_RE = re.compile(r'\S+\s*')
+_DONE = object()
+
+
+class StubLLMBackend:
+
+    def __init__(self, first_token_latency=0.3, tokens_per_second=40.0):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+
+    def compose(self, system_prompt, messages):
+        question = messages[-1]['content'] if messages else ''
+        return (
+            f"Eh bien docteur, pour répondre à votre question « {question.strip()} », "
+            "je ne sais pas trop quoi vous dire de plus... Je me sens surtout fatigué et inquiet "
+            "depuis que ça a commencé."
+        )
+
+    async def stream(self, system_prompt, messages):
+        await asyncio.sleep(self.first_token_latency)
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second else 0
+        for token in _WORD_RE.findall(self.compose(system_prompt, messages)):
+            yield token
+            if delay:
+                await asyncio.sleep(delay)
+
+
+class GeminiLLMBackend:
+
+    def __init__(self, model_name='gemini-flash-latest'):
+        self.model_name = model_name
+
+    async def stream(self, system_prompt, messages):
+        import google.generativeai as genai
+
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        model = genai.GenerativeModel(self.model_name, system_instruction=system_prompt)
+        contents = [
+            {'role': 'user' if message['role'] == 'user' else 'model', 'parts': [message['content']]}
+            for message in messages
+        ]
+        response = await model.generate_content_async(contents, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class AsyncLLMClient:
+
+    def __init__(self, backend, buffer_size=32):
+        self.backend = backend
+        self.buffer_size = buffer_size
+
+    async def stream(self, system_prompt, messages):
+        queue = asyncio.Queue(maxsize=self.buffer_size)
+
+        async def produce():
+            try:
+                async for token in self.backend.stream(system_prompt, messages):
+                    # Bloque tant que le consommateur n'a pas libéré de place (backpressure)
+                    await queue.put(token)
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                await queue.put(_DONE)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Déconnexion du client ou erreur : on arrête la génération en cours
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
+
+def get_llm_client():
+    if settings.SIMULATION_LLM_BACKEND == 'gemini':
+        backend = GeminiLLMBackend()
+    else:
+        backend = StubLLMBackend(
+            first_token_latency=settings.SIMULATION_STUB_FIRST_TOKEN_LATENCY,
+            tokens_per_second=settings.SIMULATION_STUB_TOKENS_PER_SECOND,
+        )
+    return AsyncLLMClient(backend)
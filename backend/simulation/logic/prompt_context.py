@@ -0,0 +1,138 @@
+# backend/simulation/logic/prompt_context.py
+"""
+Contextes de prompt des cas, rendus une fois par version du document.
+
+Les agents (patient simulé, tuteur / évaluateur) ont tous besoin du cas mis en texte. Le rendu
+est fait une fois par (cas, type d'agent, version du document), gardé dans un LRU borné du
+processus et persisté dans CasePromptContext pour survivre aux redémarrages. Le signal
+case_document_changed invalide les entrées des cas modifiés (cf. simulation.signals).
+
+`for_document()` sert les appelants qui ont déjà le document : la version y figure, le contrôle
+de fraîcheur est gratuit. `get()` sert les autres : une entrée du LRU est réutilisée pendant
+SIMULATION_PROMPT_CACHE_TTL secondes, le temps que les autres processus voient une modification.
+"""
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+
+from django.conf import settings
+from django.db.models import F
+
+from cases.logic.snapshot import get_case_document
+from simulation.models import CasePromptContext
+from .prompts import build_patient_prompt, build_tutor_prompt
+
+RENDERERS = {
+    'patient': build_patient_prompt,
+    'tutor': build_tutor_prompt,
+}
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Estimation locale du nombre de tokens (mots et ponctuation, +30 % pour le découpage en
+    sous-mots du français). Suffisante pour budgéter les prompts sans appel au fournisseur.
+    """
+    return int(len(_TOKEN_RE.findall(text)) * 1.3)
+
+
+@dataclass(frozen=True)
+class PromptContext:
+    case_id: int
+    kind: str
+    version: int
+    text: str
+    token_count: int
+
+
+class PromptContextCache:
+
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, context):
+        max_entries = self.max_entries or settings.SIMULATION_PROMPT_CACHE_SIZE
+        with self._lock:
+            self._entries[(context.case_id, context.kind)] = (context, monotonic())
+            self._entries.move_to_end((context.case_id, context.kind))
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+        return context
+
+    @staticmethod
+    def _load(case_id, kind, version=None):
+        rows = CasePromptContext.objects.filter(case_id=case_id, kind=kind)
+        if version is None:
+            rows = rows.filter(snapshot_version=F('case__snapshot_version'))
+        else:
+            rows = rows.filter(snapshot_version=version)
+        row = rows.values_list('snapshot_version', 'text', 'token_count').first()
+        if row is None:
+            return None
+        return PromptContext(case_id, kind, *row)
+
+    @staticmethod
+    def _render(document, kind):
+        text = RENDERERS[kind](document)
+        context = PromptContext(document['id'], kind, document.get('version', 0), text, estimate_tokens(text))
+        CasePromptContext.objects.update_or_create(
+            case_id=context.case_id, kind=kind,
+            defaults={'snapshot_version': context.version, 'text': text, 'token_count': context.token_count},
+        )
+        return context
+
+    def cached(self, document, kind='patient'):
+        """Contexte déjà en mémoire pour la version du document, sans accès à la base (ou None)."""
+        entry = self._lookup((document['id'], kind))
+        if entry is not None and entry[0].version == document.get('version', 0):
+            return entry[0]
+        return None
+
+    def for_document(self, document, kind='patient'):
+        """Contexte du cas à la version du document fourni (rendu et persisté s'il n'existe pas encore)."""
+        cached = self.cached(document, kind)
+        if cached is not None:
+            return cached
+        context = self._load(document['id'], kind, document.get('version', 0)) or self._render(document, kind)
+        return self._store(context)
+
+    def get(self, case_id, kind='patient'):
+        """Contexte courant d'un cas, ou None si le cas n'existe pas."""
+        entry = self._lookup((case_id, kind))
+        ttl = self.ttl if self.ttl is not None else settings.SIMULATION_PROMPT_CACHE_TTL
+        if entry is not None and monotonic() - entry[1] < ttl:
+            return entry[0]
+        context = self._load(case_id, kind)
+        if context is None:
+            document = get_case_document(case_id)
+            if document is None:
+                return None
+            context = self._render(document, kind)
+        return self._store(context)
+
+    def invalidate(self, case_ids):
+        case_ids = set(case_ids)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in case_ids]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+prompt_contexts = PromptContextCache()
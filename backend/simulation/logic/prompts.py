@@ -0,0 +1,58 @@
+# backend/simulation/logic/prompts.py
+
+
+def build_patient_prompt(document):
+    """Prompt système du patient simulé, construit à partir du document complet du cas."""
+    lines = [
+        "Tu joues le rôle d'un patient qui consulte un étudiant en médecine.",
+        "Réponds uniquement à la question posée, en français courant, à la première personne,",
+        "sans jargon médical et sans jamais révéler ton diagnostic ni tes résultats d'examens",
+        "tant que l'étudiant ne les a pas demandés explicitement.",
+        "",
+        f"Identité : {document.get('age')} ans, {document.get('sexe', '')}, "
+        f"{document.get('etat_civil', '') or 'état civil non précisé'}, "
+        f"{document.get('profession', '') or 'profession non précisée'}, "
+        f"{document.get('nombre_enfant', 0)} enfant(s).",
+        f"Motif de consultation : {document.get('motif_consultation', '')}",
+    ]
+    if document.get('symptoms'):
+        lines.append("Symptômes :")
+        lines += [
+            f"- {s['nom']}" + (f" ({s['localisation']})" if s.get('localisation') else '')
+            + f", début : {s.get('date_debut', '')}, intensité {s.get('degre')}/10"
+            + (f", évolution : {s['evolution']}" if s.get('evolution') else '')
+            for s in document['symptoms']
+        ]
+    if document.get('history'):
+        lines.append("Antécédents :")
+        lines += [f"- {h.get('type_display', h['type'])} : {h['description']}" for h in document['history']]
+    if document.get('current_treatments'):
+        lines.append("Traitements en cours :")
+        lines += [f"- {t['nom']} {t.get('posologie', '')}".rstrip() for t in document['current_treatments']]
+    if document.get('mode_de_vie'):
+        lines.append(f"Mode de vie : {document['mode_de_vie']}")
+    if document.get('physical_findings') or document.get('exams'):
+        lines.append("Résultats (à ne donner que s'ils sont demandés) :")
+        lines += [f"- {p['nom_examen']} : {p['resultat_observation']}" for p in document.get('physical_findings', [])]
+        lines += [f"- {e['nom']} : {e['resultat']}" for e in document.get('exams', [])]
+    return '\n'.join(lines)
+
+
+def build_tutor_prompt(document):
+    """Contexte du tuteur / évaluateur : le cas complet, diagnostic et objectifs pédagogiques compris."""
+    lines = [
+        "Tu es un tuteur en médecine. Voici le cas clinique complet sur lequel travaille l'étudiant.",
+        f"Titre : {document.get('case_title', '')}",
+        f"Catégories : {', '.join(c['name'] for c in document.get('categories', [])) or 'aucune'}",
+        f"Résumé : {document.get('case_summary', '')}",
+        f"Objectifs pédagogiques : {document.get('learning_objectives', '')}",
+        "",
+        build_patient_prompt(document).split('\n\n', 1)[-1],
+    ]
+    if document.get('diagnoses'):
+        lines.append("Diagnostics attendus :")
+        lines += [
+            f"- {d['description']}" + (" (final)" if d.get('is_final') else '')
+            for d in document['diagnoses']
+        ]
+    return '\n'.join(lines)
@@ -0,0 +1,298 @@
+# backend/simulation/logic/vector_index.py
+"""
+Index vectoriel des passages de cas approuvés, pour la RAG du simulateur.
+
+Stockage : un répertoire contenant des fichiers .npy ouverts en memmap (les vecteurs ne sont
+pas chargés en mémoire, le système les pagine à la demande) et un petit state.json.
+- vectors.npy   float32 (capacité, dim)
+- case_ids.npy  int64   identifiant du cas de chaque ligne
+- sections.npy  int16   (section << 8) | partie
+- alive.npy     bool    faux pour les lignes remplacées ou supprimées
+- lists.npy     int32   liste IVF (centroïde le plus proche) de chaque ligne, -1 sans IVF
+- centroids.npy float32 centroïdes IVF (mode "ivf")
+
+Recherche : exacte (produit matriciel sur toutes les lignes, les lignes mortes étant écartées
+ensuite) ou approchée IVF (seules les lignes des `nprobe` listes les plus proches de la requête
+sont comparées).
+Mises à jour incrémentales : les lignes d'un cas modifié sont marquées mortes et ses
+nouveaux passages ajoutés en fin de fichier ; `compact()` récupère la place perdue.
+
+Plusieurs processus (workers `run_jobs --processes N`, serveurs) partagent le répertoire :
+chaque écriture prend un verrou de fichier exclusif (index.lock) et relit l'état sur disque
+avant de modifier quoi que ce soit ; les relectures prennent le même verrou en mode partagé.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+try:
+    import fcntl
+except ImportError:  # Windows : seul le verrou entre threads s'applique
+    fcntl = None
+
+import numpy as np
+
+from .chunking import SECTIONS, case_chunks
+
+_STATE_FILE = 'state.json'
+_LOCK_FILE = 'index.lock'
+_ARRAYS = {
+    'vectors': np.float32,
+    'case_ids': np.int64,
+    'sections': np.int16,
+    'alive': np.bool_,
+    'lists': np.int32,
+}
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    case_id: int
+    section: str
+    part: int
+    score: float
+
+
+class CaseVectorIndex:
+
+    def __init__(self, directory, embedder, mode='exact', nprobe=8):
+        self.directory = str(directory)
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.mode = mode
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._state_mtime = None
+        self.count = 0
+        self.centroids = None
+        self._arrays = {}
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, self._file_lock(exclusive=True):
+            self._load()
+
+    # --- Persistance ---------------------------------------------------------------------
+
+    def _path(self, name):
+        return os.path.join(self.directory, f'{name}.npy')
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        """Verrou entre processus sur le répertoire de l'index (exclusif pour écrire, partagé pour relire)."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, _LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _writing(self):
+        """Section d'écriture : verrous pris, état relu sur disque (un autre processus a pu écrire), puis sauvé."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._load()
+            yield
+            self._save_state()
+
+    def _load(self):
+        state_path = os.path.join(self.directory, _STATE_FILE)
+        if not os.path.exists(state_path):
+            self._allocate(1024)
+            self._save_state()
+            return
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state['dim'] != self.dim:
+            raise ValueError(f"Index construit en dimension {state['dim']}, embedder en dimension {self.dim}.")
+        self.count = state['count']
+        self._arrays = {name: np.load(self._path(name), mmap_mode='r+') for name in _ARRAYS}
+        self.centroids = np.load(self._path('centroids')) if state.get('nlist') else None
+        self._state_mtime = os.path.getmtime(state_path)
+
+    def _allocate(self, capacity):
+        """(Ré)alloue les fichiers avec la capacité donnée en conservant les `count` premières lignes."""
+        new_arrays = {}
+        for name, dtype in _ARRAYS.items():
+            shape = (capacity, self.dim) if name == 'vectors' else (capacity,)
+            tmp_path = self._path(name) + '.tmp'
+            array = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=shape)
+            if name == 'lists':
+                array[:] = -1
+            if name in self._arrays and self.count:
+                array[:self.count] = self._arrays[name][:self.count]
+            new_arrays[name] = array
+        for name, array in new_arrays.items():
+            array.flush()
+            os.replace(self._path(name) + '.tmp', self._path(name))
+        self._arrays = {name: np.load(self._path(name), mmap_mode='r+') for name in _ARRAYS}
+
+    def _save_state(self):
+        for array in self._arrays.values():
+            array.flush()
+        if self.centroids is not None:
+            np.save(self._path('centroids'), self.centroids)
+        state = {
+            'dim': self.dim,
+            'count': self.count,
+            'nlist': 0 if self.centroids is None else len(self.centroids),
+        }
+        state_path = os.path.join(self.directory, _STATE_FILE)
+        with open(state_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(state_path + '.tmp', state_path)
+        self._state_mtime = os.path.getmtime(state_path)
+
+    def reload_if_changed(self):
+        """Relit l'index si un autre processus (worker) l'a modifié sur disque."""
+        state_path = os.path.join(self.directory, _STATE_FILE)
+        try:
+            mtime = os.path.getmtime(state_path)
+        except OSError:
+            return
+        if mtime != self._state_mtime:
+            with self._lock, self._file_lock(exclusive=False):
+                self._load()
+
+    # --- Écriture ------------------------------------------------------------------------
+
+    @property
+    def capacity(self):
+        return len(self._arrays['case_ids'])
+
+    @property
+    def live_count(self):
+        return int(self._arrays['alive'][:self.count].sum())
+
+    def upsert_cases(self, documents):
+        """Remplace les passages des cas donnés (documents issus de cases.logic.snapshot)."""
+        rows = [(document['id'], section, part, text)
+                for document in documents for section, part, text in case_chunks(document)]
+        with self._writing():
+            self._discard(list(document['id'] for document in documents))
+            if rows:
+                self._append(rows)
+
+    def remove_cases(self, case_ids):
+        with self._writing():
+            self._discard(case_ids)
+
+    def _discard(self, case_ids):
+        if not case_ids or not self.count:
+            return
+        dead = np.isin(self._arrays['case_ids'][:self.count], np.asarray(list(case_ids), dtype=np.int64))
+        self._arrays['alive'][:self.count][dead] = False
+
+    def _append(self, rows):
+        needed = self.count + len(rows)
+        if needed > self.capacity:
+            self._allocate(max(needed, self.capacity * 2))
+        vectors = self.embedder.embed([text for _, _, _, text in rows])
+        start, end = self.count, needed
+        self._arrays['vectors'][start:end] = vectors
+        self._arrays['case_ids'][start:end] = [case_id for case_id, _, _, _ in rows]
+        self._arrays['sections'][start:end] = [(SECTIONS.index(section) << 8) | part for _, section, part, _ in rows]
+        self._arrays['alive'][start:end] = True
+        self._arrays['lists'][start:end] = self._assign(vectors) if self.centroids is not None else -1
+        self.count = needed
+
+    def compact(self):
+        """Réécrit l'index sans les lignes mortes."""
+        with self._writing():
+            alive = np.flatnonzero(self._arrays['alive'][:self.count])
+            kept = {name: np.array(self._arrays[name][alive]) for name in _ARRAYS}
+            self.count = 0
+            self._allocate(max(1024, len(alive) * 2))
+            for name, values in kept.items():
+                self._arrays[name][:len(alive)] = values
+            self.count = len(alive)
+
+    # --- IVF -----------------------------------------------------------------------------
+
+    def train_ivf(self, nlist=None, iterations=10, seed=0):
+        """Calcule les centroïdes (k-means sphérique) et assigne chaque ligne vivante à sa liste."""
+        with self._writing():
+            alive = np.flatnonzero(self._arrays['alive'][:self.count])
+            if not len(alive):
+                return
+            nlist = nlist or max(1, int(np.sqrt(len(alive))))
+            rng = np.random.default_rng(seed)
+            sample = alive if len(alive) <= nlist * 256 else rng.choice(alive, nlist * 256, replace=False)
+            data = np.asarray(self._arrays['vectors'][np.sort(sample)])
+            centroids = data[rng.choice(len(data), min(nlist, len(data)), replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(data @ centroids.T, axis=1)
+                for k in range(len(centroids)):
+                    members = data[assignment == k]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        centroids[k] = centroid / (np.linalg.norm(centroid) or 1.0)
+            self.centroids = centroids.astype(np.float32)
+            for start in range(0, self.count, 65536):
+                end = min(self.count, start + 65536)
+                self._arrays['lists'][start:end] = self._assign(np.asarray(self._arrays['vectors'][start:end]))
+
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    # --- Recherche -----------------------------------------------------------------------
+
+    def search(self, query, k=5, case_id=None, mode=None):
+        """Renvoie les `k` passages les plus proches de `query`, éventuellement restreints à un cas."""
+        mode = mode or self.mode
+        query_vector = self.embedder.embed_one(query)
+        with self._lock:
+            count = self.count
+            if not count:
+                return []
+            mask = np.array(self._arrays['alive'][:count])
+            if case_id is not None:
+                mask &= self._arrays['case_ids'][:count] == case_id
+            elif mode == 'ivf' and self.centroids is not None:
+                probes = np.argsort(self.centroids @ query_vector)[::-1][:self.nprobe]
+                mask &= np.isin(self._arrays['lists'][:count], probes)
+            candidates = np.flatnonzero(mask)
+            top = min(k, len(candidates))
+            if not top:
+                return []
+            if len(candidates) * 4 >= count:
+                # Produit sur la tranche contiguë du memmap, sans copie par indexation ; les lignes
+                # mortes ou hors des listes sondées sont écartées après coup
+                scores = self._arrays['vectors'][:count] @ query_vector
+                scores[~mask] = -np.inf
+            else:
+                # Peu de candidats (un seul cas, listes IVF sondées) : seules leurs lignes sont lues
+                scores = np.full(count, -np.inf, dtype=np.float32)
+                scores[candidates] = self._arrays['vectors'][candidates] @ query_vector
+            rows = np.argpartition(-scores, top - 1)[:top]
+            rows = rows[np.argsort(-scores[rows])]
+            sections = self._arrays['sections'][rows]
+            case_ids = self._arrays['case_ids'][rows]
+        return [
+            SearchHit(int(cid), SECTIONS[int(code) >> 8], int(code) & 0xFF, float(score))
+            for cid, code, score in zip(case_ids, sections, scores[rows])
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_case_index():
+    """Index partagé du processus, configuré par SIMULATION_INDEX_DIR / SIMULATION_INDEX_MODE."""
+    global _index
+    from django.conf import settings
+
+    from .embeddings import get_embedder
+
+    with _index_lock:
+        if _index is None:
+            _index = CaseVectorIndex(settings.SIMULATION_INDEX_DIR, get_embedder(),
+                                     mode=settings.SIMULATION_INDEX_MODE, nprobe=settings.SIMULATION_INDEX_NPROBE)
+        else:
+            _index.reload_if_changed()
+        return _index
+
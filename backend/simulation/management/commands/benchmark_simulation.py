@@ -0,0 +1,239 @@
+# backend/simulation/management/commands/benchmark_simulation.py
+import asyncio
+import json
+import os
+import random
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.benchmarks.asgi import asgi_request
+from api.benchmarks.corpus import seed_corpus
+from api.benchmarks.environment import isolated_databases
+from core.stats import latency_summary
+from simulation.logic.answer_cache import answer_cache
+from simulation.logic.conversation import session_logs
+from users.serializers import MyTokenObtainPairSerializer
+
+# Script des apprenants simulés : questions fermées (réponses factuelles), questions ouvertes
+# fréquentes (partagées entre apprenants, donc éligibles au cache) et questions propres à chacun.
+CLOSED_QUESTIONS = [
+    "Depuis quand avez-vous mal ?", "Où avez-vous mal ?", "Avez-vous des antécédents médicaux ?",
+    "Prenez-vous des médicaments ?", "Vous fumez ?", "Avez-vous des allergies ?", "Quel âge avez-vous ?",
+]
+OPEN_QUESTIONS = [
+    "Qu'est-ce qui vous amène aujourd'hui ?", "Pouvez-vous me décrire ce que vous ressentez ?",
+    "Comment cela a-t-il commencé ?", "Qu'est-ce qui vous inquiète le plus ?",
+    "Avez-vous remarqué autre chose d'inhabituel ?",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge du simulateur : des milliers d'apprenants scriptés mènent des consultations "
+        "simultanées contre core.asgi (LLM local à latence et débit configurables), par paliers de "
+        "sessions concurrentes. Rapporte la latence des tours (p95), le retard de la boucle d'événements, "
+        "la mémoire par session et le nombre de sessions tenues par nœud sous les objectifs fixés."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=str, default='50,200,500',
+                            help='Paliers de sessions simultanées, séparés par des virgules. Par défaut : 50,200,500.')
+        parser.add_argument('--turns', type=int, default=6, help='Questions par session. Par défaut : 6.')
+        parser.add_argument('--think-time', type=float, default=1.0,
+                            help="Temps de réflexion moyen (s) entre deux questions. Par défaut : 1.")
+        parser.add_argument('--ramp', type=float, default=2.0,
+                            help="Durée (s) sur laquelle les sessions d'un palier démarrent. Par défaut : 2.")
+        parser.add_argument('--first-token-latency', type=float, default=0.3,
+                            help='Latence (s) du premier token du LLM local. Par défaut : 0.3.')
+        parser.add_argument('--tokens-per-second', type=float, default=40.0,
+                            help='Débit du LLM local (tokens/s). Par défaut : 40.')
+        parser.add_argument('--open-ratio', type=float, default=0.5,
+                            help="Part des questions ouvertes (envoyées au LLM ou au cache). Par défaut : 0.5.")
+        parser.add_argument('--no-answer-cache', action='store_true',
+                            help='Désactive le cache de réponses partagé entre apprenants.')
+        parser.add_argument('--cases', type=int, default=20, help='Nombre de cas approuvés générés. Par défaut : 20.')
+        parser.add_argument('--accounts', type=int, default=10,
+                            help='Comptes apprenants réels, partagés par les apprenants simulés. Par défaut : 10.')
+        parser.add_argument('--slo-p95-ms', type=float, default=3000,
+                            help='Objectif de latence p95 d\'un tour complet (ms). Par défaut : 3000.')
+        parser.add_argument('--slo-lag-ms', type=float, default=50,
+                            help="Objectif de retard p95 de la boucle d'événements (ms). Par défaut : 50.")
+        parser.add_argument('--min-sessions', type=int, default=0,
+                            help="Échoue si moins de sessions simultanées sont tenues sous les objectifs.")
+        parser.add_argument('--tracemalloc', action='store_true',
+                            help="Mesure la mémoire par session avec tracemalloc (précis, mais les latences sont "
+                                 "alors fortement dégradées). Par défaut : mémoire résidente du processus.")
+        parser.add_argument('--seed', type=int, default=42, help='Graine des corpus et des scripts. Par défaut : 42.')
+        parser.add_argument('--output-path', type=str, default='./benchmark_results',
+                            help='Répertoire où sauvegarder les résultats JSON.')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['sessions'].split(',') if level.strip()]
+        except ValueError:
+            raise CommandError("--sessions attend des entiers séparés par des virgules, ex: 100,500,1000.")
+        started_at = datetime.now()
+
+        settings.SIMULATION_LLM_BACKEND = 'stub'
+        settings.SIMULATION_STUB_FIRST_TOKEN_LATENCY = options['first_token_latency']
+        settings.SIMULATION_STUB_TOKENS_PER_SECOND = options['tokens_per_second']
+        settings.SIMULATION_INDEX_AUTO_UPDATE = False
+        if options['no_answer_cache']:
+            settings.SIMULATION_ANSWER_CACHE_TTL = 0
+
+        from core.asgi import application
+
+        with isolated_databases(on_disk=True):
+            self.stdout.write(f"Génération de {options['cases']} cas et {options['accounts']} comptes...")
+            self.case_ids, usernames = seed_corpus(options['cases'], n_learners=options['accounts'],
+                                                   seed=options['seed'])
+            self.tokens = [
+                str(MyTokenObtainPairSerializer.get_token(user).access_token)
+                for user in User.objects.filter(username__in=usernames).select_related('profile')
+            ]
+
+            stages = []
+            for level in levels:
+                # Paliers indépendants : caches vidés, même graine
+                answer_cache.clear()
+                session_logs.flush_all()
+                self.stdout.write(f"Palier : {level} sessions simultanées...")
+                stage = asyncio.run(self._run_stage(application, level, options))
+                stages.append(stage)
+                self.stdout.write(f"  {json.dumps(stage)}")
+
+        passing = [
+            stage['sessions'] for stage in stages
+            if stage['errors'] == 0 and stage['turn_latency'].get('p95_ms', float('inf')) <= options['slo_p95_ms']
+            and stage['loop_lag'].get('p95_ms', float('inf')) <= options['slo_lag_ms']
+        ]
+        results = {
+            'started_at': started_at.isoformat(),
+            'vendor': connection.vendor,
+            'parameters': {key: options[key] for key in (
+                'sessions', 'turns', 'think_time', 'ramp', 'first_token_latency', 'tokens_per_second',
+                'open_ratio', 'no_answer_cache', 'cases', 'slo_p95_ms', 'slo_lag_ms', 'seed',
+            )},
+            'stages': stages,
+            'sessions_per_node': max(passing, default=0),
+        }
+        os.makedirs(options['output_path'], exist_ok=True)
+        full_path = os.path.join(options['output_path'],
+                                 f"simulation_benchmark_{started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(full_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+        self.stdout.write(f"Résultats sauvegardés dans : {full_path}")
+
+        self.stdout.write(f"Sessions simultanées tenues sous les objectifs : {results['sessions_per_node']}")
+        if results['sessions_per_node'] < options['min_sessions']:
+            raise CommandError(
+                f"{results['sessions_per_node']} sessions simultanées tenues, {options['min_sessions']} attendues."
+            )
+
+    # --- Palier de charge ----------------------------------------------------------------
+
+    async def _run_stage(self, application, level, options):
+        rng = random.Random(f"{options['seed']}:{level}")
+        scripts = [self._script(rng, options) for _ in range(level)]
+        turn_latencies, first_token_latencies, lags, sources = [], [], [], {}
+        errors, active, peak = 0, 0, {'active': 0, 'memory': 0}
+        done = asyncio.Event()
+
+        use_tracemalloc = options['tracemalloc']
+        if use_tracemalloc:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+        else:
+            baseline = _rss_bytes()
+
+        async def monitor(interval=0.01):
+            # Retard de la boucle : écart entre le réveil demandé et le réveil effectif
+            while not done.is_set():
+                start = perf_counter()
+                await asyncio.sleep(interval)
+                lags.append(max(0.0, perf_counter() - start - interval))
+                if active >= peak['active']:
+                    memory = (tracemalloc.get_traced_memory()[0] if use_tracemalloc else _rss_bytes()) - baseline
+                    peak.update(active=active, memory=max(memory, 0))
+
+        async def learner(index, script):
+            nonlocal errors, active
+            await asyncio.sleep(options['ramp'] * index / level)
+            headers = {'Authorization': f"Bearer {self.tokens[index % len(self.tokens)]}"}
+            response = await asgi_request(application, 'POST', '/api/simulation/sessions/', headers,
+                                          {'case': script['case_id']})
+            if response.status != 201:
+                errors += 1
+                return
+            session_id = response.json()['id']
+            active += 1
+            try:
+                for question, think_time in script['turns']:
+                    await asyncio.sleep(think_time)
+                    try:
+                        response = await asgi_request(application, 'POST',
+                                                      f'/api/simulation/sessions/{session_id}/ask/',
+                                                      headers, {'question': question})
+                    except Exception:
+                        errors += 1
+                        continue
+                    events = response.events() if response.status == 200 else []
+                    if not events or events[-1][0] != 'done':
+                        errors += 1
+                        continue
+                    turn_latencies.append(response.finished_at - response.started_at)
+                    first_token_latencies.append(response.first_chunk_at - response.started_at)
+                    source = events[-1][1].get('source')
+                    sources[source] = sources.get(source, 0) + 1
+            finally:
+                active -= 1
+            response = await asgi_request(application, 'POST', f'/api/simulation/sessions/{session_id}/end/', headers)
+            errors += response.status != 200
+
+        monitor_task = asyncio.create_task(monitor())
+        start = perf_counter()
+        await asyncio.gather(*(learner(index, script) for index, script in enumerate(scripts)))
+        elapsed = perf_counter() - start
+        done.set()
+        await monitor_task
+        if use_tracemalloc:
+            tracemalloc.stop()
+
+        turns = len(turn_latencies)
+        return {
+            'sessions': level,
+            'peak_active_sessions': peak['active'],
+            'errors': errors,
+            'turns': turns,
+            'turns_per_second': round(turns / elapsed, 1),
+            'answer_sources': sources,
+            'turn_latency': latency_summary(turn_latencies),
+            'first_token_latency': latency_summary(first_token_latencies),
+            'loop_lag': latency_summary(lags),
+            'memory_per_session_kb': round(peak['memory'] / peak['active'] / 1024, 1) if peak['active'] else None,
+            'memory_method': 'tracemalloc' if use_tracemalloc else 'rss',
+            'elapsed_s': round(elapsed, 2),
+        }
+
+    def _script(self, rng, options):
+        turns = []
+        for _ in range(options['turns']):
+            question = rng.choice(OPEN_QUESTIONS if rng.random() < options['open_ratio'] else CLOSED_QUESTIONS)
+            turns.append((question, rng.expovariate(1 / options['think_time']) if options['think_time'] else 0))
+        return {'case_id': rng.choice(self.case_ids), 'turns': turns}
+
+
+def _rss_bytes():
+    """Mémoire résidente courante du processus (Linux), à défaut le maximum atteint."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -0,0 +1,47 @@
+# backend/simulation/management/commands/build_case_index.py
+import shutil
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cases.models import ClinicalCase
+from simulation.logic.indexing import reindex_cases
+from simulation.logic.vector_index import get_case_index
+
+
+class Command(BaseCommand):
+    help = "Construit ou met à jour l'index vectoriel des cas approuvés utilisé par la RAG du simulateur."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help="Supprime l'index existant avant de le reconstruire.")
+        parser.add_argument('--ivf', action='store_true',
+                            help="Entraîne les listes IVF pour la recherche approchée.")
+        parser.add_argument('--nlist', type=int,
+                            help="Nombre de listes IVF. Par défaut : racine carrée du nombre de passages.")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Nombre de cas indexés par lot. Par défaut : 500.')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            shutil.rmtree(settings.SIMULATION_INDEX_DIR, ignore_errors=True)
+
+        start = perf_counter()
+        case_ids = list(
+            ClinicalCase.objects.filter(status=ClinicalCase.Status.APPROUVE).order_by('pk').values_list('pk', flat=True)
+        )
+        batch_size = options['batch_size']
+        for offset in range(0, len(case_ids), batch_size):
+            reindex_cases(case_ids[offset:offset + batch_size])
+            self.stdout.write(f"  {min(offset + batch_size, len(case_ids))}/{len(case_ids)} cas indexés")
+
+        index = get_case_index()
+        if options['ivf']:
+            index.train_ivf(nlist=options['nlist'])
+            self.stdout.write(f"Listes IVF entraînées ({len(index.centroids)} centroïdes).")
+        index.compact()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Index prêt : {index.live_count} passages pour {len(case_ids)} cas en {perf_counter() - start:.1f} s."
+        ))
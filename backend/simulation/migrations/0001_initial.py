@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cases', '0005_clinicalcase_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimulationSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('active', 'En cours'), ('completed', 'Terminée')], default='active', max_length=20)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('turn_count', models.PositiveIntegerField(default=0)),
+                ('llm_turns', models.PositiveIntegerField(default=0)),
+                ('ttft_total_ms', models.FloatField(default=0)),
+                ('ttft_max_ms', models.FloatField(default=0)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='simulation_sessions', to='cases.clinicalcase')),
+                ('learner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='simulation_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['learner', '-started_at'], name='session_learner_idx')],
+            },
+        ),
+    ]
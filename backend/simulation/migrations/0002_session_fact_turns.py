@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulationsession',
+            name='fact_total_ms',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='simulationsession',
+            name='fact_turns',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='simulationsession',
+            name='llm_total_ms',
+            field=models.FloatField(default=0, help_text='Durée cumulée des réponses générées par le LLM'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulation', '0002_session_fact_turns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulationsession',
+            name='logged_turns',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Nombre de messages écrits dans le journal'),
+        ),
+        migrations.AddField(
+            model_name='simulationsession',
+            name='summary',
+            field=models.TextField(blank=True, editable=False, help_text='Résumé des échanges sortis de la fenêtre de contexte'),
+        ),
+        migrations.AddField(
+            model_name='simulationsession',
+            name='summary_turns',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Nombre de messages couverts par le résumé'),
+        ),
+        migrations.CreateModel(
+            name='SessionLogChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_turn', models.PositiveIntegerField(help_text='Rang (à partir de 0) du premier message du bloc')),
+                ('turns', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_chunks', to='simulation.simulationsession')),
+            ],
+            options={
+                'ordering': ['session', 'first_turn'],
+                'constraints': [models.UniqueConstraint(fields=('session', 'first_turn'), name='session_log_chunk_unique')],
+            },
+        ),
+    ]
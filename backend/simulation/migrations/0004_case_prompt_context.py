@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0005_clinicalcase_snapshot'),
+        ('simulation', '0003_session_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CasePromptContext',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('snapshot_version', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('token_count', models.PositiveIntegerField()),
+                ('rendered_at', models.DateTimeField(auto_now=True)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prompt_contexts', to='cases.clinicalcase')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('case', 'kind'), name='prompt_context_unique')],
+            },
+        ),
+    ]
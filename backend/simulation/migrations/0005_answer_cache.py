@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0005_clinicalcase_snapshot'),
+        ('simulation', '0004_case_prompt_context'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseAnswerCacheStats',
+            fields=[
+                ('case', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='answer_cache_stats', serialize=False, to='cases.clinicalcase')),
+                ('exact_hits', models.PositiveIntegerField(default=0)),
+                ('semantic_hits', models.PositiveIntegerField(default=0)),
+                ('misses', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Case answer cache stats',
+            },
+        ),
+        migrations.AddField(
+            model_name='simulationsession',
+            name='cache_total_ms',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='simulationsession',
+            name='cache_turns',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
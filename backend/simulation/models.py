@@ -1,3 +1,135 @@
+# backend/simulation/models.py
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+from cases.models import ClinicalCase
+
+
+class SimulationSession(models.Model):
+    """Une consultation simulée : un apprenant interroge le patient virtuel d'un cas approuvé."""
+
+    class Status(models.TextChoices):
+        ACTIVE = 'active', 'En cours'
+        COMPLETED = 'completed', 'Terminée'
+
+    learner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                related_name='simulation_sessions')
+    case = models.ForeignKey(ClinicalCase, on_delete=models.CASCADE, related_name='simulation_sessions')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
+    started_at = models.DateTimeField(auto_now_add=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    # Mesures de réactivité du patient simulé (temps jusqu'au premier token, en ms)
+    turn_count = models.PositiveIntegerField(default=0)
+    llm_turns = models.PositiveIntegerField(default=0)
+    ttft_total_ms = models.FloatField(default=0)
+    ttft_max_ms = models.FloatField(default=0)
+    llm_total_ms = models.FloatField(default=0, help_text="Durée cumulée des réponses générées par le LLM")
+    # Réponses tirées directement des données du cas, sans appel au LLM (cf. logic.facts)
+    fact_turns = models.PositiveIntegerField(default=0)
+    fact_total_ms = models.FloatField(default=0)
+    # Réponses servies par le cache partagé entre apprenants (cf. logic.answer_cache)
+    cache_turns = models.PositiveIntegerField(default=0)
+    cache_total_ms = models.FloatField(default=0)
+
+    # Journal de la conversation (cf. logic.conversation) : les tours anciens sont résumés ici
+    logged_turns = models.PositiveIntegerField(default=0, editable=False,
+                                               help_text="Nombre de messages écrits dans le journal")
+    summary = models.TextField(blank=True, editable=False,
+                               help_text="Résumé des échanges sortis de la fenêtre de contexte")
+    summary_turns = models.PositiveIntegerField(default=0, editable=False,
+                                                help_text="Nombre de messages couverts par le résumé")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['learner', '-started_at'], name='session_learner_idx'),
+        ]
+
+    def __str__(self):
+        return f"Session #{self.id} ({self.learner} / Cas #{self.case_id}) - {self.get_status_display()}"
+
+    @property
+    def ttft_avg_ms(self):
+        return self.ttft_total_ms / self.llm_turns if self.llm_turns else None
+
+    @property
+    def fact_share(self):
+        """Part des questions auxquelles le patient a répondu sans appel au LLM."""
+        return self.fact_turns / self.turn_count if self.turn_count else None
+
+    @property
+    def cache_share(self):
+        """Part des questions servies par le cache de réponses."""
+        return self.cache_turns / self.turn_count if self.turn_count else None
+
+    @property
+    def estimated_ms_saved(self):
+        """
+        Latence évitée : pour chaque réponse factuelle ou servie par le cache, la durée moyenne
+        d'une réponse LLM de la session, moins la durée effective de la réponse.
+        """
+        avoided = self.fact_turns + self.cache_turns
+        if not avoided or not self.llm_turns:
+            return None
+        return avoided * self.llm_total_ms / self.llm_turns - self.fact_total_ms - self.cache_total_ms
+
+
+class SessionLogChunk(models.Model):
+    """
+    Bloc du journal d'une session, en ajout seul : plusieurs messages consécutifs par ligne.
+    `turns` est une liste compacte de [rôle, texte, source] ; rôle 'u' (apprenant) ou 'p' (patient).
+    """
+    session = models.ForeignKey(SimulationSession, on_delete=models.CASCADE, related_name='log_chunks')
+    first_turn = models.PositiveIntegerField(help_text="Rang (à partir de 0) du premier message du bloc")
+    turns = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['session', 'first_turn']
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'first_turn'], name='session_log_chunk_unique'),
+        ]
+
+    def __str__(self):
+        return f"Session #{self.session_id} - messages {self.first_turn} à {self.first_turn + len(self.turns) - 1}"
+
+
+class CasePromptContext(models.Model):
+    """Contexte textuel d'un cas rendu pour un agent (patient, tuteur), pour une version du document."""
+
+    case = models.ForeignKey(ClinicalCase, on_delete=models.CASCADE, related_name='prompt_contexts')
+    kind = models.CharField(max_length=20)
+    snapshot_version = models.PositiveIntegerField()
+    text = models.TextField()
+    token_count = models.PositiveIntegerField()
+    rendered_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['case', 'kind'], name='prompt_context_unique'),
+        ]
+
+    def __str__(self):
+        return f"Contexte {self.kind} du cas #{self.case_id} (v{self.snapshot_version})"
+
+
+class CaseAnswerCacheStats(models.Model):
+    """Statistiques cumulées du cache de réponses du patient simulé, par cas."""
+
+    case = models.OneToOneField(ClinicalCase, on_delete=models.CASCADE, primary_key=True,
+                                related_name='answer_cache_stats')
+    exact_hits = models.PositiveIntegerField(default=0)
+    semantic_hits = models.PositiveIntegerField(default=0)
+    misses = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Case answer cache stats"
+
+    def __str__(self):
+        return f"Cache de réponses du cas #{self.case_id}"
+
+    @property
+    def hit_rate(self):
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return (self.exact_hits + self.semantic_hits) / lookups if lookups else None
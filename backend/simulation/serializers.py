@@ -0,0 +1,25 @@
+# backend/simulation/serializers.py
+from rest_framework import serializers
+
+from cases.models import ClinicalCase
+from .models import SimulationSession
+
+
+class SimulationSessionSerializer(serializers.ModelSerializer):
+    case = serializers.PrimaryKeyRelatedField(queryset=ClinicalCase.objects.filter(status=ClinicalCase.Status.APPROUVE))
+    ttft_avg_ms = serializers.FloatField(read_only=True)
+    fact_share = serializers.FloatField(read_only=True)
+    cache_share = serializers.FloatField(read_only=True)
+    estimated_ms_saved = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SimulationSession
+        fields = ['id', 'case', 'status', 'started_at', 'ended_at', 'turn_count', 'llm_turns',
+                  'ttft_avg_ms', 'ttft_max_ms', 'fact_turns', 'fact_share', 'cache_turns', 'cache_share',
+                  'estimated_ms_saved']
+        read_only_fields = ['status', 'started_at', 'ended_at', 'turn_count', 'llm_turns', 'ttft_max_ms',
+                            'fact_turns', 'cache_turns']
+
+
+class QuestionSerializer(serializers.Serializer):
+    question = serializers.CharField(max_length=1000, trim_whitespace=True)
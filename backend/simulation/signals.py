@@ -0,0 +1,36 @@
+# backend/simulation/signals.py
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from cases.signals import case_document_changed
+
+# Envoyé quand un apprenant termine une session (arguments : session_id, learner_id, case_id).
+session_completed = Signal()
+
+
+@receiver(case_document_changed)
+def invalidate_prompt_contexts(sender, case_ids, **kwargs):
+    from .logic.prompt_context import prompt_contexts
+    from .models import CasePromptContext
+
+    prompt_contexts.invalidate(case_ids)
+    CasePromptContext.objects.filter(case_id__in=case_ids).delete()
+
+
+@receiver(case_document_changed)
+def invalidate_cached_answers(sender, case_ids, **kwargs):
+    from .logic.answer_cache import answer_cache
+
+    answer_cache.invalidate(case_ids)
+
+
+@receiver(case_document_changed)
+def reindex_changed_cases(sender, case_ids, **kwargs):
+    # L'embedding des passages est délégué à un worker, une fois la transaction validée
+    if not settings.SIMULATION_INDEX_AUTO_UPDATE:
+        return
+    from jobs.queue import enqueue
+
+    case_ids = list(case_ids)
+    transaction.on_commit(lambda: enqueue('simulation.reindex_cases', {'case_ids': case_ids}, priority=-1))
@@ -0,0 +1,12 @@
+# backend/simulation/urls.py
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+
+from .views import SimulationSessionViewSet, ask_patient
+
+router = DefaultRouter()
+router.register(r'sessions', SimulationSessionViewSet, basename='simulation-session')
+
+urlpatterns = [
+    path('sessions/<int:pk>/ask/', ask_patient, name='simulation-ask'),
+] + router.urls
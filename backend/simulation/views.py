@@ -1,3 +1,120 @@
-from django.shortcuts import render
+# backend/simulation/views.py
+import json
+from time import perf_counter
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import mixins, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from cases.logic.snapshot import get_case_document
+from core.db_routers import use_replica
+from core.metrics import SerializerTimingMixin
+from users.authentication import StatelessJWTAuthentication
+from .logic.conversation import read_transcript, session_logs
+from .logic.dialogue import stream_patient_answer
+from .models import SimulationSession
+from .signals import session_completed
+from .serializers import QuestionSerializer, SimulationSessionSerializer
+
+
+class SimulationSessionViewSet(SerializerTimingMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Sessions de simulation de l'utilisateur connecté.
+    Les questions au patient passent par /ask/ (streaming SSE, cf. ask_patient).
+    """
+    serializer_class = SimulationSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return SimulationSession.objects.filter(learner_id=self.request.user.pk).order_by('-started_at')
+
+    def perform_create(self, serializer):
+        serializer.save(learner_id=self.request.user.pk)
+
+    @action(detail=True, methods=['post'])
+    def end(self, request, pk=None):
+        session = self.get_object()
+        if session.status == SimulationSession.Status.ACTIVE:
+            session.status = SimulationSession.Status.COMPLETED
+            session.ended_at = timezone.now()
+            session.save(update_fields=['status', 'ended_at'])
+            session_completed.send(sender=SimulationSession, session_id=session.pk,
+                                   learner_id=session.learner_id, case_id=session.case_id)
+        session_logs.close(session.pk)
+        session.refresh_from_db()
+        return Response(self.get_serializer(session).data)
+
+    @action(detail=True, methods=['get'])
+    def transcript(self, request, pk=None):
+        session = self.get_object()
+        return Response([
+            {'role': 'apprenant' if turn.role == turn.USER else 'patient', 'text': turn.text, 'source': turn.source}
+            for turn in read_transcript(session.pk)
+        ])
+
+
+def _authenticate(request):
+    try:
+        result = StatelessJWTAuthentication().authenticate(request)
+    except APIException:
+        return None
+    return result[0] if result else None
+
+
+def _load_case_document(case_id):
+    with use_replica():
+        return get_case_document(case_id)
+
+
+async def _releasing(log, events):
+    # Le journal reste réservé tant que la réponse est diffusée (client déconnecté compris)
+    try:
+        async for event in events:
+            yield event
+    finally:
+        await sync_to_async(session_logs.release)(log)
+
+
+@csrf_exempt
+async def ask_patient(request, pk):
+    """
+    Pose une question au patient simulé et diffuse sa réponse token par token (text/event-stream).
+    Vue asynchrone : à servir via core.asgi pour ne pas bloquer un worker pendant la génération.
+    """
+    started_at = perf_counter()
+    if request.method != 'POST':
+        return JsonResponse({'detail': 'Méthode non autorisée.'}, status=405)
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': "Informations d'authentification invalides."}, status=401)
+
+    try:
+        params = QuestionSerializer(data=json.loads(request.body or b'{}'))
+    except ValueError:
+        return JsonResponse({'detail': 'JSON invalide.'}, status=400)
+    if not params.is_valid():
+        return JsonResponse(params.errors, status=400)
+
+    session = await SimulationSession.objects.filter(
+        pk=pk, learner_id=user.pk, status=SimulationSession.Status.ACTIVE,
+    ).only('id', 'case_id').afirst()
+    if session is None:
+        return JsonResponse({'detail': 'Session introuvable ou terminée.'}, status=404)
+
+    document = await sync_to_async(_load_case_document)(session.case_id)
+    log = await sync_to_async(session_logs.acquire)(session.pk)
+    response = StreamingHttpResponse(
+        _releasing(log, stream_patient_answer(session.pk, document, log, params.validated_data['question'],
+                                              started_at)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Désactive la mise en tampon des proxys (nginx) pour que chaque token parte immédiatement
+    response['X-Accel-Buffering'] = 'no'
+    return response
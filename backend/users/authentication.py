@@ -0,0 +1,99 @@
+# backend/users/authentication.py
+"""
+Authentification JWT sans accès à la base de données.
+
+Le jeton émis par MyTokenObtainPairSerializer contient déjà `user_id`, `username` et `role`.
+Sa signature suffit à lui faire confiance : on reconstruit un utilisateur léger à partir
+des claims au lieu de recharger la ligne User à chaque requête.
+Seule exception : les comptes désactivés après l'émission du jeton, filtrés par une
+liste de révocation gardée en mémoire et rafraîchie périodiquement.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from core.metrics import phase
+from .models import UserProfile
+
+
+class ClaimsUser(TokenUser):
+    """Utilisateur reconstruit à partir des claims signés du jeton (aucune ligne User chargée)."""
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @property
+    def is_expert(self):
+        return self.role == UserProfile.Role.EXPERT
+
+    @property
+    def is_learner(self):
+        return self.role == UserProfile.Role.APPRENANT
+
+
+class RevocationDenylist:
+    """
+    Ensemble des identifiants de comptes désactivés, propre au processus.
+    Rechargé depuis la base au plus une fois toutes les `refresh_seconds` secondes.
+    """
+
+    def __init__(self, refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self._user_ids = frozenset()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, user_id):
+        if self._is_stale():
+            self.refresh()
+        return user_id in self._user_ids
+
+    def _is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def refresh(self):
+        with self._lock:
+            # Un autre thread a peut-être rechargé la liste pendant qu'on attendait le verrou
+            if not self._is_stale():
+                return
+            inactive_ids = get_user_model().objects.filter(is_active=False).values_list('pk', flat=True)
+            self._user_ids = frozenset(inactive_ids)
+            self._loaded_at = time.monotonic()
+
+    def add(self, user_id):
+        """Révoque immédiatement un compte dans ce processus (les autres suivront au prochain rafraîchissement)."""
+        with self._lock:
+            self._user_ids = self._user_ids | {user_id}
+
+    def discard(self, user_id):
+        with self._lock:
+            self._user_ids = self._user_ids - {user_id}
+
+
+denylist = RevocationDenylist(refresh_seconds=settings.JWT_DENYLIST_REFRESH_SECONDS)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """Vérifie la signature du jeton et renvoie un ClaimsUser, sans requête SQL par appel."""
+
+    def authenticate(self, request):
+        with phase('auth'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if user.id in denylist:
+            raise AuthenticationFailed("Ce compte a été désactivé.", code='user_inactive')
+        return user
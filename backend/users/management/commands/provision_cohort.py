@@ -0,0 +1,154 @@
+# backend/users/management/commands/provision_cohort.py
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from users.models import UserProfile
+
+
+def _init_worker(settings_module):
+    # Nécessaire lorsque les processus sont lancés en mode "spawn" (macOS, Windows)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = (
+        "Crée une promotion d'apprenants à partir d'un fichier CSV "
+        "(colonnes : username, email, first_name, last_name, password ou password_hash, role)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', type=str, help='Chemin du fichier CSV de la promotion.')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Nombre de processus utilisés pour hacher les mots de passe. Par défaut : nombre de CPU.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Taille des lots pour les insertions groupées. Par défaut : 500.'
+        )
+        parser.add_argument(
+            '--role',
+            type=str,
+            choices=UserProfile.Role.values,
+            default=UserProfile.Role.APPRENANT,
+            help='Rôle attribué quand la colonne "role" est absente ou vide. Par défaut : APPRENANT.'
+        )
+
+    def handle(self, *args, **options):
+        rows = self._read_rows(options['csv_path'], options['role'])
+        self.stdout.write(f"{len(rows)} comptes lus dans {options['csv_path']}.")
+
+        existing = set(
+            User.objects.filter(username__in=[row['username'] for row in rows]).values_list('username', flat=True)
+        )
+        if existing:
+            self.stdout.write(self.style.WARNING(f"{len(existing)} comptes existent déjà et sont ignorés."))
+            rows = [row for row in rows if row['username'] not in existing]
+        if not rows:
+            self.stdout.write(self.style.WARNING("Aucun compte à créer."))
+            return
+
+        self._hash_passwords(rows, options['workers'])
+
+        batch_size = options['batch_size']
+        users = [
+            User(
+                username=row['username'],
+                email=row['email'],
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                password=row['password_hash'],
+            )
+            for row in rows
+        ]
+        roles = {row['username']: row['role'] for row in rows}
+
+        # bulk_create ne déclenche pas post_save : les profils sont créés ici, en un seul lot,
+        # au lieu d'un INSERT puis d'un UPDATE par compte via create_user_profile/save_user_profile.
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=batch_size)
+            user_ids = User.objects.filter(username__in=roles.keys()).values_list('username', 'id')
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=user_id, role=roles[username]) for username, user_id in user_ids],
+                batch_size=batch_size,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{len(users)} comptes créés avec leur profil."))
+
+    def _read_rows(self, csv_path, default_role):
+        try:
+            with open(csv_path, newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                raw_rows = list(reader)
+        except FileNotFoundError:
+            raise CommandError(f"Fichier introuvable : {csv_path}")
+
+        rows, seen = [], set()
+        for line_number, raw in enumerate(raw_rows, start=2):
+            username = (raw.get('username') or '').strip()
+            if not username:
+                raise CommandError(f"Ligne {line_number} : colonne 'username' manquante.")
+            if username in seen:
+                raise CommandError(f"Ligne {line_number} : identifiant '{username}' en double dans le fichier.")
+            seen.add(username)
+
+            password = raw.get('password') or ''
+            password_hash = (raw.get('password_hash') or '').strip()
+            if password_hash:
+                # Mot de passe déjà haché par notre système d'identité : on vérifie juste le format
+                try:
+                    identify_hasher(password_hash)
+                except ValueError:
+                    raise CommandError(f"Ligne {line_number} : 'password_hash' n'est pas un hash Django reconnu.")
+            elif not password:
+                raise CommandError(f"Ligne {line_number} : 'password' ou 'password_hash' requis.")
+
+            role = (raw.get('role') or '').strip().upper() or default_role
+            if role not in UserProfile.Role.values:
+                raise CommandError(f"Ligne {line_number} : rôle inconnu '{role}'.")
+
+            rows.append({
+                'username': username,
+                'email': (raw.get('email') or '').strip(),
+                'first_name': (raw.get('first_name') or '').strip(),
+                'last_name': (raw.get('last_name') or '').strip(),
+                'password': password,
+                'password_hash': password_hash,
+                'role': role,
+            })
+        return rows
+
+    def _hash_passwords(self, rows, workers):
+        """Hache en parallèle les mots de passe en clair (le hachage est volontairement coûteux en CPU)."""
+        to_hash = [row for row in rows if not row['password_hash']]
+        if not to_hash:
+            return
+
+        self.stdout.write(f"Hachage de {len(to_hash)} mots de passe sur {workers} processus...")
+        passwords = [row['password'] for row in to_hash]
+        if workers <= 1:
+            hashes = map(make_password, passwords)
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(os.environ['DJANGO_SETTINGS_MODULE'],),
+            )
+            with executor:
+                hashes = list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+        for row, password_hash in zip(to_hash, hashes):
+            row['password_hash'] = password_hash
+            row['password'] = ''
@@ -13,7 +13,7 @@ class UserProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='profile')
     role = models.CharField(max_length=20, choices=Role.choices, default=Role.APPRENANT)
 
-    #TODO Ajouter plus tard des attributs relatifs aux métriques d'évaluations
+    # Les métriques d'évaluation sont agrégées par catégorie dans evaluation.LearnerCategoryStats
 
     def __str__(self):
         return f"{self.user.username}'s Profile ({self.get_role_display()})"
@@ -28,4 +28,15 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
\ No newline at end of file
+    instance.profile.save()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def sync_revocation_denylist(sender, instance, **kwargs):
+    # Répercute immédiatement (dans ce processus) la désactivation d'un compte sur l'authentification JWT
+    from .authentication import denylist
+
+    if instance.is_active:
+        denylist.discard(instance.pk)
+    else:
+        denylist.add(instance.pk)
@@ -0,0 +1,39 @@
+# backend/users/permissions.py
+from rest_framework import permissions
+
+from .models import UserProfile
+
+
+def get_user_role(user):
+    """
+    Rôle de l'utilisateur : lu dans les claims du jeton (ClaimsUser) quand il est disponible,
+    sinon dans le profil (authentification par session, ex: API navigable).
+    """
+    role = getattr(user, 'role', None)
+    if role is not None:
+        return role
+    try:
+        return user.profile.role
+    except (AttributeError, UserProfile.DoesNotExist):
+        return None
+
+
+class HasRole(permissions.BasePermission):
+    """Autorise uniquement les utilisateurs authentifiés ayant le rôle `role`."""
+    role = None
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return get_user_role(user) == self.role
+
+
+class IsExpert(HasRole):
+    message = "Cette action est réservée aux experts."
+    role = UserProfile.Role.EXPERT
+
+
+class IsLearner(HasRole):
+    message = "Cette action est réservée aux apprenants."
+    role = UserProfile.Role.APPRENANT